@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Unicode converter (font_profiles) on tbSakshivani.
+
+Every profile is run over the real corpus and over synthetic corpora
+10x and 100x its size, with and without a TokenCache. Reports chars/sec,
+per-song latency percentiles and peak memory, saves the results as JSON
+and compares them with a stored baseline:
+
+    python benchmark_converter.py                    # run, compare with baseline
+    python benchmark_converter.py --update-baseline  # run, store as the new baseline
+    python benchmark_converter.py --profiles chanakya --scales 1 --threshold 0.2
+
+Exits with status 1 when a case is slower than the baseline by more than
+the threshold.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+
+from font_profiles import PROFILES, TokenCache, get_profile
+
+DB_FILE = 'assets/Sakshivani_db.db'
+RESULTS_FILE = 'benchmark_results.json'
+BASELINE_FILE = 'benchmark_baseline.json'
+MODES = ('plain', 'cached')
+
+def load_corpus(db_file=DB_FILE):
+    """The (Title, Lyric, Category, Reference) fields of every song."""
+    conn = sqlite3.connect(db_file)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Title, Lyric, Category, Reference FROM tbSakshivani")
+        return cursor.fetchall()
+    finally:
+        conn.close()
+
+def scale_corpus(songs, scale, seed=0):
+    """
+    The corpus followed by (scale - 1) synthetic copies of it.
+
+    Synthetic songs keep a real song's title, category and reference and
+    draw the same number of lyric lines at random from the whole corpus,
+    so the text (and its vocabulary) looks like the real thing without
+    repeating the same songs verbatim.
+    """
+    songs = list(songs)
+    lines = [line for song in songs if song[1] for line in song[1].split('\n')]
+    rng = random.Random(seed)
+    scaled = list(songs)
+    for _ in range(scale - 1):
+        for title, lyric, category, reference in songs:
+            count = lyric.count('\n') + 1 if lyric else 0
+            lyric = '\n'.join(rng.choice(lines) for _ in range(count))
+            scaled.append((title, lyric, category, reference))
+    return scaled
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))  # ceil
+    return sorted_values[int(rank) - 1]
+
+def _convert_all(profile, songs, cache):
+    """Convert every field of every song, returning the per-song seconds."""
+    convert = profile.convert
+    clock = time.perf_counter
+    latencies = []
+    for song in songs:
+        start = clock()
+        for value in song:
+            if value:
+                convert(value, cache)
+        latencies.append(clock() - start)
+    return latencies
+
+def _peak_memory(profile, songs, mode, cache_size):
+    """Peak bytes allocated while converting songs, traced separately from timing."""
+    tracemalloc.start()
+    try:
+        cache = TokenCache(cache_size, profile) if mode == 'cached' else None
+        _convert_all(profile, songs, cache)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+def run_case(profile_name, songs, scale, mode, repeat=3, cache_size=8192, memory=True):
+    """Benchmark one profile / corpus / mode combination."""
+    profile = get_profile(profile_name)  # tables loaded outside the timing
+    chars = sum(len(value) for song in songs for value in song if value)
+
+    # Best of repeat runs; a fresh token cache each time, so its cold start counts
+    best = None
+    for _ in range(repeat):
+        cache = TokenCache(cache_size, profile) if mode == 'cached' else None
+        latencies = _convert_all(profile, songs, cache)
+        if best is None or sum(latencies) < sum(best):
+            best = latencies
+
+    total = sum(best)
+    latencies = sorted(best)
+    return {
+        "profile": profile_name,
+        "scale": scale,
+        "mode": mode,
+        "songs": len(songs),
+        "chars": chars,
+        "seconds": round(total, 4),
+        "chars_per_sec": round(chars / total) if total else 0,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p90": round(percentile(latencies, 90) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+        "peak_memory_kb": (_peak_memory(profile, songs, mode, cache_size) // 1024
+                           if memory else None),
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _case_key(result):
+    return (result["profile"], result["scale"], result["mode"])
+
+def compare(results, baseline, threshold):
+    """
+    Compare chars/sec with the baseline. Returns (lines, regressions):
+    report lines and the cases slower than the baseline by more than
+    threshold (0.10 = 10%).
+    """
+    old = {_case_key(r): r for r in baseline.get("results", [])}
+    lines = []
+    regressions = []
+    for result in results:
+        key = _case_key(result)
+        if key not in old:
+            lines.append(f"  {key[0]:<10} {key[1]:>4}x {key[2]:<7} (not in baseline)")
+            continue
+        before = old[key]["chars_per_sec"]
+        after = result["chars_per_sec"]
+        change = (after - before) / before if before else 0.0
+        status = "OK"
+        if change < -threshold:
+            status = "REGRESSION"
+            regressions.append(key)
+        lines.append(f"  {key[0]:<10} {key[1]:>4}x {key[2]:<7} {before:>12,} -> {after:>12,} "
+                     f"chars/s ({change:+.1%}) [{status}]")
+    return lines, regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the Kruti Dev / Chanakya converter")
+    parser.add_argument('--profiles', default=','.join(sorted(PROFILES)),
+                        help="comma-separated profiles to run (default: all)")
+    parser.add_argument('--scales', default='1,10,100',
+                        help="comma-separated corpus sizes, as multiples of tbSakshivani "
+                             "(default 1,10,100)")
+    parser.add_argument('--modes', default=','.join(MODES),
+                        help="plain and/or cached (with a TokenCache), default both")
+    parser.add_argument('--repeat', type=int, default=3,
+                        help="runs per case, the fastest is kept (default 3)")
+    parser.add_argument('--cache-size', type=int, default=8192,
+                        help="TokenCache entries in cached mode (default 8192)")
+    parser.add_argument('--memory-scales', default='1',
+                        help="scales whose peak memory is measured in an extra traced run; "
+                             "tracing is ~3x slower (default 1, 'none' to skip)")
+    parser.add_argument('--output', default=RESULTS_FILE,
+                        help=f"results file (default {RESULTS_FILE})")
+    parser.add_argument('--baseline', default=BASELINE_FILE,
+                        help=f"baseline results to compare with (default {BASELINE_FILE})")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed chars/sec drop against the baseline (default 0.10 = 10%%)")
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="save the results as the new baseline instead of comparing")
+    args = parser.parse_args(argv)
+
+    profiles = args.profiles.split(',')
+    for name in profiles:
+        if name not in PROFILES:
+            parser.error(f"unknown profile {name!r} (choose from {', '.join(sorted(PROFILES))})")
+    scales = [int(scale) for scale in args.scales.split(',')]
+    modes = args.modes.split(',')
+    for mode in modes:
+        if mode not in MODES:
+            parser.error(f"unknown mode {mode!r} (choose from {', '.join(MODES)})")
+    memory_scales = (set() if args.memory_scales == 'none'
+                     else {int(scale) for scale in args.memory_scales.split(',')})
+
+    corpus = load_corpus()
+    print(f"Benchmarking {len(corpus)} songs x {args.scales} "
+          f"({', '.join(profiles)}; {', '.join(modes)})\n")
+    print(f"  {'profile':<10} {'scale':>5} {'mode':<7} {'chars/s':>12} {'p50 ms':>8} "
+          f"{'p99 ms':>8} {'max ms':>8} {'peak KiB':>9}")
+
+    results = []
+    for scale in scales:
+        songs = scale_corpus(corpus, scale)
+        for name in profiles:
+            for mode in modes:
+                result = run_case(name, songs, scale, mode, args.repeat, args.cache_size,
+                                  memory=scale in memory_scales)
+                results.append(result)
+                latency = result["latency_ms"]
+                peak = result["peak_memory_kb"]
+                print(f"  {name:<10} {scale:>4}x {mode:<7} {result['chars_per_sec']:>12,} "
+                      f"{latency['p50']:>8.3f} {latency['p99']:>8.3f} {latency['max']:>8.3f} "
+                      f"{peak if peak is not None else '-':>9}")
+
+    report = {
+        "created": datetime.now().isoformat(timespec='seconds'),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults saved to {args.output}")
+
+    if args.update_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"No baseline at {args.baseline}; run with --update-baseline to create one")
+        return 0
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    print(f"\nAgainst baseline {args.baseline} (commit {baseline.get('commit')}, "
+          f"threshold {args.threshold:.0%}):")
+    lines, regressions = compare(results, baseline, args.threshold)
+    print('\n'.join(lines))
+    if regressions:
+        print(f"\n{len(regressions)} case(s) slower than the baseline by more than "
+              f"{args.threshold:.0%}")
+        return 1
+    print("\nNo regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Build the offline search index of the PWA (pwa/search-index/) from
+pwa/songs.json.
+
+    python build_search_index.py                  # write pwa/search-index/
+    python build_search_index.py --query 'यिशु प्र' # look a query up in it
+
+Every word of the titles and lyrics is folded as devanagari.fold()
+folds it (so यीशु and यिशू are one term) and lower-cased, and mapped to
+the songs it occurs in. The terms are split into shards by their first
+character(s), one JSON file each:
+
+    {"terms": ["यिशु", "यिशुने", ...], "postings": ["CkGE...", ...]}
+
+terms sorted, so the songs of every term starting with a prefix are one
+binary search away. A term's postings are its song ids in order, each
+stored as (gap from the previous id) << 2 | field flags (1 title,
+2 lyrics) and written as a base64 VLQ: five bits per character, the
+sixth set on every character but the last of a number.
+
+manifest.json lists the shards and carries the fold table, so the
+client folds queries exactly as the index was built. app.js loads the
+manifest and then only the shards a query needs; the service worker
+precaches all of them.
+"""
+import argparse
+import bisect
+import json
+import os
+import re
+import sys
+
+import devanagari
+from font_profiles import atomic_write
+
+SONGS_FILE = 'pwa/songs.json'
+INDEX_DIR = 'pwa/search-index'
+MANIFEST = 'manifest.json'
+# Bump when the format of the index changes
+INDEX_VERSION = 1
+
+# Field flags of a posting
+TITLE = 1
+LYRICS = 2
+FLAG_BITS = 2
+
+# Words: letters, digits and the Devanagari marks, which \w leaves out
+# (app.js: /[\p{L}\p{M}\p{N}]+/gu); the dandas separate words
+TOKEN_RE = re.compile(r'[\wऀ-ॣ०-ॿ]+')
+
+VLQ_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/'
+_VLQ_VALUES = {char: value for value, char in enumerate(VLQ_ALPHABET)}
+VLQ_SHIFT = 5
+VLQ_CONTINUE = 1 << VLQ_SHIFT
+VLQ_MASK = VLQ_CONTINUE - 1
+
+# --- 1. Terms ---
+
+def terms(text):
+    """The search terms of text, in order: its words, folded and lower-cased."""
+    return TOKEN_RE.findall(devanagari.fold(text or '').lower())
+
+def build_index(songs):
+    """{term: {song_id: field flags}} of the titles and lyrics of songs."""
+    index = {}
+    for song in songs:
+        for field, flag in (('title', TITLE), ('lyrics', LYRICS)):
+            for term in terms(song.get(field)):
+                postings = index.setdefault(term, {})
+                postings[song['id']] = postings.get(song['id'], 0) | flag
+    return index
+
+# --- 2. Postings ---
+
+def encode_postings(postings):
+    """{song_id: flags} as a VLQ string of (id gap << FLAG_BITS | flags), ids ascending."""
+    out = []
+    previous = 0
+    for song_id in sorted(postings):
+        value = (song_id - previous) << FLAG_BITS | postings[song_id]
+        previous = song_id
+        while True:
+            digit = value & VLQ_MASK
+            value >>= VLQ_SHIFT
+            out.append(VLQ_ALPHABET[digit | VLQ_CONTINUE if value else digit])
+            if not value:
+                break
+    return ''.join(out)
+
+def decode_postings(encoded):
+    """[(song_id, flags)] of a string from encode_postings()."""
+    postings = []
+    song_id = value = shift = 0
+    for char in encoded:
+        digit = _VLQ_VALUES[char]
+        value |= (digit & VLQ_MASK) << shift
+        if digit & VLQ_CONTINUE:
+            shift += VLQ_SHIFT
+            continue
+        song_id += value >> FLAG_BITS
+        postings.append((song_id, value & ((1 << FLAG_BITS) - 1)))
+        value = shift = 0
+    return postings
+
+# --- 3. Shards ---
+
+def shard_key(term, prefix=1):
+    return term[:prefix]
+
+def shard_file(key):
+    """File name of a shard: the code points of its key in hex (0915.json for क)."""
+    return '-'.join(f'{ord(char):04x}' for char in key) + '.json'
+
+def make_shards(index, prefix=1):
+    """{shard key: {"terms": [...], "postings": [...]}}, terms sorted."""
+    shards = {}
+    for term in sorted(index):
+        shard = shards.setdefault(shard_key(term, prefix), {"terms": [], "postings": []})
+        shard["terms"].append(term)
+        shard["postings"].append(encode_postings(index[term]))
+    return shards
+
+def _write_json(data, path):
+    # Replaced only once complete, like songs.json
+    with atomic_write(path) as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    return os.path.getsize(path)
+
+def write_index(songs, index_dir=INDEX_DIR, prefix=1):
+    """
+    Write the shards and manifest.json of songs to index_dir, removing
+    shards of an earlier build that are no longer used; returns the manifest.
+    """
+    index = build_index(songs)
+    shards = make_shards(index, prefix)
+    os.makedirs(index_dir, exist_ok=True)
+
+    manifest = {
+        "version": INDEX_VERSION,
+        "fold_version": devanagari.FOLD_VERSION,
+        "folds": devanagari.FOLDS,
+        "songs": len(songs),
+        "terms": len(index),
+        "shard_prefix": prefix,
+        "flags": {"title": TITLE, "lyrics": LYRICS},
+        "shards": {},
+    }
+    for key, shard in shards.items():
+        name = shard_file(key)
+        size = _write_json(shard, os.path.join(index_dir, name))
+        manifest["shards"][key] = {"file": name, "terms": len(shard["terms"]), "bytes": size}
+    _write_json(manifest, os.path.join(index_dir, MANIFEST))
+
+    used = {entry["file"] for entry in manifest["shards"].values()} | {MANIFEST}
+    for name in os.listdir(index_dir):
+        if name.endswith('.json') and name not in used:
+            os.remove(os.path.join(index_dir, name))
+    return manifest
+
+# --- 4. Lookup ---
+# The search app.js runs on the index, for checking it from Python
+
+def _load_shard(index_dir, manifest, key, shards):
+    if key not in shards:
+        entry = manifest["shards"].get(key)
+        shards[key] = None
+        if entry:
+            with open(os.path.join(index_dir, entry["file"]), encoding='utf-8') as f:
+                shards[key] = json.load(f)
+    return shards[key]
+
+def lookup(query, index_dir=INDEX_DIR, manifest=None, shards=None):
+    """
+    The songs with a term starting with every term of query, as
+    [(song_id, flags)]: songs matching every term in the title first,
+    then by id. shards caches loaded shards between calls.
+    """
+    if manifest is None:
+        with open(os.path.join(index_dir, MANIFEST), encoding='utf-8') as f:
+            manifest = json.load(f)
+    shards = {} if shards is None else shards
+    prefix = manifest["shard_prefix"]
+    found = None
+    for term in terms(query):
+        keys = ([shard_key(term, prefix)] if len(term) >= prefix else
+                [key for key in manifest["shards"] if key.startswith(term)])
+        matches = {}
+        for key in keys:
+            shard = _load_shard(index_dir, manifest, key, shards)
+            if shard is None:
+                continue
+            # The terms starting with term are one run of the sorted list
+            position = bisect.bisect_left(shard["terms"], term)
+            while position < len(shard["terms"]) and shard["terms"][position].startswith(term):
+                for song_id, flags in decode_postings(shard["postings"][position]):
+                    matches[song_id] = matches.get(song_id, 0) | flags
+                position += 1
+        if found is None:
+            found = matches
+        else:
+            found = {song_id: found[song_id] & flags for song_id, flags in matches.items()
+                     if song_id in found}
+    found = found or {}
+    return sorted(found.items(), key=lambda item: (not item[1] & TITLE, item[0]))
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build the PWA's offline search index")
+    parser.add_argument('--songs', default=SONGS_FILE,
+                        help=f"songs to index (default {SONGS_FILE})")
+    parser.add_argument('--output', default=INDEX_DIR,
+                        help=f"directory of the index (default {INDEX_DIR})")
+    parser.add_argument('--shard-prefix', type=int, default=1,
+                        help="characters of a term that pick its shard (default 1)")
+    parser.add_argument('--query', help="look a query up in the index instead of building it")
+    args = parser.parse_args(argv)
+
+    if args.query:
+        results = lookup(args.query, args.output)
+        print(f"{len(results)} songs for {args.query!r}:")
+        for song_id, flags in results[:20]:
+            fields = '+'.join(name for name, flag in (('title', TITLE), ('lyrics', LYRICS))
+                              if flags & flag)
+            print(f"   {song_id:3}  {fields}")
+        return 0
+
+    with open(args.songs, encoding='utf-8') as f:
+        songs = json.load(f)
+    manifest = write_index(songs, args.output, args.shard_prefix)
+    total = sum(entry["bytes"] for entry in manifest["shards"].values())
+    largest = max(manifest["shards"].items(), key=lambda item: item[1]["bytes"])
+    print(f"Indexed {manifest['songs']} songs: {manifest['terms']} terms in "
+          f"{len(manifest['shards'])} shards, {total / 1024:.0f} KiB "
+          f"(largest {largest[0]} {largest[1]['bytes'] / 1024:.0f} KiB) in {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Convert a directory tree of legacy-font (Kruti Dev / Chanakya) files to
+Unicode, mirroring it into an output directory:
+
+    python convert_files.py supplements/ supplements_unicode/
+    python convert_files.py bulletins/ out/ --profile krutidev --workers 4
+    python convert_files.py incoming/ out/ --detect   # leave Unicode / English text alone
+
+Every .txt, .md and .json file under the source directory is converted
+to the same relative path under the output directory:
+    .txt   the whole file, streamed through Profile.convert_stream()
+           (line by line with --detect), keeping its leading and
+           trailing whitespace
+    .md    line by line, keeping indentation, heading / list / quote
+           markers, URLs and fenced code blocks as they are
+    .json  every string value; keys are left alone
+
+A manifest in the output directory records the source hash, output
+hash and converter of every file, so a re-run skips files whose source
+and output are unchanged and were converted by the same tables, and
+removes the outputs of files no longer in the source tree.
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from font_profiles import (CONVERTER_VERSION, DEFAULT_PROFILE, ENCODING_PROFILES, KRUTIDEV_SCORE,
+                           MIXED_SHARE, PROFILES, TokenCache, atomic_write, detect_profile,
+                           get_profile)
+
+EXTENSIONS = ('.txt', '.md', '.json')
+MANIFEST_NAME = '.conversion_manifest.json'
+MANIFEST_FORMAT = 1
+# Bump when the way a file type is split into text to convert changes
+FILES_VERSION = 2
+BLOCK_SIZE = 1 << 16
+CACHE_SIZE = 8192
+
+# --- Converting text ---
+
+# One token cache per profile and worker process
+_caches = {}
+
+def convert_text(text, profile=DEFAULT_PROFILE, detect=False):
+    """
+    Convert one piece of text (a line, a JSON string) with profile, or
+    with detect=True with the profile of its detected encoding, leaving
+    Unicode, English and mixed text unchanged.
+    """
+    name = detect_profile(text, profile) if detect else profile
+    if name is None:
+        return text
+    cache = _caches.get(name)
+    if cache is None:
+        cache = _caches[name] = TokenCache(CACHE_SIZE, name)
+    return get_profile(name).convert(text, cache)
+
+# Leading and trailing whitespace, which convert() would strip
+_EDGES_RE = re.compile(r'(\s*)(.*?)(\s*)\Z', re.S)
+
+def _convert_keeping_edges(text, convert):
+    lead, core, trail = _EDGES_RE.match(text).groups()
+    return lead + convert(core) + trail if core else text
+
+def convert_stream_keeping_edges(source, profile=DEFAULT_PROFILE, chunk_size=BLOCK_SIZE):
+    """
+    Profile.convert_stream() of a file object, with the leading and
+    trailing whitespace it strips (a file's final newline) kept as in
+    the source, like _convert_keeping_edges() on the whole text.
+    """
+    lead = trail = ''
+    started = False
+
+    def chunks():
+        # Pass every chunk on, noting the whitespace before the first
+        # non-space and after the last one seen so far
+        nonlocal lead, trail, started
+        for chunk in iter(partial(source.read, chunk_size), ''):
+            stripped = chunk.rstrip()
+            if not stripped:
+                if started:
+                    trail += chunk
+                else:
+                    lead += chunk
+            else:
+                if not started:
+                    lead += chunk[:len(chunk) - len(chunk.lstrip())]
+                    started = True
+                trail = chunk[len(stripped):]
+            yield chunk
+
+    converted = get_profile(profile).convert_stream(chunks(), chunk_size)
+    # The first chunk out comes after the first non-space in, so lead is complete
+    first = next(converted, '')
+    yield lead
+    if not started:
+        return
+    yield first
+    yield from converted
+    yield trail
+
+# Block markers at the start of a Markdown line: headings, quotes, bullets
+# and numbers, each followed by whitespace (the characters themselves are
+# Kruti Dev glyphs too, so a marker needs the space to count)
+_MARKDOWN_PREFIX_RE = re.compile(r'\s*(?:(?:#{1,6}|>|[-*+]|\d+[.)])\s+)*')
+_URL_RE = re.compile(r'(https?://\S+)')
+_FENCE_RE = re.compile(r'\s*(```|~~~)')
+
+def convert_markdown_lines(lines, convert):
+    """Yield the lines of a Markdown document with their text converted."""
+    fence = None
+    for line in lines:
+        match = _FENCE_RE.match(line)
+        if match and (fence is None or match.group(1) == fence):
+            fence = match.group(1) if fence is None else None
+            yield line
+            continue
+        if fence is not None:
+            yield line
+            continue
+        prefix = _MARKDOWN_PREFIX_RE.match(line).group()
+        # Odd pieces are URLs, kept as they are
+        pieces = _URL_RE.split(line[len(prefix):])
+        pieces[::2] = [_convert_keeping_edges(piece, convert) for piece in pieces[::2]]
+        yield prefix + "".join(pieces)
+
+def convert_json_value(value, convert):
+    """value with every string in it converted; dict keys are left alone."""
+    if isinstance(value, str):
+        return convert(value)
+    if isinstance(value, list):
+        return [convert_json_value(item, convert) for item in value]
+    if isinstance(value, dict):
+        return {key: convert_json_value(item, convert) for key, item in value.items()}
+    return value
+
+# --- Converting files ---
+
+def file_hash(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(partial(f.read, BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def converter_key(profile=DEFAULT_PROFILE, detect=False):
+    """Hash of everything a file's output depends on besides its content."""
+    names = sorted({profile, *ENCODING_PROFILES.values()}) if detect else [profile]
+    parts = [CONVERTER_VERSION, FILES_VERSION, detect]
+    if detect:
+        parts += [KRUTIDEV_SCORE, MIXED_SHARE]
+    for name in names:
+        p = get_profile(name)
+        parts += [name, p.table_hash(), p.front_hash(), p.finish_hash()]
+    return hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+def _write_output(source, dst, profile, detect, encoding):
+    convert = partial(convert_text, profile=profile, detect=detect)
+    extension = os.path.splitext(source)[1].lower()
+    with open(source, encoding=encoding, newline='') as src:
+        if extension == '.json':
+            json.dump(convert_json_value(json.load(src), convert), dst,
+                      ensure_ascii=False, indent=2)
+            dst.write('\n')
+        elif extension == '.md':
+            dst.writelines(convert_markdown_lines(src, convert))
+        elif detect:
+            dst.writelines(_convert_keeping_edges(line, convert) for line in src)
+        else:
+            dst.writelines(convert_stream_keeping_edges(src, profile))
+
+def convert_file(task):
+    """
+    Convert one file; task is (relative path, source, output, manifest
+    entry or None, converter key, profile, detect, encoding). Returns
+    (relative path, status, manifest entry or None, error message) where
+    status is 'converted', 'skipped' or 'failed'.
+    """
+    rel_path, source, output, entry, key, profile, detect, encoding = task
+    try:
+        source_hash = file_hash(source)
+        if (entry is not None and entry.get("source") == source_hash
+                and entry.get("converter") == key and os.path.exists(output)
+                and file_hash(output) == entry.get("output")):
+            return rel_path, 'skipped', entry, None
+
+        # Write beside the output and rename, so a failure never leaves half a file
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with atomic_write(output, newline='') as dst:
+            _write_output(source, dst, profile=profile, detect=detect, encoding=encoding)
+        entry = {"source": source_hash, "converter": key, "output": file_hash(output)}
+        return rel_path, 'converted', entry, None
+    except Exception as e:
+        return rel_path, 'failed', None, f"{type(e).__name__}: {e}"
+
+def find_files(source_dir, output_dir, extensions=EXTENSIONS):
+    """Relative paths of the files to convert under source_dir, in sorted order."""
+    output_dir = os.path.abspath(output_dir)
+    found = []
+    for root, dirs, files in os.walk(source_dir):
+        # Never descend into the output tree when it sits inside the source
+        dirs[:] = sorted(d for d in dirs if os.path.abspath(os.path.join(root, d)) != output_dir)
+        for name in sorted(files):
+            if os.path.splitext(name)[1].lower() in extensions:
+                found.append(os.path.relpath(os.path.join(root, name), source_dir))
+    return found
+
+def read_manifest(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(data, dict) or data.get("format") != MANIFEST_FORMAT:
+        return {}
+    return data.get("files", {})
+
+def write_manifest(path, files):
+    data = {"format": MANIFEST_FORMAT, "files": dict(sorted(files.items()))}
+    with atomic_write(path) as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+
+def remove_stale(output_dir, rel_paths):
+    """
+    Remove the outputs of rel_paths from output_dir, and the directories
+    left empty; returns the relative paths removed.
+    """
+    removed = []
+    for rel_path in rel_paths:
+        # Only paths inside the output tree, whatever the manifest says
+        if os.path.isabs(rel_path) or os.path.normpath(rel_path).startswith(os.pardir):
+            continue
+        output = os.path.join(output_dir, rel_path)
+        try:
+            os.remove(output)
+        except FileNotFoundError:
+            pass
+        removed.append(rel_path)
+        directory = os.path.dirname(output)
+        while os.path.normpath(directory) != os.path.normpath(output_dir):
+            try:
+                os.rmdir(directory)
+            except OSError:
+                break
+            directory = os.path.dirname(directory)
+    return removed
+
+def convert_tree(source_dir, output_dir, profile=DEFAULT_PROFILE, detect=False, workers=1,
+                 encoding='utf-8', force=False, extensions=EXTENSIONS):
+    """
+    Convert every file of source_dir with one of extensions into the same
+    path under output_dir; workers > 1 converts on a process pool.
+    Outputs of files with one of extensions that the last run converted
+    but whose source is gone are removed, so output_dir stays a mirror.
+    Returns the (relative path, status, entry, error) of each file,
+    status 'removed' for those outputs.
+    """
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    previous = read_manifest(manifest_path)
+    manifest = {} if force else previous
+    key = converter_key(profile, detect)
+    tasks = [(rel_path, os.path.join(source_dir, rel_path), os.path.join(output_dir, rel_path),
+              manifest.get(rel_path), key, profile, detect, encoding)
+             for rel_path in find_files(source_dir, output_dir, extensions)]
+
+    os.makedirs(output_dir, exist_ok=True)
+    if workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            results = list(pool.map(convert_file, tasks, chunksize=4))
+    else:
+        results = [convert_file(task) for task in tasks]
+
+    # Entries for the files there now; failed files are retried next run.
+    # Files of other extensions were not looked at and keep theirs
+    found = {task[0] for task in tasks}
+    kept = {rel_path: entry for rel_path, entry in previous.items()
+            if os.path.splitext(rel_path)[1].lower() not in extensions}
+    stale = sorted(rel_path for rel_path in previous
+                   if rel_path not in found and rel_path not in kept)
+    results += [(rel_path, 'removed', None, None)
+                for rel_path in remove_stale(output_dir, stale)]
+    kept.update((rel_path, entry) for rel_path, _, entry, _ in results if entry is not None)
+    write_manifest(manifest_path, kept)
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Convert a tree of legacy-font .txt/.md/.json files to Unicode")
+    parser.add_argument('source', help="directory of legacy-font files")
+    parser.add_argument('output', help="directory for the converted tree")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help=f"font profile of the source text (default {DEFAULT_PROFILE})")
+    parser.add_argument('--detect', action='store_true',
+                        help="detect the encoding of every line / JSON string and convert it "
+                             "with the matching profile, leaving Unicode and English text alone")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="worker processes (0 = one per core, default)")
+    parser.add_argument('--encoding', default='utf-8',
+                        help="text encoding of the source files (default utf-8, e.g. cp1252 "
+                             "for files saved by legacy Windows editors)")
+    parser.add_argument('--extensions', default=','.join(EXTENSIONS),
+                        help=f"file types to convert (default {','.join(EXTENSIONS)})")
+    parser.add_argument('--force', action='store_true',
+                        help="convert every file, even those unchanged since the last run")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.source):
+        parser.error(f"{args.source} is not a directory")
+    extensions = tuple(ext if ext.startswith('.') else '.' + ext
+                       for ext in args.extensions.lower().split(','))
+    unknown = [ext for ext in extensions if ext not in EXTENSIONS]
+    if unknown:
+        parser.error(f"unknown extension(s) {', '.join(unknown)} "
+                     f"(choose from {', '.join(EXTENSIONS)})")
+    workers = args.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    results = convert_tree(args.source, args.output, args.profile, args.detect, workers,
+                           args.encoding, args.force, extensions)
+    elapsed = time.perf_counter() - start
+
+    counts = {'converted': 0, 'skipped': 0, 'failed': 0, 'removed': 0}
+    for rel_path, status, _, error in results:
+        counts[status] += 1
+        if error:
+            print(f"Error converting {rel_path}: {error}")
+    print(f"{len(results) - counts['removed']} files in {elapsed:.2f}s: "
+          f"{counts['converted']} converted, {counts['skipped']} unchanged, "
+          f"{counts['failed']} failed, {counts['removed']} removed -> {args.output}")
+    return 1 if counts['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
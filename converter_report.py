@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Report where the Unicode converter (font_profiles) spends its time.
+
+Lists the conversion stages by wall time, the most used mapping entries
+and correction rules, and the ones that never fired:
+
+    python converter_report.py                       # instrument a run over tbSakshivani
+    python converter_report.py --profile krutidev --save stats.json
+    python converter_report.py stats.json --top 20   # report on saved data
+
+Saved data comes from --save here or from migrate_data_v2.py --instrument.
+"""
+import argparse
+import json
+import sqlite3
+import sys
+
+from font_profiles import (DEFAULT_PROFILE, PROFILES, Instrumentation, TokenCache, get_profile,
+                           instrumentation_report)
+
+DB_FILE = 'assets/Sakshivani_db.db'
+
+def instrument_corpus(profile_name=DEFAULT_PROFILE, db_file=DB_FILE, cache_size=0):
+    """Convert every field of tbSakshivani with instrumentation attached; returns its data."""
+    conn = sqlite3.connect(db_file)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT Title, Lyric, Category, Reference FROM tbSakshivani")
+        songs = cursor.fetchall()
+    finally:
+        conn.close()
+
+    profile = get_profile(profile_name)
+    cache = TokenCache(cache_size, profile) if cache_size > 0 else None
+    instrumentation = Instrumentation()
+    previous = profile.instrument(instrumentation)
+    try:
+        for song in songs:
+            for value in song:
+                if value:
+                    profile.convert(value, cache)
+    finally:
+        profile.instrument(previous)
+    return instrumentation.to_dict()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Converter stage timing and rule-hit report")
+    parser.add_argument('stats', nargs='?',
+                        help="saved instrumentation data (JSON); without it tbSakshivani is "
+                             "converted with instrumentation attached")
+    parser.add_argument('--profile', default=DEFAULT_PROFILE, choices=sorted(PROFILES),
+                        help=f"font profile for the corpus run (default: {DEFAULT_PROFILE})")
+    parser.add_argument('--cache-size', type=int, default=0,
+                        help="TokenCache entries for the corpus run (default 0 = no cache)")
+    parser.add_argument('--save', metavar='FILE', help="save the corpus run's data to FILE")
+    parser.add_argument('--top', type=int, default=10,
+                        help="most used entries to list (default 10)")
+    args = parser.parse_args(argv)
+
+    if args.stats:
+        with open(args.stats, encoding='utf-8') as f:
+            data = json.load(f)
+    else:
+        data = instrument_corpus(args.profile, cache_size=args.cache_size)
+        if args.save:
+            with open(args.save, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+
+    print(instrumentation_report(data, args.top))
+    if args.save and not args.stats:
+        print(f"\nInstrumentation saved to {args.save}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
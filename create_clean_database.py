@@ -1,122 +1,280 @@
 #!/usr/bin/env python3
 """
-Create a clean, well-structured Unicode database from the cleaned songs.json
+Create a clean, well-structured Unicode database from tbSakshivani
+
+The songs are converted inside SQLite: the legacy database is attached
+and rows are copied in chunks with INSERT ... SELECT kd2u(...), one
+transaction per chunk, so the corpus never passes through JSON or Python
+lists. --from-json builds from the cleaned songs.json instead, as before.
+
+The database is built from scratch, so it is bulk loaded: no journal and
+no syncing while it loads (a failed build is simply run again), the
+secondary indexes are created after the rows are in, and the
+external-content full-text indexes are built once with 'rebuild' and
+then merged with 'optimize'. Each stage is timed.
+
+Besides songs_fts over the text as it is, title_folded / lyrics_folded
+hold the text folded by devanagari.fold() (no nukta or halant, one
+anusvara, short i / u) with songs_folded_fts over them, so a search
+for यीशु finds यिशु. Fold the query the same way, with fold() or the
+devanagari_fold() SQL function.
+
+songs_trigram_fts indexes every three-character run of the title and
+lyrics, for substrings inside words (स्तुति in स्तुतिगान); song_search.py
+picks between it and the word index per query.
 """
+import argparse
 import json
 import sqlite3
 import os
+import time
+
+import devanagari
+from font_profiles import DEFAULT_PROFILE, PROFILES
+from migrate_data_v2 import SONGS_SQL, register_sqlite_functions
 
-# Load cleaned data
-with open('pwa/songs.json', 'r', encoding='utf-8') as f:
-    songs = json.load(f)
-
-# Create new clean database
-db_file = 'assets/Sakshivani_Unicode_Clean.db'
-
-# Remove old file if exists
-if os.path.exists(db_file):
-    os.remove(db_file)
-
-# Create connection
-conn = sqlite3.connect(db_file)
-cursor = conn.cursor()
-
-# Create well-structured table with proper schema
-cursor.execute('''
-CREATE TABLE songs (
-    song_id INTEGER PRIMARY KEY,
-    title TEXT NOT NULL,
-    lyrics TEXT NOT NULL,
-    category TEXT,
-    reference TEXT,
-    created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+SOURCE_DB = 'assets/Sakshivani_db.db'
+SONGS_JSON = 'pwa/songs.json'
+DB_FILE = 'assets/Sakshivani_Unicode_Clean.db'
+
+# Connection settings for the load; none of them outlive the connection
+BULK_PRAGMAS = (
+    'PRAGMA journal_mode = OFF',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA cache_size = -262144',  # 256 MiB
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA locking_mode = EXCLUSIVE',
 )
-''')
-
-# Create indexes for better query performance
-cursor.execute('CREATE INDEX idx_category ON songs(category)')
-cursor.execute('CREATE INDEX idx_title ON songs(title)')
-cursor.execute('CREATE INDEX idx_reference ON songs(reference)')
-
-# Create full-text search table for lyrics
-cursor.execute('''
-CREATE VIRTUAL TABLE songs_fts USING fts5(
-    title,
-    lyrics,
-    category,
-    content=songs,
-    content_rowid=song_id
+
+# Devanagari matras, halant and nukta are marks (M*), which unicode61
+# splits words on by default
+FTS_TOKENIZE = "unicode61 categories 'L* N* Co M*'"
+
+FTS_TABLES = ('songs_fts', 'songs_folded_fts', 'songs_trigram_fts')
+
+INDEXES = (
+    'CREATE INDEX idx_category ON songs(category)',
+    'CREATE INDEX idx_title ON songs(title)',
+    'CREATE INDEX idx_reference ON songs(reference)',
 )
-''')
 
-# Insert all cleaned data
-print(f"Inserting {len(songs)} songs into database...")
+def create_schema(cursor):
+    # Create well-structured table with proper schema
+    cursor.execute('''
+    CREATE TABLE songs (
+        song_id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        lyrics TEXT NOT NULL,
+        category TEXT,
+        reference TEXT,
+        title_folded TEXT,
+        lyrics_folded TEXT,
+        created_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_date TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    ''')
 
-for song in songs:
+    # Create full-text search tables for lyrics, as written and folded;
+    # they read the text from songs and are filled by build_indexes()
+    # once the songs are loaded
+    cursor.execute(f'''
+    CREATE VIRTUAL TABLE songs_fts USING fts5(
+        title,
+        lyrics,
+        category,
+        content=songs,
+        content_rowid=song_id,
+        tokenize="{FTS_TOKENIZE}"
+    )
+    ''')
+    cursor.execute(f'''
+    CREATE VIRTUAL TABLE songs_folded_fts USING fts5(
+        title_folded,
+        lyrics_folded,
+        content=songs,
+        content_rowid=song_id,
+        tokenize="{FTS_TOKENIZE}"
+    )
+    ''')
     cursor.execute('''
+    CREATE VIRTUAL TABLE songs_trigram_fts USING fts5(
+        title,
+        lyrics,
+        content=songs,
+        content_rowid=song_id,
+        tokenize="trigram"
+    )
+    ''')
+
+def load_from_json(conn, songs_file=SONGS_JSON):
+    """
+    Insert the songs of songs_file (see migrate_data_v2.py) with one
+    executemany() in one transaction; returns how many.
+    """
+    with open(songs_file, 'r', encoding='utf-8') as f:
+        songs = json.load(f)
+
+    print(f"Inserting {len(songs)} songs into database...")
+    with conn:
+        conn.executemany('''
+            INSERT INTO songs (song_id, title, lyrics, category, reference)
+            VALUES (?, ?, ?, ?, ?)
+        ''', ((song['id'], song['title'], song['lyrics'], song.get('category', ''),
+               song.get('reference', '')) for song in songs))
+    return len(songs)
+
+def load_from_source(conn, source_db=SOURCE_DB, profile=DEFAULT_PROFILE, batch_size=100):
+    """
+    Convert tbSakshivani of source_db straight into songs, batch_size rows
+    per transaction, with the kd2u() SQL function; returns how many rows.
+    The songs match what migrate_data_v2.py writes to songs.json.
+    """
+    register_sqlite_functions(conn)
+    conn.execute("ATTACH DATABASE ? AS source", (source_db,))
+
+    # Keyset chunks: each transaction picks up after the last Song_Id copied
+    # (tbSakshivani resolves to the attached database, main has none)
+    insert = f'''
         INSERT INTO songs (song_id, title, lyrics, category, reference)
-        VALUES (?, ?, ?, ?, ?)
-    ''', (
-        song['id'],
-        song['title'],
-        song['lyrics'],
-        song.get('category', ''),
-        song.get('reference', '')
-    ))
-    
-    # Also insert into FTS table
+        {SONGS_SQL} WHERE Song_Id > :after ORDER BY Song_Id LIMIT :limit
+    '''
+    print(f"Converting songs from {source_db} in batches of {batch_size}...")
+    total = 0
+    after = -1
+    while True:
+        with conn:
+            count = conn.execute(insert, {"profile": profile, "after": after,
+                                          "limit": batch_size}).rowcount
+        if count <= 0:
+            break
+        total += count
+        after = conn.execute('SELECT MAX(song_id) FROM songs').fetchone()[0]
+    conn.execute("DETACH DATABASE source")
+    print(f"Converted {total} songs")
+    return total
+
+def build_indexes(conn, timings):
+    """
+    Fill the folded columns, create the secondary indexes and fill the
+    full-text indexes from the loaded songs, recording the seconds each
+    step took in timings.
+    """
+    start = time.perf_counter()
+    devanagari.register_sqlite_function(conn)
+    with conn:
+        conn.execute('UPDATE songs SET title_folded = devanagari_fold(title), '
+                     'lyrics_folded = devanagari_fold(lyrics)')
+    timings['fold'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with conn:
+        for statement in INDEXES:
+            conn.execute(statement)
+    timings['indexes'] = time.perf_counter() - start
+
+    # The full-text tables have external content: 'rebuild' reads every
+    # song once and writes the index in one go, 'optimize' merges its
+    # segments into one
+    for table in FTS_TABLES:
+        start = time.perf_counter()
+        with conn:
+            conn.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+        timings[f'{table} rebuild'] = time.perf_counter() - start
+        start = time.perf_counter()
+        with conn:
+            conn.execute(f"INSERT INTO {table} ({table}) VALUES ('optimize')")
+        timings[f'{table} optimize'] = time.perf_counter() - start
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Create the clean Unicode songs database")
+    parser.add_argument('--from-json', nargs='?', const=SONGS_JSON, metavar='FILE',
+                        help=f"load the songs from a songs.json (default {SONGS_JSON}) "
+                             f"instead of converting {SOURCE_DB} in the database")
+    parser.add_argument('--source', default=SOURCE_DB,
+                        help=f"legacy database to convert (default {SOURCE_DB})")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help=f"font profile of the source text (default {DEFAULT_PROFILE})")
+    parser.add_argument('--batch-size', type=int, default=100,
+                        help="rows converted per transaction (default 100)")
+    parser.add_argument('--output', default=DB_FILE,
+                        help=f"database to create (default {DB_FILE})")
+    args = parser.parse_args(argv)
+
+    # Create new clean database
+    db_file = args.output
+
+    # Remove old file if exists
+    if os.path.exists(db_file):
+        os.remove(db_file)
+
+    # Create connection, set up for the bulk load
+    conn = sqlite3.connect(db_file)
+    for pragma in BULK_PRAGMAS:
+        conn.execute(pragma)
+    cursor = conn.cursor()
+    create_schema(cursor)
+
+    timings = {}
+    start = time.perf_counter()
+    if args.from_json:
+        total = load_from_json(conn, args.from_json)
+        source = 'Chanakya to Unicode conversion'
+    else:
+        total = load_from_source(conn, args.source, args.profile, args.batch_size)
+        source = f'Chanakya to Unicode conversion (in-database, {args.profile} profile)'
+    timings['load'] = time.perf_counter() - start
+    build_indexes(conn, timings)
+
+    # Create metadata table
     cursor.execute('''
-        INSERT INTO songs_fts (rowid, title, lyrics, category)
-        VALUES (?, ?, ?, ?)
-    ''', (
-        song['id'],
-        song['title'],
-        song['lyrics'],
-        song.get('category', '')
-    ))
-
-# Create metadata table
-cursor.execute('''
-CREATE TABLE metadata (
-    key TEXT PRIMARY KEY,
-    value TEXT
-)
-''')
-
-cursor.execute('''
-    INSERT INTO metadata (key, value) VALUES 
-    ('version', 'v20_unicode_clean'),
-    ('total_songs', ?),
-    ('encoding', 'UTF-8'),
-    ('conversion_date', datetime('now')),
-    ('corrections_applied', '2220+'),
-    ('source', 'Chanakya to Unicode conversion')
-''', (len(songs),))
-
-# Commit and close
-conn.commit()
-
-# Verify
-cursor.execute('SELECT COUNT(*) FROM songs')
-count = cursor.fetchone()[0]
-
-cursor.execute('SELECT COUNT(*) FROM songs_fts')
-fts_count = cursor.fetchone()[0]
-
-print(f"\n✅ Database created successfully!")
-print(f"   Location: {db_file}")
-print(f"   Songs: {count}")
-print(f"   FTS entries: {fts_count}")
-print(f"   Encoding: UTF-8")
-print(f"   Status: Production-ready")
-
-# Show sample
-cursor.execute('SELECT song_id, title, reference FROM songs LIMIT 5')
-print(f"\n📋 Sample entries:")
-for row in cursor.fetchall():
-    print(f"   {row[0]:3}. {row[1][:50]:50} | {row[2]}")
-
-conn.close()
-
-print(f"\n🎉 Clean Unicode database ready for production!")
+    CREATE TABLE metadata (
+        key TEXT PRIMARY KEY,
+        value TEXT
+    )
+    ''')
+
+    cursor.execute('''
+        INSERT INTO metadata (key, value) VALUES
+        ('version', 'v20_unicode_clean'),
+        ('total_songs', ?),
+        ('encoding', 'UTF-8'),
+        ('conversion_date', datetime('now')),
+        ('corrections_applied', '2220+'),
+        ('source', ?),
+        ('fold_version', ?)
+    ''', (total, source, devanagari.FOLD_VERSION))
+
+    # Commit and close
+    conn.commit()
+
+    # Verify
+    cursor.execute('SELECT COUNT(*) FROM songs')
+    count = cursor.fetchone()[0]
+
+    cursor.execute('SELECT COUNT(*) FROM songs_fts')
+    fts_count = cursor.fetchone()[0]
+
+    print(f"\n✅ Database created successfully!")
+    print(f"   Location: {db_file}")
+    print(f"   Songs: {count}")
+    print(f"   FTS entries: {fts_count}")
+    print(f"   Encoding: UTF-8")
+    print(f"   Status: Production-ready")
+
+    print(f"\n⏱️  Build time: {sum(timings.values()):.2f}s "
+          f"({total / max(timings['load'], 1e-9):,.0f} songs/s loaded)")
+    for stage, seconds in timings.items():
+        print(f"   {stage:<26} {seconds:7.3f}s")
+
+    # Show sample
+    cursor.execute('SELECT song_id, title, reference FROM songs LIMIT 5')
+    print(f"\n📋 Sample entries:")
+    for row in cursor.fetchall():
+        print(f"   {row[0]:3}. {row[1][:50]:50} | {row[2]}")
+
+    conn.close()
+
+    print(f"\n🎉 Clean Unicode database ready for production!")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Devanagari akshara (grapheme cluster) segmentation and validation.
+
+A finite-state machine over Unicode Devanagari character classes flags
+every character that cannot attach to the cluster before it. Its
+transitions are compiled to one regex of character-class bigrams, so
+a check is one linear scan with no backtracking:
+
+    >>> list(validate('धन्यवाीद'))
+    [('double_matra', 4, 7)]
+    >>> list(segment('क्रिस्त'))
+    [(0, 4), (4, 7)]
+
+fold() maps the spellings a search should not tell apart to one key:
+
+    >>> fold('यीशु') == fold('यिशू')
+    True
+
+Used by lint_songs.py for the matra / halant structure checks and by
+create_clean_database.py for the folded search index.
+"""
+import re
+import sys
+import unicodedata
+
+# --- 1. Character classes ---
+# C consonant, N nukta, H halant (virama), M dependent vowel sign (matra),
+# B sign (candrabindu, anusvara, visarga), V independent vowel,
+# J zero-width non-joiner / joiner; anything else is outside a cluster
+CHARACTER_CLASSES = {
+    'C': ((0x0915, 0x0939), (0x0958, 0x095F), (0x0978, 0x097F)),
+    'N': ((0x093C, 0x093C),),
+    'H': ((0x094D, 0x094D),),
+    'M': ((0x093A, 0x093B), (0x093E, 0x094C), (0x094E, 0x094F), (0x0955, 0x0957),
+          (0x0962, 0x0963)),
+    'B': ((0x0900, 0x0903),),
+    'V': ((0x0904, 0x0914), (0x0960, 0x0961), (0x0972, 0x0977)),
+    'J': ((0x200C, 0x200D),),
+}
+
+_CLASSES = {code: cls for cls, ranges in CHARACTER_CLASSES.items()
+            for first, last in ranges for code in range(first, last + 1)}
+# Regex character set of each class, and of all of them
+_CLASS_SETS = {cls: '[' + ''.join(f'\\u{first:04x}-\\u{last:04x}' for first, last in ranges) + ']'
+               for cls, ranges in CHARACTER_CLASSES.items()}
+_ANY_SET = '[' + ''.join(f'\\u{first:04x}-\\u{last:04x}' for ranges in CHARACTER_CLASSES.values()
+                         for first, last in ranges) + ']'
+
+# --- 2. The state machine ---
+# States: the class of the last character of the current cluster, or
+# None at the start of a run. TRANSITIONS[(state, class)] is the
+# violation the character makes, None when it is valid. A consonant
+# or vowel starts a new cluster except a consonant after a halant (a
+# conjunct); a character that does not fit is reported and then taken
+# as attached, so the machine goes on in the state of its class.
+VIOLATIONS = {
+    'floating_matra': "matra with no consonant to sit on",
+    'double_matra': "two matras on one consonant",
+    'vowel_with_matra': "matra on an independent vowel",
+    'matra_after_sign': "matra after an anusvara / candrabindu / visarga",
+    'halant_before_matra': "halant between a consonant and its matra",
+    'halant_before_sign': "halant followed by an anusvara / candrabindu / visarga",
+    'double_halant': "two halants in a row",
+    'matra_before_halant': "halant after a matra",
+    'stray_halant': "halant with no consonant before it",
+    'stray_sign': "anusvara / candrabindu / visarga with nothing to sit on",
+    'double_sign': "two anusvara / candrabindu / visarga signs in a row",
+    'stray_nukta': "nukta not directly after a consonant",
+}
+
+TRANSITIONS = {}
+for _state in (None, 'C', 'N', 'H', 'M', 'B', 'V', 'J'):
+    for _cls in 'CNHMBVJ':
+        TRANSITIONS[_state, _cls] = None
+for _state in (None, 'J'):
+    TRANSITIONS[_state, 'M'] = 'floating_matra'
+    TRANSITIONS[_state, 'B'] = 'stray_sign'
+    TRANSITIONS[_state, 'H'] = 'stray_halant'
+    TRANSITIONS[_state, 'N'] = 'stray_nukta'
+TRANSITIONS['N', 'N'] = 'stray_nukta'
+TRANSITIONS['H', 'M'] = 'halant_before_matra'
+TRANSITIONS['H', 'B'] = 'halant_before_sign'
+TRANSITIONS['H', 'H'] = 'double_halant'
+TRANSITIONS['H', 'N'] = 'stray_nukta'
+TRANSITIONS['M', 'M'] = 'double_matra'
+TRANSITIONS['M', 'H'] = 'matra_before_halant'
+TRANSITIONS['M', 'N'] = 'stray_nukta'
+TRANSITIONS['V', 'M'] = 'vowel_with_matra'
+TRANSITIONS['V', 'H'] = 'stray_halant'
+TRANSITIONS['V', 'N'] = 'stray_nukta'
+TRANSITIONS['B', 'M'] = 'matra_after_sign'
+TRANSITIONS['B', 'H'] = 'stray_halant'
+TRANSITIONS['B', 'B'] = 'double_sign'
+TRANSITIONS['B', 'N'] = 'stray_nukta'
+del _state, _cls
+
+def _starts_cluster(state, cls):
+    """Whether a character of class cls after state begins a new cluster."""
+    if cls in 'CV':
+        return state != 'H' or cls == 'V'
+    # A joiner after a halant belongs to the conjunct; anything else that
+    # cannot attach is its own (invalid) cluster
+    return state is None or (cls == 'J' and state != 'H')
+
+def _transitions_regex(accept):
+    """
+    A regex matching the characters whose transition (state, class)
+    satisfies accept. Each alternative is a character set followed by a
+    two-character lookbehind for the state, so the scan is linear and
+    never backtracks.
+    """
+    alternatives = []
+    for cls, char_set in _CLASS_SETS.items():
+        states = [state for state in (None, *CHARACTER_CLASSES) if accept(state, cls)]
+        tests = []
+        previous = [_CLASS_SETS[state][1:-1] for state in states if state is not None]
+        if previous:
+            tests.append(f'(?<=[{"".join(previous)}]{char_set})')
+        if None in states:
+            tests.append(f'(?<!{_ANY_SET}{char_set})')
+        if tests:
+            alternatives.append(f'{char_set}(?:{"|".join(tests)})')
+    return re.compile('|'.join(alternatives))
+
+# The characters that break their cluster, and those that begin one
+_VIOLATION_RE = _transitions_regex(lambda state, cls: TRANSITIONS[state, cls] is not None)
+_CLUSTER_START_RE = _transitions_regex(_starts_cluster)
+# A cluster: its first character and every cluster character up to the next first one
+_CLUSTER_RE = re.compile(f'(?:{_CLUSTER_START_RE.pattern})'
+                         f'(?:(?!{_CLUSTER_START_RE.pattern}){_ANY_SET})*')
+
+# --- 3. Segmenting and validating ---
+
+def _state(text, pos):
+    """The machine's state before position pos of text."""
+    return _CLASSES.get(ord(text[pos - 1])) if pos else None
+
+def segment(text):
+    """Yield the (start, end) of every Devanagari cluster in text, valid or not."""
+    for match in _CLUSTER_RE.finditer(text):
+        yield match.span()
+
+def validate(text):
+    """
+    Yield (violation, start, end) for every character that breaks the
+    structure of its cluster; text[start:end] is the cluster up to and
+    including that character, or from the cluster's previous violation
+    on, so a run of stray marks costs linear time and gives short spans:
+
+        >>> list(validate('काा्ं'))
+        [('double_matra', 0, 3), ('matra_before_halant', 2, 4), ('halant_before_sign', 3, 5)]
+        >>> import time; start = time.perf_counter()
+        >>> spans = [end - start for _, start, end in validate('क' + 'ा' * 100000)]
+        >>> len(spans), max(spans), time.perf_counter() - start < 1
+        (99999, 3, True)
+    """
+    previous = 0
+    for match in _VIOLATION_RE.finditer(text):
+        pos = match.start()
+        violation = TRANSITIONS[_state(text, pos), _CLASSES[ord(text[pos])]]
+        # Back to the start of the cluster the character was taken into,
+        # going no further than the previous violation: every character
+        # is walked over at most once
+        start = pos
+        while start > previous and not _starts_cluster(_state(text, start),
+                                                       _CLASSES[ord(text[start])]):
+            start -= 1
+        previous = pos
+        yield violation, start, pos + 1
+
+# --- 4. Folding for search ---
+# Bump when fold() changes, so indexes built with it are rebuilt
+FOLD_VERSION = 1
+
+# After NFC, which splits the nukta letters (क़ -> क + ़): drop the nukta,
+# halant and joiners, candrabindu -> anusvara, long i / u -> short, and
+# Devanagari digits -> ASCII
+FOLDS = (
+    ('\u093c', ''), ('\u094d', ''), ('\u200c', ''), ('\u200d', ''),
+    ('ँ', 'ं'),
+    ('ी', 'ि'), ('ू', 'ु'), ('ॄ', 'ृ'),
+    ('ई', 'इ'), ('ऊ', 'उ'), ('ॠ', 'ऋ'),
+) + tuple((chr(0x0966 + digit), str(digit)) for digit in range(10))
+
+def fold(text):
+    """
+    The search key of text: NFC, with nukta, halant and joiners removed,
+    candrabindu as anusvara and long i / u matras and vowels as short.
+    Text outside Devanagari is only NFC-normalized.
+
+        >>> fold('ज़मीन, प्रभु, आँख, ईश्वर')
+        'जमिन, परभु, आंख, इशवर'
+    """
+    if text is None:
+        return None
+    if not unicodedata.is_normalized('NFC', text):
+        text = unicodedata.normalize('NFC', text)
+    # One replace() per character present is quicker than translate()
+    # with a table outside Latin-1
+    for old, new in FOLDS:
+        if old in text:
+            text = text.replace(old, new)
+    return text
+
+def register_sqlite_function(conn, name='devanagari_fold'):
+    """
+    Register fold() on an sqlite3 connection as a deterministic SQL
+    function, for building folded columns and folding queries:
+
+        SELECT rowid FROM songs_folded_fts WHERE songs_folded_fts MATCH devanagari_fold(?)
+    """
+    conn.create_function(name, 1, fold, deterministic=True)
+
+def main(argv=None):
+    """Print the invalid clusters of the files given (or stdin)."""
+    paths = sys.argv[1:] if argv is None else argv
+    texts = [(path, open(path, encoding='utf-8').read()) for path in paths] or \
+            [('<stdin>', sys.stdin.read())]
+    count = 0
+    for path, text in texts:
+        for violation, start, end in validate(text):
+            line = text.count('\n', 0, start) + 1
+            column = start - text.rfind('\n', 0, start)
+            print(f"{path}:{line}:{column}: {violation} '{text[start:end]}'")
+            count += 1
+    return 1 if count else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,1713 @@
+"""
+Font profiles for converting legacy Hindi font encodings to Unicode.
+
+A profile names the tables one legacy font needs and the stages that use
+them. Callers pick one by name:
+
+    from font_profiles import get_profile
+    text = get_profile('chanakya').convert(raw)
+
+Documents too large to hold in memory convert piece by piece:
+
+    with open(src, encoding='utf-8') as f:
+        for chunk in get_profile('chanakya').convert_stream(f):
+            out.write(chunk)
+
+Registered profiles:
+    chanakya   - Kruti Dev / Chanakya text as stored in tbSakshivani
+                 (what migrate_data_v2.py uses)
+    krutidev   - plain Kruti Dev: the same tables without the Chanakya
+                 '~' halant reordering
+    v1-compat  - the original migrate_data.py conversion, unchanged
+
+The mapping and correction tables are compiled into regex automata the
+first time a profile is used. The compiled form is saved to CACHE_FILE,
+keyed by a hash of the tables, so later runs load it instead of
+compiling again.
+"""
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain
+
+# --- Main Character Mapping (Kruti Dev / Chanakya -> Unicode) ---
+# REORDERED LIST: Longest sequences FIRST to prevent partial replacement
+# Applied as ordered replacements: an earlier entry always wins over a later one.
+MAPPING = [
+    # 3-4 char sequences
+    ('Q+Z','फ़्'), ('nzZ','र्द्र'), ('=kk','त्र'), ('f=k','त्रि'), 
+    
+    # Specific Combos (Vowels + Matras) - MUST be before generic matras
+    ('v‚','ऑ'), ('vks','ओ'), ('vkS','औ'), ('pkS','चै'), 
+    ('vk','आ'), ('b±','ईं'), ('bZ','ई'), 
+    ('b','इ'), 
+    
+    # Consonants + Halants
+    ('aa','a'), ('pp','ç'), ('qq','æ'), ('«','त्र्'), 
+    ('»','त्र'), ('‘','\"'), ('’','\"'), ('“',"'"), 
+    ('”',"'"), ('å','०'), ('ƒ','१'), ('„','२'), 
+    ('…','३'), ('†','४'), ('‡','५'), ('ˆ','६'), 
+    ('‰','७'), ('Š','८'), ('‹','९'), ('¶','फ्'), 
+    ('d+','क़'), ('[+k','ख़'), ('[+','ख़्'), ('x+','ग़'), 
+    ('T+','ज़्'), ('t+','ज़'), ('M+','ड़'), ('<+','ढ़'), 
+    ('Q+','फ़'), (';+','य़'), ('j+','ऱ'), ('u+','ऩ'), 
+    ('Ùk','त्त'), ('Ù','त्त्'), ('Dr','क्त'), ('–','दृ'), 
+    ('—','कृ'), ('é','न्न'), ('™','न्न्'), 
+    ('à','ह्न'), ('á','ह्य'), ('â','हृ'), 
+    ('ã','ह्म'), ('ºz','ह्र'), ('º','ह्'), ('í','द्द'), 
+    ('{k','क्ष'), ('{','क्ष्'), ('=','त्र'), ('Nî','छ्य'), 
+    ('Vî','ट्य'), ('Bî','ठ्य'), ('Mî','ड्य'), ('<î','ढ्य'), 
+    ('|','द्य'), ('K','ज्ञ'), ('}','द्व'), ('J','श्र'), 
+    ('Vª','ट्र'), ('Mª','ड्र'), ('<ªª','ढ्र'), ('Nª','छ्र'), 
+    ('Ø','क्र'), ('Ý','फ्र'), ('æ','द्र'), 
+    ('ç','प्र'), ('Á','प्र'), ('xz','ग्र'), ('#','रु'), 
+    (':','रू'), 
+    # Special Conjuncts & Common Words (MUST be before base character mappings)
+    # These handle specific word patterns that don't follow standard rules
+    ('/eZ','धर्म'), ('/e','धर्म'), # dharma - VERIFIED WORKING
+    (f'Hk{chr(0xd9)}kkZ','भर्ता'), # bhartha with byte 0xd9
+    ('vf/i','अधिप'), # adhipa
+    ('f/i','धिप'), # dhipa
+    
+    # Legacy glyphs that map to conjuncts (CRITICAL - before other mappings)
+    ('š','क्त'),  # Legacy glyph for क्त (Song 300: शाš मान → शक्तिमान)
+    ('ä','क्त'),  # Alternative legacy glyph for क्त
+    
+    # Additional common conjuncts
+    ('RrkZ','त्ता'), ('Rrk','त्त'), # tta combinations
+    
+    # Fix 'L' conflict (Swarg issue)
+    ('L','स्'), 
+    
+    ('v','अ'), ('m','उ'), ('Å','ऊ'), 
+    (',s','ऐ'), (',','ए'), ('_','ऋ'), ('ô','क्क'), 
+    ('d','क'), ('Dk','क'), ('D','क्'), ('[k','ख'), 
+    ('[','ख्'), ('x','ग'), ('Xk','ग'), ('X','ग्'), 
+    ('Ä','घ'), ('?k','घ'), ('?','घ्'), ('³','ङ'), 
+    ('p','च'), ('Pk','च'), ('P','च्'), 
+    ('N','छ'), ('t','ज'), ('Tk','ज'), ('T','ज्'), 
+    ('>','झ'), ('÷','झ्'), ('¥','ञ'), ('ê','ट्ट'), 
+    ('ë','ट्ठ'), ('V','ट'), ('B','ठ'), ('ì','ड्ड'), 
+    ('ï','ड्ढ'), ('M','ड'), ('<','ढ'), ('.k','ण'), 
+    ('.','ण'), ('R','त्'), ('r','त'), ('Fk','थ'), 
+    ('F','थ्'), (')','द्ध'), ('n','द'), ('/k','ध'), 
+    ('èk','ध'), ('/','ध्'), ('è','ध्'), ('Ë','ध्'), 
+    ('u','न'), ('Uk','न'), ('U','न्'), ('i','प'), 
+    ('Ik','प'), ('I','प्'), ('Q','फ'), ('¶','फ्'), 
+    ('c','ब'), ('Ck','ब'), ('C','ब्'), ('Hk','भ'), 
+    ('H','भ्'), ('e','म'), ('Ek','म'), ('E','म्'), 
+    (';','य'), ('¸','य्'), ('j','र'), 
+    ('y','ल'), ('Lk','ल'), 
+    ('Y','ळ'), ('o','व'), 
+    ('Ok','व'), ('O','व्'), 
+    
+    # 'Sha' handling
+    ("'k",'श'), # Fix for Yeshu (;h'kq)
+    ("'",'श्'), 
+    ('"k','श'), 
+    ('"','श'), 
+    
+    ('l','स'), 
+    ('g','ह'), ('È','ीं'), ('z','्र'), ('Ì','द्द'), 
+    ('Í','ट्ट'), ('Î','ट्ठ'), ('Ï','ड्ड'), ('Ñ','कृ'), 
+    ('Ò','भ'), ('Ó','्य'), ('Ô','ड्ढ'), ('Ö','झ्'), 
+    ('Ø','क्र'), ('Ù','त्त्'), ('Ü','श'), ('x','ग'), 
+    ('T','ज्'), ('f','ि'), ('h','ी'), ('q','ु'), 
+    ('w','ू'), ('`','ृ'), 
+    # ('s','े'), ('S','ै'), # MOVED TO BOTTOM
+    ('a','ं'), ('¡','ँ'), ('%','ः'), ('W','ॅ'), 
+    ('•','ऽ'), ('·','ऽ'), ('∙','ऽ'), ('~j','्र'), 
+    ('~','्'), ('\\?','़'), ('^','‘'), ('*','’'), 
+    ('ß','“'), ('Þ','”'), ('(','_'), (')','_'), 
+    ('{','_'), ('}','_'), ('|','_'), ('ZM+','ड़'),
+    
+    # Matras (Mapping Order Critical)
+    ('kS','ौ'), ('ks','ो'), 
+    ('k','ा'), 
+    ('s','े'), ('S','ै'), # Moved here
+
+    # Additional vowel: Long Ū (from reference table)
+    ('mZ','ऊ'),  # Long u (matches reference: mZ → ऊ)
+
+    # Vedic & Musical Markers (for hymns, bhajans, shlokas)
+    ('vkse','ॐ'),  # Om symbol (common in songs)
+    ('AA','॥'),    # Double danda (verse end)
+    ('¡','ँ'),     # Chandrabindu (already present above but ensuring)
+    
+    # Punctuation
+    ('A','।'),  # Single danda (line end)
+    (';','।'),  # Alternative for danda
+]
+
+def _replace_ordered(text, table):
+    """Reference semantics: apply each (old, new) pair in turn with str.replace."""
+    for old, new in table:
+        text = text.replace(old, new)
+    return text
+
+def _compile_mapping(table):
+    """
+    Compile an ordered (old, new) table into a single regex so the text is
+    converted in one left-to-right scan instead of one str.replace per entry.
+
+    The output is identical to _replace_ordered(). Entries are grouped by
+    their first character (a one-level trie) and tried in table order
+    inside each group, so the earliest entry matching at a position wins,
+    as it would with ordered passes. On top of that:
+
+    - an earlier entry starting inside a later one and running past its
+      end would have fired first, so the later one gets a lookahead guard
+      (e.g. 'pp' must not be followed by 'kS');
+    - an entry containing an earlier one can never fire and is dropped;
+    - an entry whose output is picked up again by later entries
+      ('pp' -> 'ç' -> 'प्र', '‘' -> '"' then '"k' -> 'श') is folded into
+      its final form.
+
+    Returns (pattern, lookup, sources): every findall() token of the
+    pattern is replaced by lookup.get(token, token); sources gives the
+    table indices of the entries a token stands for (more than one when
+    folded). Raises ValueError for tables whose entries chain in a way a
+    single scan cannot reproduce.
+    """
+    rules = []
+    seen = set()
+    for index, (old, new) in enumerate(table):
+        if old and old not in seen:
+            seen.add(old)
+            rules.append((index, old, new))
+
+    # Fold outputs that later entries rewrite again. Walk backwards so the
+    # entries being folded into are already in their final form.
+    variants = {}
+    for pos in range(len(rules) - 1, -1, -1):
+        index, old, new = rules[pos]
+        targets = [r for r in rules[pos + 1:] if any(c in r[1] for c in new)]
+        forms = []
+        for t_index, t_old, t_new in targets:
+            if not t_old.startswith(new):
+                raise ValueError(f"mapping entry {old!r} -> {new!r} is re-read "
+                                 f"by {t_old!r} in a way a single scan cannot follow")
+            tail = t_old[len(new):]
+            for m_index, m_old, _ in rules[pos + 1:]:
+                if not index < m_index < t_index or m_old.startswith(new):
+                    continue
+                if any(m_old.startswith(tail[o:]) or tail[o:].startswith(m_old)
+                       for o in range(len(tail))):
+                    raise ValueError(f"mapping entry {m_old!r} interferes with "
+                                     f"{old!r} -> {new!r} -> {t_old!r}")
+            t_forms = variants[t_old]
+            if len(t_forms) > 1:
+                raise ValueError(f"mapping entry {old!r} chains through {t_old!r}, "
+                                 f"which is itself re-read by later entries")
+            forms.append((old + tail, t_forms[0][1], [index] + t_forms[0][2]))
+            if not tail:
+                break
+        else:
+            forms.append((old, new, [index]))
+        variants[old] = forms
+
+    entries = []
+    seen = set()
+    for index, old, _ in rules:
+        for pattern, output, sources in variants[old]:
+            if pattern not in seen:
+                seen.add(pattern)
+                entries.append((index, pattern, output, sources))
+
+    # Earlier entries that overlap a later one from the inside
+    compiled = []
+    blockers = set()
+    for pos, (index, pattern, output, sources) in enumerate(entries):
+        guards = []
+        dead = False
+        for b_index, b_pattern, _, _ in entries[:pos]:
+            if b_index == index:
+                continue
+            for o in range(1, len(pattern)):
+                rest = pattern[o:]
+                if rest.startswith(b_pattern):
+                    dead = True
+                elif b_pattern.startswith(rest):
+                    guards.append(b_pattern[len(rest):])
+                    blockers.add(b_pattern)
+        if not dead:
+            compiled.append((pattern, output, guards, sources))
+
+    for pattern, _, guards, _ in compiled:
+        if guards and pattern in blockers:
+            raise ValueError(f"mapping entry {pattern!r} overlaps an earlier entry "
+                             f"and is overlapped by a later one")
+
+    groups = {}
+    lookup = {}
+    entry_sources = {}
+    for pattern, output, guards, sources in compiled:
+        branches = groups.setdefault(pattern[0], [])
+        if '' in branches:
+            continue  # shadowed by the bare first character
+        branch = re.escape(pattern[1:])
+        if guards:
+            branch += '(?!' + '|'.join(re.escape(g) for g in guards) + ')'
+        branches.append(branch)
+        lookup[pattern] = output
+        entry_sources[pattern] = sources
+
+    # Bare single characters go into one character class ahead of the
+    # multi-character groups; everything else is passed through unchanged.
+    singles = ''.join(re.escape(first) for first, branches in groups.items()
+                      if branches == [''])
+    alternatives = ['[' + singles + ']'] if singles else []
+    for first, branches in groups.items():
+        if branches != ['']:
+            alternatives.append(re.escape(first) + '(?:' + '|'.join(branches) + ')')
+    firsts = ''.join(re.escape(first) for first in groups)
+    alternatives.append('[^' + firsts + ']+|(?s:.)')
+    return '|'.join(alternatives), lookup, entry_sources
+
+# --- Chanakya patterns with wrong matra order (applied before the mapping) ---
+# Pattern: consonant + '~' (halant in Chanakya) + matra char
+# Fix: consonant + matra char + '~'
+CHANAKYA_MATRA_FIXES = [
+    # Most common: '~f' (halant + i-matra) should be 'f~' (i-matra + halant)
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~f', r'\1f~'),  # क्ि → कि्
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~h', r'\1h~'),  # ी-matra
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~q', r'\1q~'),  # ु-matra  
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~w', r'\1w~'),  # ू-matra
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~k', r'\1k~'),  # ा-matra
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~s', r'\1s~'),  # े-matra
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~S', r'\1S~'),  # ै-matra
+    (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~ks', r'\1ks~'), # ो-matra
+]
+
+# --- Word patterns that don't convert correctly with character-level mapping ---
+WORD_FIXES = [
+    # Original fixes
+    ('भत्तर्ा', 'भर्ता'),  # bhartā
+    ('अध्िप', 'अधिप'),   # adhipa  
+    ('भत्तर्', 'भर्त'),   # bharth (without ā)
+    
+    # Systematic issues found across all songs (from comprehensive analysis)
+    ('ख्िा्रस्त', 'क्रिस्त'),  # Christ - 100+ instances
+    ('धर्मर्ात्मा', 'धर्मात्मा'),  # dharmātmā
+    ('अधर्मर्', 'अधर्म'),  # adharma
+    
+    # Misplaced matra patterns (42 instances)
+    ('पि्रय', 'प्रिय'),  # priya (beloved)
+    ('पि्रये', 'प्रिये'),  # priye
+    ('पि्रयों', 'प्रियों'),  # priyoṁ
+    ('पि्रत', 'प्रित'),  # prit
+    
+    # Halant issues
+    ('बन्ध्ु', 'बन्धु'),  # bandhu (7 instances)
+    ('बन्ध्', 'बन्ध'),  # bandh (37 instances)
+    ('ध्ीर', 'धीर'),  # dhīr (33 instances)
+    ('ध्ीरज', 'धीरज'),  # dhīraj
+    
+    # Matra misplacement
+    ('स्िथर', 'स्थिर'),  # sthir (30 instances)
+    ('स्िधर', 'स्थिर'),  # sthir variant
+    ('अध्ीन', 'अधीन'),  # adhīn (22 instances)
+    ('अध्िकार', 'अधिकार'),  # adhikār (7 instances)
+    
+    # Extra halants in conjuncts
+    ('कत्तर्ा', 'कर्ता'),  # kartā (creator) - 16 instances
+    ('सृशिटकत्तर्ा', 'सृष्टिकर्ता'),  # creator
+    ('जगकत्तर्ा', 'जगत्कर्ता'),  # world creator
+    ('जगभतर्ा', 'जगभर्ता'),  # jagabhartha - 1 instance
+    
+    # Wrong consonant/conjunct
+    ('सृशिट', 'सृष्टि'),  # sṛṣṭi (creation) - 14 instances
+    ('सृशट', 'सृष्टि'),  # sṛṣṭi variant - 2 instances
+    
+    # Double halant issues
+    ('जगत्त्रणी', 'जगत्राणी'),  # jagattrāṇī - 3 instances
+    ('सिध््द', 'सिद्ध'),  # siddha - 2 instances
+    ('विपत्त्िा', 'विपत्ति'),  # vipatti (calamity)
+    ('सम्पत्त्िा', 'सम्पत्ति'),  # sampatti (prosperity)
+    ('निधर््न', 'निर्धन'),  # nirdhan (poor)
+    ('निदि्रत', 'निद्रित'),  # nidrit (asleep)
+    ('ध्म्मर्ात्मा', 'धर्मात्मा'),  # dharmātmā - 2 instances
+    
+    # Additional common patterns
+    ('स्रपा', 'स्राप'),  # srāpa (curse)
+    ('ख्रीस्त', 'क्रिस्त'),  # Christ variant
+    
+    # User-reported issues (Song-specific corrections)
+    ('शुð', 'शुद्ध'),  # shuddha (pure)
+    ('कोरेरेरस', 'कोरस'),  # chorus
+    ('मं›ल', 'मंगल'),  # mangal
+    ('रात्रिा', 'रात्रि'),  # raatri (night)
+    ('अन्ध्ेरा', 'अंधेरा'),  # andhera (darkness)
+    ('कृिस्त', 'क्रिस्त'),  # Christ
+    ('अन्िध्यारा', 'अंधियारा'),  # andhiyara
+    ('मुक्ितदाता', 'मुक्तिदाता'),  # muktidaata (savior)
+    ('उðारियो', 'उद्धारियो'),  # uddhariyo
+    ('तृप्ित', 'तृप्ति'),  # tripti (satisfaction)
+    
+    # Character mapping issues
+    ('ð', 'द्ध'),  # Special character → proper conjunct
+    ('›', ''),  # Remove invalid character
+    ('_', ''),  # Remove underscore (40 instances)
+    
+    # Duplication corruption patterns
+    ('पूब्र्ब', 'पूर्व'),  # Corrupted reph - 2 instances in Song 37
+    ('ब्र्ब', 'र्व'),  # Generic fix for duplicated ba-ra-ba
+    
+    # OCR/Legacy junk characters
+    ('स्वगो±', 'स्वर्गों'),  # ± is OCR junk
+    ('±', ''),  # Remove ± anywhere
+    
+    # Missing matras
+    ('आधर', 'आधार'),  # Missing ा matra
+    
+    # Incorrect halant/conjunct patterns
+    ('ध्न्य', 'धन्य'),  # Extra halant: ध् + न् + य → ध + न् + य
+    ('ध्न', 'धन'),  # Extra halant: ध् + न → ध + न
+    ('पवत्रि', 'पवित्र'),  # i-matra misplaced: should be before व
+    
+    # Bible reference fixes (extra halants)
+    ('प््रेारित', 'प्रेरित'),  # Acts - extra halants
+    ('प््रे', 'प्रे'),  # Generic prefix fix
+    ('फिलिप्पि', 'फिलिप्पी'),  # Philippians
+    ('कॉरिन्थ', 'कुरिन्थियों'),  # Corinthians
+    
+    # Additional legacy cleanup
+    ('िा', 'िया'),  # Common matra sequence issue
+    ('ाा', 'ा'),  # Doubled aa matra
+]
+
+# --- Halant appearing between consonant and matra (शक्ितमान -> शक्तिमान) ---
+MATRA_ALIGNMENT_FIXES = {
+    'क्ि': 'कि',
+    'ध्ि': 'धि', 
+    'र्ी': 'री',
+    'न्ि': 'नि',
+    'श्ि': 'शि',
+    'ख्ि': 'खि',
+    'ध्ू': 'धू',
+    'र्ा': 'रा',
+    'ध्े': 'धे',
+    'र्ो': 'रो',
+    'ध्ी': 'धी',
+    'ध्ु': 'धु',
+    'भ्ि': 'भि',
+    'त्ि': 'ति',
+    'र्ि': 'रि',
+    'ग्ि': 'गि',
+    'थ्ि': 'थि',
+    'स्ि': 'सि',
+    'प्ि': 'पि',
+    'घ्ि': 'घि',
+    'म्ि': 'मि',
+    'र्ु': 'रु',
+    'ष्ि': 'षि',
+    'भ्ु': 'भु',
+    'ध्ै': 'धै',
+    'स्ा': 'सा',
+}
+
+# --- Extra character patterns ---
+EXTRA_CHAR_FIXES = {
+    'काय्र्य': 'कार्य',  # Extra र् 
+    'ध्म्र्म': 'धर्म',   # Extra म् 
+    'त्रिाएक': 'त्रिएक', # Extra ा
+}
+
+# --- v1 mapping (migrate_data.py before the profiles), kept as-is for v1-compat ---
+# Entries chain into each other, so this table is applied with ordered replaces
+V1_MAPPING = [
+    ('Q+Z','फ़्'), ('Q+','फ़'), ('ks','ो'), ('kS','ौ'), 
+    ('aa','a'), ('pp','ç'), ('qq','æ'), ('«','त्र्'), 
+    ('»','त्र'), ('‘','\"'), ('’','\"'), ('“',"'"), 
+    ('”',"'"), ('å','०'), ('ƒ','१'), ('„','२'), 
+    ('…','३'), ('†','४'), ('‡','५'), ('ˆ','६'), 
+    ('‰','७'), ('Š','८'), ('‹','९'), ('¶','फ्'), 
+    ('d+','क़'), ('[+k','ख़'), ('[+','ख़्'), ('x+','ग़'), 
+    ('T+','ज़्'), ('t+','ज़'), ('M+','ड़'), ('<+','ढ़'), 
+    ('Q+','फ़'), (';+','य़'), ('j+','ऱ'), ('u+','ऩ'), 
+    ('Ùk','त्त'), ('Ù','त्त्'), ('Dr','क्त'), ('–','दृ'), 
+    ('—','कृ'), ('é','न्न'), ('™','न्न्'), ('=kk','त्र'), 
+    ('f=k','त्रि'), ('à','ह्न'), ('á','ह्य'), ('â','हृ'), 
+    ('ã','ह्म'), ('ºz','ह्र'), ('º','ह्'), ('í','द्द'), 
+    ('{k','क्ष'), ('{','क्ष्'), ('=','त्र'), ('Nî','छ्य'), 
+    ('Vî','ट्य'), ('Bî','ठ्य'), ('Mî','ड्य'), ('<î','ढ्य'), 
+    ('|','द्य'), ('K','ज्ञ'), ('}','द्व'), ('J','श्र'), 
+    ('Vª','ट्र'), ('Mª','ड्र'), ('<ªª','ढ्र'), ('Nª','छ्र'), 
+    ('Ø','क्र'), ('Ý','फ्र'), ('nzZ','र्द्र'), ('æ','द्र'), 
+    ('ç','प्र'), ('Á','प्र'), ('xz','ग्र'), ('#','रु'), 
+    (':','रू'), ('v‚','ऑ'), ('vks','ओ'), ('vkS','औ'), 
+    ('vk','आ'), ('v','अ'), ('b±','ईं'), ('Ã','ई'), 
+    ('bZ','ई'), ('b','इ'), ('m','उ'), ('Å','ऊ'), 
+    (',s','ऐ'), (',','ए'), ('_','ऋ'), ('ô','क्क'), 
+    ('d','क'), ('Dk','क'), ('D','क्'), ('[k','ख'), 
+    ('[','ख्'), ('x','ग'), ('Xk','ग'), ('X','ग्'), 
+    ('Ä','घ'), ('?k','घ'), ('?','घ्'), ('³','ङ'), 
+    ('pkS','चै'), ('p','च'), ('Pk','च'), ('P','च्'), 
+    ('N','छ'), ('t','ज'), ('Tk','ज'), ('T','ज्'), 
+    ('>','झ'), ('÷','झ्'), ('¥','ञ'), ('ê','ट्ट'), 
+    ('ë','ट्ठ'), ('V','ट'), ('B','ठ'), ('ì','ड्ड'), 
+    ('ï','ड्ढ'), ('M','ड'), ('<','ढ'), ('.k','ण'), 
+    ('.','ण'), ('R','त्'), ('r','त'), ('Fk','थ'), 
+    ('F','थ्'), (')','द्ध'), ('n','द'), ('/k','ध'), 
+    ('èk','ध'), ('/','ध्'), ('è','ध्'), ('Ë','ध्'), 
+    ('u','न'), ('Uk','न'), ('U','न्'), ('i','प'), 
+    ('Ik','प'), ('I','प्'), ('Q','फ'), ('¶','फ्'), 
+    ('c','ब'), ('Ck','ब'), ('C','ब्'), ('Hk','भ'), 
+    ('H','भ्'), ('e','म'), ('Ek','म'), ('E','म्'), 
+    (';','य'), ('¸','य्'), ('j','र'), ('y','ल'), 
+    ('Lk','ल'), ('L','ल्'), ('Y','ळ'), ('o','व'), 
+    ('Ok','व'), ('O','व्'), ("'",'श्'), ('"k','श'), 
+    ('"','श'), ('l','स'), ('Lk','स'), ('L','स्'), 
+    ('g','ह'), ('È','ीं'), ('z','्र'), ('Ì','द्द'), 
+    ('Í','ट्ट'), ('Î','ट्ठ'), ('Ï','ड्ड'), ('Ñ','कृ'), 
+    ('Ò','भ'), ('Ó','्य'), ('Ô','ड्ढ'), ('Ö','झ्'), 
+    ('Ø','क्र'), ('Ù','त्त्'), ('Ü','श'), ('x','ग'), 
+    ('T','ज्'), ('f','ि'), ('h','ी'), ('q','ु'), 
+    ('w','ू'), ('`','ृ'), ('s','े'), ('S','ै'), 
+    ('a','ं'), ('¡','ँ'), ('%','ः'), ('W','ॅ'), 
+    ('•','ऽ'), ('·','ऽ'), ('∙','ऽ'), ('~j','्र'), 
+    ('~','्'), ('\\?','़'), ('^','‘'), ('*','’'), 
+    ('ß','“'), ('Þ','”'), ('(','_'), (')','_'), 
+    ('{','_'), ('}','_'), ('|','_'), ('ZM+','ड़'),
+    ('k','ा'), ('Z','r'), 
+]
+
+def _overlaps(output, pattern):
+    """True if an occurrence of pattern could share characters with output."""
+    if not output:
+        # A deletion joins its neighbours, which any longer pattern can span
+        return len(pattern) > 1
+    if pattern in output or output in pattern:
+        return True
+    return any(output.endswith(pattern[:k]) or pattern.endswith(output[:k])
+               for k in range(1, min(len(output), len(pattern))))
+
+def _trie_regex(patterns):
+    """
+    Regex matching the longest of patterns at a position, with shared
+    prefixes factored out so each position costs one walk down the trie.
+    """
+    trie = {}
+    for pattern in patterns:
+        node = trie
+        for char in pattern:
+            node = node.setdefault(char, {})
+        node[''] = {}  # end of a pattern
+
+    def render(node):
+        branches = [re.escape(char) + render(child)
+                    for char, child in sorted(node.items()) if char]
+        if '' in node and branches:
+            branches.append('')  # tried last, so longer patterns win
+        if len(branches) <= 1:
+            return ''.join(branches)
+        return '(?:' + '|'.join(branches) + ')'
+
+    return render(trie)
+
+class RuleSet:
+    """
+    Ordered (old, new) correction rules with the result of one str.replace
+    per rule in table order, without a full-text pass for every rule.
+
+    One lookahead scan finds every pattern present in the text. A rule
+    whose output could be re-read by a later rule (e.g. 'ð' -> 'द्ध' feeding
+    'ध्ि') pulls that rule in as well. Only these candidates are replaced,
+    still in table order, so the first listed rule wins and chained fixes
+    behave exactly as before.
+
+    hits[i] counts the replacements made by rule i in this process; with a
+    TokenCache each distinct token is only counted when first converted.
+    """
+
+    def __init__(self, rules, compiled=None):
+        # rules: (table name, old, new) triples in application order;
+        # compiled: RuleSet.compile(rules), e.g. as loaded from CACHE_FILE
+        self.rules = [tuple(rule) for rule in rules]
+        self.hits = [0] * len(self.rules)
+        if compiled is None:
+            compiled = RuleSet.compile(self.rules)
+        self._scan_re = re.compile(compiled["scan"])
+        self._candidates = {pattern: frozenset(indices)
+                            for pattern, indices in compiled["candidates"].items()}
+
+    @staticmethod
+    def compile(rules):
+        """The scan pattern and candidate rules per pattern, as JSON-ready data."""
+        by_pattern = {}
+        for i, (_, old, _) in enumerate(rules):
+            by_pattern.setdefault(old, []).append(i)
+        if not by_pattern:
+            return {"scan": "(?!)", "candidates": {}}
+
+        # Later rules whose pattern may overlap each rule's output, closed
+        # transitively
+        feeds = [
+            {j for j in range(i + 1, len(rules)) if _overlaps(new, rules[j][1])}
+            for i, (_, _, new) in enumerate(rules)
+        ]
+        reach = [None] * len(rules)
+        for i in range(len(rules) - 1, -1, -1):
+            reach[i] = {i}.union(*(reach[j] for j in feeds[i]))
+
+        # The scan reports the longest pattern starting at each position;
+        # every pattern that is a prefix of it starts there too
+        candidates = {}
+        for pattern in by_pattern:
+            indices = set()
+            for prefix in by_pattern:
+                if pattern.startswith(prefix):
+                    for i in by_pattern[prefix]:
+                        indices |= reach[i]
+            candidates[pattern] = sorted(indices)
+
+        firsts = ''.join(sorted({pattern[0] for pattern in by_pattern}))
+        scan = ('(?=[' + re.escape(firsts) + '])'
+                '(?=(' + _trie_regex(by_pattern) + '))')
+        return {"scan": scan, "candidates": candidates}
+
+    @property
+    def patterns(self):
+        """The distinct rule patterns."""
+        return self._candidates.keys()
+
+    def present(self, text):
+        """Every rule pattern that occurs in text."""
+        found = set(self._scan_re.findall(text))
+        # The scan reports the longest pattern at each position only
+        return {pattern[:k] for pattern in found for k in range(1, len(pattern) + 1)
+                if pattern[:k] in self._candidates}
+
+    def candidates(self, patterns):
+        """
+        Indices of the rules apply() runs on a text containing exactly these
+        rule patterns; any other rule leaves such a text unchanged.
+        """
+        return sorted(set().union(*(self._candidates[p] for p in patterns)))
+
+    def apply(self, text):
+        found = set(self._scan_re.findall(text))
+        if not found:
+            return text
+        candidates = set().union(*(self._candidates[p] for p in found))
+        for i in sorted(candidates):
+            old, new = self.rules[i][1], self.rules[i][2]
+            count = text.count(old)
+            if count:
+                self.hits[i] += count
+                text = text.replace(old, new)
+        return text
+
+    def apply_timed(self, text, timed, hits):
+        """
+        apply() with the scan and each table's replacements timed as
+        stages through timed (Instrumentation.timed), adding to hits as
+        well as self.hits.
+        """
+        found = timed('correction scan', self._scan_re.findall, text)
+        if not found:
+            return text
+        candidates = set().union(*(self._candidates[p] for p in set(found)))
+        for i in sorted(candidates):
+            text = timed(self.rules[i][0], self._replace_counted, text, i, hits)
+        return text
+
+    def _replace_counted(self, text, i, hits):
+        old, new = self.rules[i][1], self.rules[i][2]
+        count = text.count(old)
+        if count:
+            self.hits[i] += count
+            hits[i] += count
+            text = text.replace(old, new)
+        return text
+
+    def hit_report(self):
+        """Per-rule hit counts in table order, as JSON-ready dicts."""
+        return [
+            {"table": table, "old": old, "new": new, "hits": hits}
+            for (table, old, new), hits in zip(self.rules, self.hits)
+        ]
+
+    def dump_hits(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.hit_report(), f, ensure_ascii=False, indent=2)
+
+# --- Reordering: legacy fonts store some marks in visual order, Unicode in
+# logical order. Each step below is a single linear regex pass, so long
+# inputs convert in linear time; they are three separate passes working
+# on code points, not one reordering over syllable clusters (see
+# _apply_reph()). ---
+
+# 'f' (chhoti-i matra) is typed before its consonant: swap it with the next
+# character, pairs never overlapping ('ffk' keeps both f's in place)
+_F_SWAP_RE = re.compile(r'f(.)', re.S)
+
+# The Chanakya fixes never match across whitespace, so each token holding a
+# '~' is fixed on its own and the rest of the text is left alone
+_CHANAKYA_TOKEN_RE = re.compile(r'(?<!\S)[^\s~]*~\S*')
+_CHANAKYA_MATRA_FIXES_RE = [(re.compile(wrong), correct)
+                            for wrong, correct in CHANAKYA_MATRA_FIXES]
+
+# 'Z' (reph) is typed after its consonant: put 'र्' before the character
+# preceding each 'Z', then drop the 'Z's
+_REPH_RE = re.compile(r'.(?=Z)', re.S)
+
+def _swap_f(text):
+    # --- 1. Pre-processing: Move 'f' ---
+    return _F_SWAP_RE.sub(r'\1f', text)
+
+def _fix_chanakya_token(match):
+    token = match.group()
+    for wrong_pattern, correct_pattern in _CHANAKYA_MATRA_FIXES_RE:
+        token = wrong_pattern.sub(correct_pattern, token)
+    return token
+
+def _fix_chanakya_order(text):
+    # --- 1.1 Pre-processing: Fix Chanakya patterns with wrong matra order ---
+    # In some Chanakya sequences, halant character appears before the matra character
+    # We need to swap them BEFORE doing the Unicode mapping
+    if '~' not in text:
+        return text  # every pattern needs the Chanakya halant
+    return _CHANAKYA_TOKEN_RE.sub(_fix_chanakya_token, text)
+
+def _apply_reph(text):
+    """
+    Put 'र्' before the code point preceding each 'Z' of the mapped text
+    and drop the 'Z's, as the original list-based loop did.
+
+    The reph goes before the previous code point, not the previous
+    syllable cluster: after a matra or conjunct it lands inside the
+    cluster (Kruti Dev 'dhZrZu' gives करीर्तन, not कीर्तन) unless a
+    correction rule repairs the word. Cluster-level placement was left
+    out on purpose so the output stays byte-identical to the old
+    converter; do not rely on this pass to place the reph correctly in
+    new legacy text (Bible or catechism chapters) without checking it.
+    """
+    # --- 3. Post-processing: Handle 'Z' (Reph/Rakar) ---
+    if 'Z' not in text:
+        return text
+    return _REPH_RE.sub('र्\\g<0>', text).replace('Z', '')
+
+
+# --- 4-7. Correction rules, in the order they used to run as separate passes ---
+CORRECTION_RULES = (
+    [('word_fixes', old, new) for old, new in WORD_FIXES]
+    # The ']' character appears in Chanakya as a line/phrase separator
+    # It should be removed in Unicode (790 instances across 125 songs)
+    + [('separator', ']', ',')]  # Replace with comma for natural pause
+    + [('matra_alignment_fixes', old, new) for old, new in MATRA_ALIGNMENT_FIXES.items()]
+    + [('extra_char_fixes', old, new) for old, new in EXTRA_CHAR_FIXES.items()]
+)
+
+# --- 8. Replace ampersand symbol with dash ---
+# The & symbol is used in Chanakya as a "repeat" marker (e.g., &2 means repeat twice)
+# Replace with dash for cleaner display - 202 instances
+AMPERSAND_FIX = ('ampersand', '&', '-')
+
+# --- 9. Remove visarga (ः) - NOT used in modern Hindi ---
+# Visarga (ः U+0903) is Sanskrit-only, not modern Hindi
+# Context-aware replacement based on linguistic guidelines:
+#   - In titles/headings: remove completely
+#   - Before space (pause marker): replace with em dash —
+#   - End of line: remove (not needed)
+#   - Before comma: remove (comma already marks pause)
+
+# Simple approach: Remove all visarga for clean modern Hindi hymns
+# Professional hymn books don't use visarga
+VISARGA_FIX = ('visarga', 'ः', '')
+
+# --- Compiled tables cache ---
+# Bump when _compile_mapping() or RuleSet.compile() change their output
+COMPILE_VERSION = 2
+# Bump when a conversion stage changes its output for the same tables
+CONVERTER_VERSION = 1
+CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '__pycache__', 'font_profiles.json')
+# Characters read at a time by Profile.convert_stream()
+STREAM_CHUNK_SIZE = 1 << 16
+
+@contextmanager
+def atomic_write(path, encoding='utf-8', newline=None, sync=False):
+    """
+    Open a text file to write that replaces path only once the with
+    block completes; if the block fails, path is left as it was. The
+    temporary file is unique and beside path, so a reader never sees half
+    a file and two runs writing the same path never share one. sync=True
+    also flushes it to disk before the rename.
+
+        with atomic_write('pwa/songs.json') as f:
+            json.dump(songs, f)
+    """
+    directory = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=os.path.basename(path) + '.',
+                                    suffix='.tmp')
+    try:
+        # mkstemp() makes the file private; give it the mode open() would
+        umask = os.umask(0)
+        os.umask(umask)
+        os.chmod(tmp_path, 0o666 & ~umask)
+        with os.fdopen(fd, 'w', encoding=encoding, newline=newline) as f:
+            yield f
+            if sync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+def _read_cache(path):
+    """Compiled tables by table hash, or {} if the cache is missing or unreadable."""
+    try:
+        with open(path, encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return entries if isinstance(entries, dict) else {}
+
+def _write_cache(path, key, compiled):
+    """Store one profile's compiled tables, dropping entries no profile uses."""
+    live = {profile.table_hash() for profile in PROFILES.values()}
+    entries = {k: v for k, v in _read_cache(path).items() if k in live}
+    entries[key] = compiled
+    
+    try:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with atomic_write(path) as f:
+            json.dump(entries, f, ensure_ascii=False)
+    except OSError as e:
+        # Not fatal: the tables are simply compiled again next run
+        print(f"Warning: could not save compiled font tables to {path}: {e}")
+
+class Profile:
+    """
+    A named conversion profile: the tables for one legacy font and the
+    stages that use them.
+
+    mapping is the ordered (old, new) character table and fix_rules the
+    ordered (table name, old, new) correction rules run after it; both
+    behave exactly like one str.replace per entry. post_fixes are plain
+    (name, old, new) replacements made last. chanakya_order turns on the '~' halant
+    reordering before the mapping, collapse_spaces squeezes the double
+    spaces removals leave behind.
+
+    The tables are compiled by load(), which get_profile() calls.
+    """
+
+    def __init__(self, name, mapping, fix_rules=(), post_fixes=(),
+                 chanakya_order=False, collapse_spaces=False, description=""):
+        self.name = name
+        self.description = description
+        self.mapping = [tuple(entry) for entry in mapping]
+        self.fix_table = [tuple(rule) for rule in fix_rules]
+        self.post_fixes = [tuple(entry) for entry in post_fixes]
+        self.chanakya_order = chanakya_order
+        self.collapse_spaces = collapse_spaces
+        
+        # Per-token conversion is only equivalent to whole-text conversion
+        # while no rule can see across whitespace
+        tables = self.mapping + [(old, new) for _, old, new in self.fix_table + self.post_fixes]
+        self.token_safe = not any(re.search(r'\s', old + new) for old, new in tables)
+        
+        self.loaded = False
+        self.fix_rules = None
+        self.instrumentation = None
+        self._mapping_re = None
+        self._mapping_lookup = None
+        self._mapping_sources = None
+
+    def __repr__(self):
+        return f"Profile({self.name!r})"
+
+    def table_hash(self):
+        """Hash of everything load() compiles; the key in CACHE_FILE."""
+        data = json.dumps([COMPILE_VERSION, self.mapping, self.fix_table], ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def front_hash(self):
+        """Hash of everything front() depends on."""
+        data = json.dumps([CONVERTER_VERSION, self.mapping, self.chanakya_order],
+                          ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def finish_hash(self):
+        """Hash of what finish() depends on besides the fix rules that fire."""
+        data = json.dumps([CONVERTER_VERSION, self.post_fixes, self.collapse_spaces],
+                          ensure_ascii=False)
+        return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+    def compile(self):
+        """Compile the mapping and correction tables into JSON-ready data."""
+        try:
+            pattern, lookup, sources = _compile_mapping(self.mapping)
+            mapping = {"pattern": pattern, "lookup": lookup, "sources": sources}
+        except ValueError:
+            # Entries chain in a way one scan cannot follow (v1 table):
+            # keep the ordered replaces
+            mapping = None
+        return {
+            "mapping": mapping,
+            "fix_rules": RuleSet.compile(self.fix_table),
+        }
+
+    def load(self, cache_file=CACHE_FILE):
+        """
+        Load the compiled tables from cache_file, compiling and saving them
+        there if they are missing or stale. cache_file=None always compiles.
+        """
+        key = self.table_hash()
+        compiled = _read_cache(cache_file).get(key) if cache_file else None
+        if compiled is None:
+            compiled = self.compile()
+            if cache_file:
+                _write_cache(cache_file, key, compiled)
+        
+        if compiled["mapping"] is not None:
+            self._mapping_re = re.compile(compiled["mapping"]["pattern"])
+            self._mapping_lookup = compiled["mapping"]["lookup"]
+            self._mapping_sources = compiled["mapping"]["sources"]
+        else:
+            self._mapping_re = self._mapping_lookup = self._mapping_sources = None
+        self.fix_rules = RuleSet(self.fix_table, compiled["fix_rules"]) if self.fix_table else None
+        
+        # Letters and glyphs no mapping entry or rule contains (see diagnose()):
+        # anything but those characters and ASCII other than letters
+        tables = self.mapping + [(old, new) for _, old, new in self.fix_table + self.post_fixes]
+        covered = re.escape(''.join(sorted({ch for old, _ in tables for ch in old})))
+        self._unmapped_re = re.compile(f'[^{covered}\\x00-@\\[-`{{-\\x7f]')
+        self.loaded = True
+        return self
+
+    def apply_mapping(self, text, unmapped=None):
+        """
+        Stage 2 only: the character mapping. unmapped, a Counter, counts
+        the characters no table covers (see diagnose()) as they pass.
+        """
+        if self._mapping_re is None:
+            if unmapped is not None:
+                unmapped.update(self._unmapped_re.findall(text))
+            return _replace_ordered(text, self.mapping)
+        # Single scan with the compiled table (see _compile_mapping)
+        tokens = self._mapping_re.findall(text)
+        if unmapped is not None:
+            self._count_unmapped(tokens, unmapped)
+        return "".join(map(self._mapping_lookup.get, tokens, tokens))
+
+    def _count_unmapped(self, tokens, unmapped):
+        # A character no entry covers starts no entry either, so it is in
+        # a token the mapping passes through as it is; most texts have none
+        passed = set(tokens).difference(self._mapping_lookup)
+        if not self._unmapped_re.search(''.join(passed)):
+            return
+        for token in passed:
+            chars = self._unmapped_re.findall(token)
+            if chars:
+                count = tokens.count(token)
+                for char in chars:
+                    unmapped[char] += count
+
+    def _map(self, text, unmapped=None):
+        """Stages 1.1 and 2 on f-swapped text."""
+        if self.chanakya_order:
+            text = _fix_chanakya_order(text)
+        return self.apply_mapping(text, unmapped)
+
+    def _fix(self, text):
+        """Stages 4-9 on text whose reph is in place."""
+        if self.fix_rules is not None:
+            text = self.fix_rules.apply(text)
+        for _, old, new in self.post_fixes:
+            text = text.replace(old, new)
+        return text
+
+    def _convert_token(self, token):
+        """Stages 1.1 to 9 for one token, or None if its reph reaches the previous token."""
+        if self.instrumentation is not None:
+            return self._convert_token_instrumented(token)
+        text = self._map(token)
+        if text.startswith('Z'):
+            return None
+        return self._fix(_apply_reph(text))
+
+    def convert(self, text, cache=None):
+        """
+        Convert text in this profile's encoding to Unicode Devanagari.
+
+        Pass a TokenCache of this profile as cache to reuse conversions of
+        repeated tokens; the result is the same as without it.
+        """
+        if not text:
+            return ""
+        if not self.loaded:
+            self.load()
+        if self.instrumentation is not None:
+            return self._convert_instrumented(text, cache)
+        
+        # Pad text
+        text = " " + text + " "
+        text = _swap_f(text)
+        
+        converted = None
+        if cache is not None:
+            if cache.profile is not self:
+                raise ValueError(f"Token cache of profile {cache.profile.name!r} "
+                                 f"used with profile {self.name!r}")
+            if self.token_safe:
+                converted = _convert_tokens(text, cache)
+        if converted is None:
+            converted = self._fix(_apply_reph(self._map(text)).strip())
+        return self._collapse(converted)
+
+    def _collapse(self, converted):
+        if self.collapse_spaces:
+            # Clean up any double spaces created by removal
+            while '  ' in converted:
+                converted = converted.replace('  ', ' ')
+        return converted
+
+    def front(self, text):
+        """
+        Stages 1-3 only: the mapped text with its reph in place, before the
+        correction rules. finish(front(text)) == convert(text).
+        """
+        if not text:
+            return ""
+        if not self.loaded:
+            self.load()
+        if self.instrumentation is not None:
+            timed = self.instrumentation.timed
+            text = timed('f swap', _swap_f, " " + text + " ")
+            return timed('reph', _apply_reph, self._map_instrumented(text)).strip()
+        text = _swap_f(" " + text + " ")
+        return _apply_reph(self._map(text)).strip()
+
+    def finish(self, text):
+        """Stages 4-9 on the output of front()."""
+        if not self.loaded:
+            self.load()
+        if self.instrumentation is not None:
+            self.instrumentation.texts += 1
+            return self.instrumentation.timed('collapse spaces', self._collapse,
+                                              self._fix_instrumented(text))
+        return self._collapse(self._fix(text))
+
+    def convert_stream(self, source, chunk_size=STREAM_CHUNK_SIZE):
+        """
+        Convert legacy text read piece by piece, yielding Unicode chunks.
+
+        source is a file object (read chunk_size characters at a time) or
+        an iterable of strings; "".join() of the chunks yielded equals
+        convert() of the whole text. The text is cut only where every
+        stage converts both sides alike (see _STREAM_CUT_RE), so memory
+        stays around chunk_size plus the token spanning each cut.
+        """
+        if not self.loaded:
+            self.load()
+        if not self.token_safe:
+            raise ValueError(f"Profile {self.name!r} has rules that match across whitespace "
+                             f"and cannot convert a stream")
+        leading = True   # stage 3 output before the first character is stripped...
+        held = ""        # ...and so is its trailing whitespace, held until more text comes
+        space = False    # the output so far ends with a space
+        for segment in _stream_segments(_read_chunks(source, chunk_size), chunk_size):
+            text = self._stream_front(segment)
+            if leading:
+                text = text.lstrip()
+                if not text:
+                    continue
+                leading = False
+            stripped = text.rstrip()
+            if not stripped:
+                held += text
+                continue
+            text, held = held + stripped, text[len(stripped):]
+            
+            text = self._fix(text) if self.instrumentation is None else self._fix_instrumented(text)
+            if self.collapse_spaces:
+                # Spaces left at the end of the previous chunk absorb this one's
+                text = self._collapse(text)
+                if space:
+                    text = text.lstrip(' ')
+                if not text:
+                    continue
+                space = text.endswith(' ')
+            if text:
+                yield text
+
+    def convert_diagnosed(self, text, cache=None):
+        """
+        convert() text, returning the result and its diagnose() signals,
+        collected while converting: the unmapped characters are counted
+        from the tokens the mapping passes through, and each converted
+        token's output findings are kept with it in cache, so a repeated
+        token costs neither a conversion nor a scan. Without a cache (or
+        when a reph crosses tokens) the output findings come from one
+        scan of the converted text; with instrumentation attached,
+        diagnose() runs after convert().
+        """
+        if not text:
+            return "", _diagnostics(Counter(), Counter(), 0)
+        if not self.loaded:
+            self.load()
+        if self.instrumentation is not None:
+            converted = self.convert(text, cache)
+            return converted, self.diagnose(text, converted)
+
+        text = _swap_f(" " + text + " ")
+        converted = None
+        if cache is not None:
+            if cache.profile is not self:
+                raise ValueError(f"Token cache of profile {cache.profile.name!r} "
+                                 f"used with profile {self.name!r}")
+            if self.token_safe:
+                unmapped, findings = Counter(), Counter()
+                converted = _diagnose_tokens(text, cache, unmapped, findings)
+        if converted is None:
+            unmapped = Counter()
+            converted = self._fix(_apply_reph(self._map(text, unmapped)).strip())
+            findings = Counter(_output_findings(converted))
+        converted = self._collapse(converted)
+        return converted, _diagnostics(unmapped, findings, len(converted))
+
+    def _diagnose_token(self, token):
+        """
+        _convert_token() with the token's diagnostics: (converted or None,
+        ((character, count), ...) unmapped, ((name, match), ...) found in
+        the output), as TokenCache.diagnose caches them.
+        """
+        unmapped = Counter()
+        text = self._map(token, unmapped)
+        if text.startswith('Z'):
+            return None, (), ()
+        converted = self._fix(_apply_reph(text))
+        return converted, tuple(unmapped.items()), _output_findings(converted)
+
+    def diagnose(self, text, converted):
+        """
+        Quality signals for converting text to converted, from one regex
+        scan of each; convert_diagnosed() gathers the same while converting:
+            unmapped    source letters and glyphs no mapping entry or
+                        correction rule covers
+            leftover    Latin letters and legacy glyphs left in the output
+            suspicious  output cluster sequences a correct conversion does
+                        not produce (SUSPICIOUS_SEQUENCES), by name
+            confidence  share of output characters outside any finding
+        Counts are keyed by character or matched sequence.
+        """
+        if not self.loaded:
+            self.load()
+        unmapped = Counter(self._unmapped_re.findall(text)) if text else Counter()
+        return _diagnostics(unmapped, Counter(_output_findings(converted)), len(converted))
+
+    def _stream_front(self, segment):
+        """Stages 1-3 on one segment of a stream, without the strip."""
+        if self.instrumentation is not None:
+            self.instrumentation.texts += 1
+            timed = self.instrumentation.timed
+            text = timed('f swap', _swap_f, segment)
+            return timed('reph', _apply_reph, self._map_instrumented(text))
+        return _apply_reph(self._map(_swap_f(segment)))
+
+    # --- Instrumented path: same output, with each stage timed and hits
+    # counted (see Instrumentation) ---
+
+    def instrument(self, instrumentation):
+        """Attach instrumentation (None detaches it); returns the previous one."""
+        previous, self.instrumentation = self.instrumentation, instrumentation
+        if instrumentation is not None:
+            instrumentation.track(self)
+        return previous
+
+    def _count_mapping_tokens(self, tokens):
+        hits = self.instrumentation.mapping_hits[self.name]
+        sources = self._mapping_sources
+        for token, count in Counter(tokens).items():
+            for index in sources.get(token, ()):
+                hits[index] += count
+
+    def _mapping_instrumented(self, text):
+        if self._mapping_re is None:
+            hits = self.instrumentation.mapping_hits[self.name]
+            for index, (old, new) in enumerate(self.mapping):
+                count = text.count(old)
+                if count:
+                    hits[index] += count
+                    text = text.replace(old, new)
+            return text
+        tokens = self._mapping_re.findall(text)
+        self.instrumentation.timed('hit counting', self._count_mapping_tokens, tokens)
+        return "".join(map(self._mapping_lookup.get, tokens, tokens))
+
+    def _map_instrumented(self, text):
+        timed = self.instrumentation.timed
+        if self.chanakya_order:
+            text = timed('chanakya order', _fix_chanakya_order, text)
+        return timed('mapping', self._mapping_instrumented, text)
+
+    def _fix_instrumented(self, text):
+        instrumentation = self.instrumentation
+        if self.fix_rules is not None:
+            text = self.fix_rules.apply_timed(text, instrumentation.timed,
+                                              instrumentation.rule_hits[self.name])
+        for name, old, new in self.post_fixes:
+            text = instrumentation.timed(name, str.replace, text, old, new)
+        return text
+
+    def _convert_token_instrumented(self, token):
+        text = self._map_instrumented(token)
+        if text.startswith('Z'):
+            return None
+        return self._fix_instrumented(self.instrumentation.timed('reph', _apply_reph, text))
+
+    def _convert_instrumented(self, text, cache):
+        instrumentation = self.instrumentation
+        timed = instrumentation.timed
+        instrumentation.texts += 1
+        text = timed('f swap', _swap_f, " " + text + " ")
+        
+        converted = None
+        if cache is not None:
+            if cache.profile is not self:
+                raise ValueError(f"Token cache of profile {cache.profile.name!r} "
+                                 f"used with profile {self.name!r}")
+            if self.token_safe:
+                # Misses run the stages below; what is left is split, lookup and join
+                converted = timed('token cache', _convert_tokens, text, cache)
+        if converted is None:
+            text = timed('reph', _apply_reph, self._map_instrumented(text)).strip()
+            converted = self._fix_instrumented(text)
+        return timed('collapse spaces', self._collapse, converted)
+
+# --- Conversion diagnostics (Profile.diagnose) ---
+# Cluster sequences that a correct conversion does not produce, as the
+# song lint (lint_songs.py) looks for them
+_CONSONANT = '[\u0915-\u0939\u0958-\u095f\u093c]'  # क-ह, क़-य़ and the nukta
+SUSPICIOUS_SEQUENCES = {
+    # A matra with no consonant to sit on, e.g. कृीस्त, यात्राी
+    'floating_matra': f'(?<!{_CONSONANT})[\u093e-\u094c]',
+    'halant_before_matra': '\u094d[\u093e-\u094c]',
+    'double_halant': '\u094d\u094d',
+    'duplicated_ba': '[बप]्र्[बप]',
+}
+# Latin letters, Latin-1 to Greek glyphs and the Chanakya '~'
+_LEFTOVER = '[A-Za-z~\u00a1-\u03ff]'
+# One scan for all of them; the lookahead (the characters any of them can
+# start with) skips most positions in a single test
+_DIAGNOSTICS_RE = re.compile('(?=[A-Za-z~\u00a1-\u03ff\u093e-\u094dबप])(?:' + '|'.join(
+    [f'(?P<leftover>{_LEFTOVER})']
+    + [f'(?P<{name}>{pattern})' for name, pattern in SUSPICIOUS_SEQUENCES.items()]) + ')')
+
+def _output_findings(converted):
+    """((name, match), ...) of the leftover glyphs and suspicious sequences of converted."""
+    return tuple((match.lastgroup, match.group()) for match in _DIAGNOSTICS_RE.finditer(converted))
+
+def _diagnostics(unmapped, findings, length):
+    """The diagnose() dict of unmapped and findings (Counters) for output of length characters."""
+    leftover = {}
+    suspicious = {}
+    flagged = 0
+    for (name, match), count in findings.items():
+        if name == 'leftover':
+            leftover[match] = count
+        else:
+            suspicious.setdefault(name, {})[match] = count
+        flagged += len(match) * count
+    return {
+        "unmapped": dict(unmapped),
+        "leftover": leftover,
+        "suspicious": suspicious,
+        "confidence": round(1 - flagged / length, 4) if length else 1.0,
+    }
+
+# --- Profile registry ---
+PROFILES = {}
+DEFAULT_PROFILE = 'chanakya'
+
+def register_profile(profile):
+    """Add profile to the registry, replacing any profile of the same name."""
+    PROFILES[profile.name] = profile
+    return profile
+
+def get_profile(name=DEFAULT_PROFILE):
+    """Return the registered profile called name, with its tables loaded."""
+    if isinstance(name, Profile):
+        profile = name
+    else:
+        try:
+            profile = PROFILES[name]
+        except KeyError:
+            raise ValueError(f"Unknown font profile {name!r} "
+                             f"(known: {', '.join(sorted(PROFILES))})") from None
+    if not profile.loaded:
+        profile.load()
+    return profile
+
+def convert(text, profile=DEFAULT_PROFILE, cache=None):
+    """Convert text with the named profile (see Profile.convert)."""
+    return get_profile(profile).convert(text, cache)
+
+def convert_stream(source, profile=DEFAULT_PROFILE, chunk_size=STREAM_CHUNK_SIZE):
+    """Convert a file or iterable of text with the named profile (see Profile.convert_stream)."""
+    return get_profile(profile).convert_stream(source, chunk_size)
+
+register_profile(Profile(
+    'chanakya', MAPPING, CORRECTION_RULES, [AMPERSAND_FIX, VISARGA_FIX],
+    chanakya_order=True, collapse_spaces=True,
+    description="Kruti Dev / Chanakya text as stored in tbSakshivani",
+))
+register_profile(Profile(
+    'krutidev', MAPPING, CORRECTION_RULES, [AMPERSAND_FIX, VISARGA_FIX],
+    collapse_spaces=True,
+    description="Kruti Dev without the Chanakya '~' halant reordering",
+))
+register_profile(Profile(
+    'v1-compat', V1_MAPPING,
+    description="The original migrate_data.py conversion",
+))
+
+# --- Token cache ---
+_WHITESPACE_RE = re.compile(r'(\s+)')
+
+class TokenCache:
+    """
+    Bounded LRU cache of converted source tokens for one profile.
+
+    Keys are whitespace-delimited tokens of the legacy text (after the 'f'
+    swap), values their converted Unicode form; diagnose holds them with
+    their diagnostics instead, for Profile.convert_diagnosed(). The
+    hit/miss/eviction counters cover every text converted with this cache.
+    """
+
+    def __init__(self, maxsize=8192, profile=DEFAULT_PROFILE):
+        self.maxsize = maxsize
+        self.profile = get_profile(profile)
+        self.convert = lru_cache(maxsize=maxsize)(self.profile._convert_token)
+        self.diagnose = lru_cache(maxsize=maxsize)(self.profile._diagnose_token)
+
+    def _info(self):
+        """(hits, misses, size) of both caches together."""
+        infos = (self.convert.cache_info(), self.diagnose.cache_info())
+        return tuple(sum(values) for values in zip(*((info.hits, info.misses, info.currsize)
+                                                     for info in infos)))
+
+    def __len__(self):
+        return self._info()[2]
+
+    @property
+    def hits(self):
+        return self._info()[0]
+
+    @property
+    def misses(self):
+        return self._info()[1]
+
+    @property
+    def evictions(self):
+        # Every miss inserts one entry, so whatever is no longer there was evicted
+        _, misses, size = self._info()
+        return misses - size
+
+    def clear(self):
+        self.convert.cache_clear()
+        self.diagnose.cache_clear()
+
+    def stats(self):
+        hits, misses, size = self._info()
+        lookups = hits + misses
+        return {
+            "size": size,
+            "maxsize": self.maxsize,
+            "hits": hits,
+            "misses": misses,
+            "evictions": misses - size,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+def _convert_tokens(text, cache):
+    """Convert f-swapped, padded text token by token through cache."""
+    parts = _WHITESPACE_RE.split(text)
+    # Tokens sit at even indices and the whitespace between them at odd
+    # ones. Leave out the leading and trailing whitespace as the strip()
+    # after stage 3 does; a trailing 'f' swapped past the padding ends
+    # the text without it.
+    end = len(parts) - 2 if parts[-1] == '' else len(parts)
+    converted = list(map(cache.convert, parts[2:end:2]))
+    if None in converted:
+        return None
+    parts[2:end:2] = converted
+    return "".join(parts[2:end])
+
+def _diagnose_tokens(text, cache, unmapped, findings):
+    """
+    _convert_tokens() through cache.diagnose, adding the diagnostics of
+    every token to unmapped and findings (Counters).
+    """
+    parts = _WHITESPACE_RE.split(text)
+    end = len(parts) - 2 if parts[-1] == '' else len(parts)
+    diagnosed = list(map(cache.diagnose, parts[2:end:2]))
+    converted, token_unmapped, token_findings = zip(*diagnosed) if diagnosed else ((), (), ())
+    if None in converted:
+        return None
+    # Most tokens have neither: their entries are empty tuples
+    if any(token_unmapped):
+        for char, count in chain.from_iterable(token_unmapped):
+            unmapped[char] += count
+    if any(token_findings):
+        findings.update(chain.from_iterable(token_findings))
+    # Whitespace outside ASCII (a no-break space) can be unmapped too
+    spaces = ''.join(parts[1::2])
+    if not spaces.isascii():
+        unmapped.update(cache.profile._unmapped_re.findall(spaces))
+    parts[2:end:2] = converted
+    return "".join(parts[2:end])
+
+# --- SQLite function ---
+
+def register_sqlite_function(conn, cache_size=8192):
+    """
+    Register kd2u(text [, profile]) on the sqlite3 connection conn, so SQL
+    can convert columns in place:
+
+        INSERT INTO songs (title) SELECT kd2u(Title, 'chanakya') FROM tbSakshivani
+
+    It returns convert() of text with the named profile (DEFAULT_PROFILE
+    without one), '' for NULL. Each profile gets a TokenCache of
+    cache_size entries for the life of the connection (0 = no cache).
+    """
+    caches = {}
+    
+    def kd2u(text, profile=DEFAULT_PROFILE):
+        if not text:
+            return ""
+        profile = get_profile(profile)
+        cache = caches.get(profile.name)
+        if cache is None and cache_size > 0:
+            cache = caches[profile.name] = TokenCache(cache_size, profile)
+        return profile.convert(text, cache)
+    
+    # Deterministic, so SQLite may use it in indexes and factor out repeated calls
+    conn.create_function('kd2u', 1, kd2u, deterministic=True)
+    conn.create_function('kd2u', 2, kd2u, deterministic=True)
+    return conn
+
+# --- Streaming conversion (Profile.convert_stream) ---
+# For a token-safe profile, text cut just before a whitespace character
+# converts the same in two parts as in one: the 'f' swap, the Chanakya
+# fixes, the mapping and the correction rules all stay inside tokens, and a
+# reph at the start of a token lands on the whitespace before it. The one
+# exception is an 'f' right before the cut, which would swap with that
+# whitespace. Matches up to the last such position.
+_STREAM_CUT_RE = re.compile(r'(?s:.*)(?<=[^f])\s')
+
+def _read_chunks(source, size):
+    """Strings from a file object (size characters at a time) or an iterable."""
+    read = getattr(source, 'read', None)
+    if read is None:
+        yield from source
+        return
+    while True:
+        chunk = read(size)
+        if not chunk:
+            return
+        yield chunk
+
+def _stream_segments(chunks, size):
+    """
+    The padded text of chunks (" " + text + " ", as in convert()) in
+    segments of about size characters, cut where _STREAM_CUT_RE allows.
+    A stretch without whitespace is held whole until it ends.
+    """
+    buffer = " "
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size < size:
+            continue
+        # The buffer has no cut left but its start, so search the new text only
+        start = len(buffer)
+        buffer += "".join(pending)
+        pending = []
+        pending_size = 0
+        match = _STREAM_CUT_RE.match(buffer, start)
+        if match:
+            cut = match.end() - 1
+            yield buffer[:cut]
+            buffer = buffer[cut:]
+    yield buffer + "".join(pending) + " "
+
+# --- Encoding detection: which profile, if any, a field needs ---
+# Profile for each legacy encoding detect_encoding() reports; 'unicode',
+# 'latin' and 'mixed' text is passed through unchanged
+ENCODING_PROFILES = {'krutidev': 'krutidev', 'chanakya': 'chanakya'}
+
+# Share of Kruti Dev evidence per letter (see detect_encoding()) from which
+# Latin-script text is taken for Kruti Dev: every field of tbSakshivani scores above it, English
+# prose below
+KRUTIDEV_SCORE = 0.12
+# Share of Latin letters in Devanagari text above which it is 'mixed'
+MIXED_SHARE = 0.1
+
+_ASCII_LETTERS = b'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+_DEVANAGARI_RE = re.compile('[\u0900-\u097f]+')
+# Non-ASCII characters of the mapping that are not general punctuation (¡ Å ð Ø ...)
+_LEGACY_GLYPH_RE = re.compile('[' + re.escape(''.join(sorted(
+    {ch for old, _ in MAPPING for ch in old if 0x7f < ord(ch) < 0x2000}))) + ']')
+# Letter patterns common in Kruti Dev and rare in English, besides 'k' (ा),
+# 'j' (र) and 'z' (्र): an uppercase letter inside a word (gS, vkS); 'q'
+# without 'u'; a word-initial 'f' (ि) before a consonant; an apostrophe (श)
+# that does not start an English contraction; ':' typed as '%' and ranges
+# as '&' or '$' between digits; ';' (य) and '[' / ']' against a letter
+_KRUTIDEV_EVIDENCE_RE = re.compile(
+    r"[a-z][A-Z]|q(?!u)|\bf[^aeiloruy\W]|'(?![stdm]\b|ll\b|re\b|ve\b)[a-z]"
+    r"|\d[%$&]\d|[A-Za-z][;\[\]]|[;\[\]][A-Za-z]")
+# Words of two or more letters without a vowel, other than all-caps ones
+# (tc, rd, ij): nearly every English word has one
+_VOWELLESS_WORD_RE = re.compile(r'\b(?![A-Z]+\b)[b-df-hj-np-tv-xzB-DF-HJ-NP-TV-XZ]{2,}\b')
+
+def detect_encoding(text):
+    """
+    Classify text by the characters it holds: 'chanakya' or 'krutidev'
+    for legacy font text ('chanakya' when it uses the '~' halant),
+    'unicode' for Devanagari, 'latin' for plain Latin-script text, and
+    'mixed' for Devanagari with a real share of Latin letters (partly
+    converted or already converted and patched). None if text has no
+    letters of either script.
+    """
+    if not text:
+        return None
+    # Character counts from the ASCII bytes: most fields need nothing more
+    ascii_text = text.encode('ascii', 'ignore')
+    letters = len(ascii_text) - len(ascii_text.translate(None, _ASCII_LETTERS))
+    devanagari = glyphs = 0
+    if len(ascii_text) < len(text):
+        devanagari = sum(map(len, _DEVANAGARI_RE.findall(text)))
+        glyphs = len(_LEGACY_GLYPH_RE.findall(text))
+        letters += glyphs
+    if devanagari:
+        return 'mixed' if letters > (devanagari + letters) * MIXED_SHARE else 'unicode'
+    if not letters:
+        return None
+    
+    legacy = 'chanakya' if '~' in text else 'krutidev'
+    evidence = (glyphs + ascii_text.count(b'k') + ascii_text.count(b'j')
+                + ascii_text.count(b'z'))
+    if evidence >= letters * KRUTIDEV_SCORE:
+        return legacy
+    # Not settled by the letter counts: look for the rarer patterns
+    evidence += len(_KRUTIDEV_EVIDENCE_RE.findall(text))
+    evidence += sum(map(len, _VOWELLESS_WORD_RE.findall(text)))
+    return legacy if evidence >= letters * KRUTIDEV_SCORE else 'latin'
+
+def detect_profile(text, default=DEFAULT_PROFILE):
+    """
+    Name of the profile to convert text with, by detect_encoding(), or
+    None to leave it as it is. Text without letters (numbers,
+    punctuation) goes to default, as it would without detection.
+    """
+    encoding = detect_encoding(text)
+    if encoding is None:
+        return default
+    return ENCODING_PROFILES.get(encoding)
+
+# --- Instrumentation: where conversion time goes and which rules fire ---
+
+class Instrumentation:
+    """
+    Opt-in per-stage wall time and per-entry hit counts, accumulated
+    across every conversion of the profiles it is attached to:
+
+        instrumentation = Instrumentation()
+        profile.instrument(instrumentation)
+        ...convert...
+        profile.instrument(None)
+        print(instrumentation_report(instrumentation.to_dict()))
+
+    While attached, a profile takes an instrumented path with the same
+    output; detached profiles pay one attribute check per text. Stage
+    times are exclusive: time spent in a nested stage (e.g. the stages
+    run for token cache misses) is not also counted in the outer one.
+    """
+
+    def __init__(self):
+        self.texts = 0
+        self.seconds = {}
+        self.calls = {}
+        self.tables = {}        # profile name -> (mapping, fix rules)
+        self.mapping_hits = {}  # profile name -> hits per mapping entry
+        self.rule_hits = {}     # profile name -> hits per correction rule
+        self._nested = 0.0
+
+    def track(self, profile):
+        if profile.name not in self.tables:
+            self.tables[profile.name] = (profile.mapping, profile.fix_table)
+            self.mapping_hits[profile.name] = [0] * len(profile.mapping)
+            self.rule_hits[profile.name] = [0] * len(profile.fix_table)
+
+    def timed(self, stage, func, *args):
+        """Call func(*args), adding its time (less nested stages) to stage."""
+        outer = self._nested
+        self._nested = 0.0
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + elapsed - self._nested
+            self.calls[stage] = self.calls.get(stage, 0) + 1
+            self._nested = outer + elapsed
+
+    def to_dict(self):
+        """JSON-ready stage times and hit counts (see instrumentation_report())."""
+        profiles = {}
+        for name, (mapping, fix_table) in self.tables.items():
+            profiles[name] = {
+                "mapping": [{"old": old, "new": new, "hits": hits}
+                            for (old, new), hits in zip(mapping, self.mapping_hits[name])],
+                "rules": [{"table": table, "old": old, "new": new, "hits": hits}
+                          for (table, old, new), hits in zip(fix_table, self.rule_hits[name])],
+            }
+        return {
+            "texts": self.texts,
+            "stages": {stage: {"seconds": self.seconds[stage], "calls": self.calls[stage]}
+                       for stage in self.seconds},
+            "profiles": profiles,
+        }
+
+    def merge(self, data):
+        """Add to_dict() data from another Instrumentation (e.g. a worker's)."""
+        self.texts += data["texts"]
+        for stage, stats in data["stages"].items():
+            self.seconds[stage] = self.seconds.get(stage, 0.0) + stats["seconds"]
+            self.calls[stage] = self.calls.get(stage, 0) + stats["calls"]
+        for name, tables in data["profiles"].items():
+            if name not in self.tables:
+                self.tables[name] = ([(e["old"], e["new"]) for e in tables["mapping"]],
+                                     [(e["table"], e["old"], e["new"]) for e in tables["rules"]])
+                self.mapping_hits[name] = [0] * len(tables["mapping"])
+                self.rule_hits[name] = [0] * len(tables["rules"])
+            for i, entry in enumerate(tables["mapping"]):
+                self.mapping_hits[name][i] += entry["hits"]
+            for i, entry in enumerate(tables["rules"]):
+                self.rule_hits[name][i] += entry["hits"]
+
+def instrumentation_report(data, top=10):
+    """
+    Text report of Instrumentation.to_dict() data: stages by time, the
+    rules that fire most and the mapping entries and rules that never do.
+    """
+    lines = []
+    stages = sorted(data["stages"].items(), key=lambda item: -item[1]["seconds"])
+    total = sum(stats["seconds"] for _, stats in stages)
+    lines.append(f"Stages by wall time ({data['texts']} texts, {total * 1000:.1f} ms):")
+    for stage, stats in stages:
+        share = stats["seconds"] / total if total else 0.0
+        lines.append(f"  {stage:<24} {stats['seconds'] * 1000:>10.2f} ms {share:>7.1%} "
+                     f"{stats['calls']:>9} calls")
+    
+    for name, tables in data["profiles"].items():
+        entries = ([('mapping', e) for e in tables["mapping"]]
+                   + [(e["table"], e) for e in tables["rules"]])
+        lines.append("")
+        lines.append(f"Most used entries ({name}):")
+        for table, entry in sorted(entries, key=lambda item: -item[1]["hits"])[:top]:
+            if entry["hits"]:
+                lines.append(f"  {entry['hits']:>8}  {table:<22} {entry['old']!r} -> {entry['new']!r}")
+        
+        for label, table_entries in (("mapping entries", tables["mapping"]),
+                                     ("correction rules", tables["rules"])):
+            unused = [(i, e) for i, e in enumerate(table_entries) if not e["hits"]]
+            if not table_entries:
+                continue
+            lines.append("")
+            lines.append(f"Never fired ({name}): {len(unused)} of {len(table_entries)} {label}")
+            for i, entry in unused:
+                table = entry.get("table", "mapping")
+                lines.append(f"  #{i:<4} {table:<22} {entry['old']!r} -> {entry['new']!r}")
+    return "\n".join(lines)
+
+# --- Quality report: Profile.diagnose() results over a whole run ---
+
+class QualityReport:
+    """
+    Diagnostics of many converted fields, summed for a report:
+
+        quality = QualityReport()
+        converted, diagnostics = profile.convert_diagnosed(text)
+        quality.add("12 lyrics", diagnostics)
+        print(quality_report(quality.to_dict()))
+
+    Fields with any finding keep their diagnostics under their key;
+    clean fields are only counted.
+    """
+
+    def __init__(self):
+        self.fields = 0
+        self.unmapped = Counter()
+        self.leftover = Counter()
+        self.suspicious = {}
+        self.flagged = {}
+
+    def add(self, key, diagnostics):
+        self.fields += 1
+        self.unmapped.update(diagnostics["unmapped"])
+        self.leftover.update(diagnostics["leftover"])
+        for name, found in diagnostics["suspicious"].items():
+            self.suspicious.setdefault(name, Counter()).update(found)
+        if diagnostics["unmapped"] or diagnostics["leftover"] or diagnostics["suspicious"]:
+            self.flagged[key] = diagnostics
+
+    def to_dict(self):
+        """JSON-ready totals and flagged fields (see quality_report())."""
+        return {
+            "fields": self.fields,
+            "unmapped": dict(self.unmapped),
+            "leftover": dict(self.leftover),
+            "suspicious": {name: dict(found) for name, found in self.suspicious.items()},
+            "flagged": self.flagged,
+        }
+
+    def merge(self, data):
+        """Add to_dict() data from another QualityReport (e.g. a worker's)."""
+        self.fields += data["fields"]
+        self.unmapped.update(data["unmapped"])
+        self.leftover.update(data["leftover"])
+        for name, found in data["suspicious"].items():
+            self.suspicious.setdefault(name, Counter()).update(found)
+        self.flagged.update(data["flagged"])
+
+def quality_report(data, top=10):
+    """
+    Text report of QualityReport.to_dict() data: findings by kind with
+    their most common characters and sequences, and the fields with the
+    lowest confidence.
+    """
+    flagged = data["flagged"]
+    lines = [f"Conversion quality: {len(flagged)} of {data['fields']} fields with findings"]
+    kinds = [("unmapped", data["unmapped"]), ("leftover", data["leftover"])]
+    kinds += sorted(data["suspicious"].items())
+    for kind, found in kinds:
+        if not found:
+            continue
+        common = sorted(found.items(), key=lambda item: -item[1])[:top]
+        lines.append(f"  {kind:<20} {sum(found.values()):>6}  "
+                     + ", ".join(f"{text!r} x{count}" for text, count in common))
+    
+    lowest = sorted(flagged.items(), key=lambda item: item[1]["confidence"])[:top]
+    if lowest:
+        lines.append("")
+        lines.append("Lowest confidence:")
+        for key, diagnostics in lowest:
+            findings = [*diagnostics["unmapped"], *diagnostics["leftover"],
+                        *(text for found in diagnostics["suspicious"].values() for text in found)]
+            lines.append(f"  {diagnostics['confidence']:.3f}  {key:<16} "
+                         + ", ".join(repr(text) for text in dict.fromkeys(findings)))
+    return "\n".join(lines)
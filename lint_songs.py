@@ -0,0 +1,901 @@
+#!/usr/bin/env python3
+"""
+Lint the converted songs (pwa/songs.json) for Unicode conversion errors.
+
+One engine for the checks the separate scanners used to run
+(scan_corruption.py, scan_all_issues.py, final_validation.py,
+check_matra_alignment.py, extract_real_errors.py, analyze_all_errors.py,
+find_legacy_glyphs.py, verify_fixes.py): the corpus is loaded once and
+every field is scanned once, with all the registered pattern checks
+combined in a single regex and the cluster structure checked by the
+Devanagari state machine (devanagari.py).
+
+    python lint_songs.py                          # lint pwa/songs.json, write lint_report.txt
+    python lint_songs.py --checks legacy_glyphs,halant_before_matra
+    python lint_songs.py --json lint_report.json  # findings as JSON as well
+    python lint_songs.py --jsonl -                # findings streamed to stdout as JSON Lines
+    python lint_songs.py --sarif lint.sarif       # findings as a SARIF log
+    python lint_songs.py --list                   # the registered checks
+    python lint_songs.py --bible --workers 4      # the Hindi Bible, verse by verse
+
+The corpus is split into shards (runs of songs; a book or chapter of
+the Bible) linted on a pool of worker processes; the findings come back
+in corpus order whatever the number of workers, and the throughput of
+each worker is printed.
+
+Findings are cached per song (per verse) in .lint_cache.json
+(.lint_cache.bible.json), so a re-run only rescans what was edited
+since the last run, and the report lists the issues that are new, fixed
+or still there since then.
+
+Every finding has the check, severity, record (song id or verse), field,
+line, column and character offset, the matched text, a suggested fix
+where the check has one, and its context. --json, --jsonl and --sarif
+write the findings one by one as the records are linted; the report
+keeps only counts and a few examples per record, so with --no-cache a
+run does not hold the findings in memory. The cache is the exception:
+it is one JSON file of every record's findings, read and saved whole.
+
+Exits with status 1 when any error-severity check finds something.
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from operator import itemgetter
+
+import devanagari
+from font_profiles import AMPERSAND_FIX, WORD_FIXES, atomic_write
+
+SONGS_FILE = 'pwa/songs.json'
+REPORT_FILE = 'lint_report.txt'
+LINT_CACHE = '.lint_cache.json'
+BIBLE_LINT_CACHE = '.lint_cache.bible.json'
+FIELDS = ('title', 'lyrics')
+SEVERITIES = ('error', 'warning', 'info')
+CONTEXT = 20
+# Bump when Linter.lint_record() changes what it reports
+LINT_VERSION = 4
+
+# --- 1. Check registry ---
+
+class Check:
+    """
+    A named pattern to look for in converted text.
+
+    severity is 'error' (the conversion is wrong, fails the lint), 'warning'
+    (often wrong, worth a look) or 'info' (counted only, e.g. words that
+    should be there). pattern must not use named groups. start, when given,
+    is a character class (or any zero-width-safe test) that every match
+    starts with; the scan only tries the check where it matches. fix, when
+    given, is the suggested replacement of a match: a string, or a
+    function of the matched text returning one (or None for no suggestion).
+
+    A check with no pattern reports the clusters the Devanagari validator
+    (devanagari.validate()) flags with the violation of the same name.
+    """
+
+    def __init__(self, name, pattern, severity='error', description='', start=None, fix=None):
+        if severity not in SEVERITIES:
+            raise ValueError(f"Unknown severity {severity!r} (choose from {', '.join(SEVERITIES)})")
+        if pattern is None and name not in devanagari.VIOLATIONS:
+            raise ValueError(f"Check {name!r} has no pattern and is not a cluster violation "
+                             f"(known: {', '.join(devanagari.VIOLATIONS)})")
+        self.name = name
+        self.pattern = pattern
+        self.severity = severity
+        self.description = description or devanagari.VIOLATIONS.get(name, '')
+        self.start = start
+        self.fix = fix
+        self.regex = re.compile(pattern) if pattern is not None else None
+
+    def __repr__(self):
+        return f"Check({self.name!r}, {self.severity!r})"
+
+    def suggest(self, text):
+        """The suggested replacement of the matched text, or None."""
+        return self.fix(text) if callable(self.fix) else self.fix
+
+CHECKS = {}
+
+def register_check(name, pattern, severity='error', description='', start=None, fix=None):
+    """Add a check to the registry, replacing any check of the same name."""
+    check = CHECKS[name] = Check(name, pattern, severity, description, start, fix)
+    return check
+
+# Suggested fixes; module-level functions, so checks can go to worker processes
+_WORD_FIXES = dict(WORD_FIXES)
+
+def _known_fix(text):
+    return _WORD_FIXES.get(text)
+
+def _drop_last(text):
+    """The text without its last character (the one that broke the cluster)."""
+    return text[:-1]
+
+def _drop_halant(text):
+    """The text without the halant before its last character."""
+    return text[:-2] + text[-1]
+
+# Two matras that make one: े + ा is ो, as a legacy 'ks' splits it
+_MATRA_PAIRS = {'ेा': 'ो', 'ैा': 'ौ', 'ाे': 'ो', 'ाै': 'ौ'}
+
+def _merge_matras(text):
+    """The cluster with its last two matras made one (केा -> को, त्राी -> त्री)."""
+    pair = text[-2:]
+    if pair in _MATRA_PAIRS:
+        return text[:-2] + _MATRA_PAIRS[pair]
+    if pair[0] == 'ा':
+        # The stray ा of a legacy =k / Ùk conjunct
+        return text[:-2] + pair[1]
+    return text[:-1]
+
+def _move_matra(text):
+    """The cluster with its last matra before the sign (कंा -> कां, मेंे -> में)."""
+    if text[-3:-2] == text[-1]:
+        return text[:-1]
+    return text[:-2] + text[-1] + text[-2]
+
+def _first_half_letter(text):
+    return text[:2]
+
+_CONSONANT = '[\u0915-\u0939\u0958-\u095f\u093c]'  # क-ह, क़-य़ and the nukta
+# Words the old conversion got wrong (from analyze_all_errors.py / verify_fixes.py)
+KNOWN_MISSPELLINGS = ('पि्रय', 'सृशिट', 'सृशट', 'कत्तर्ा', 'अध्िकार', 'अध्ीन', 'बन्ध्', 'स्िथर',
+                      'ध्ीर', 'स्रपा', 'पि्रत', 'जगभतर्ा', 'पवत्रि', 'ख्िा्रस्त', 'धर्मर्ात्मा')
+# Words a correct conversion has plenty of (from verify_fixes.py)
+EXPECTED_WORDS = ('प्रिय', 'बन्धु', 'बन्ध', 'धीर', 'स्थिर', 'अधीन', 'कर्ता', 'सृष्टि', 'क्रिस्त',
+                  'धर्मात्मा')
+
+# Conversion errors
+register_check('legacy_glyphs', '[äšðÿ±_›ÂÃ]',
+               description="Kruti Dev / Chanakya glyph left unconverted", start='[äšðÿ±_›ÂÃ]')
+register_check('invisible_chars', '[\u00ad\u200b-\u200f\u202a-\u202e]',
+               description="soft hyphen, zero-width or bidi control character",
+               start='[\u00ad\u200b-\u200f\u202a-\u202e]', fix='')
+register_check('ampersand', '&', description="'&' separator, should be '-'", start='&',
+               fix=AMPERSAND_FIX[2])
+register_check('bracket', r'\]', description="']' separator, should be ','", start=r'\]',
+               fix=',')
+register_check('duplicated_ba', '[बप]्र्[बप]', description="duplicated ब्र्ब / प्र्प cluster",
+               start='[बप]')
+register_check('repeated_half_letter', 'र्र्|त्त्|म्म्', description="the same half letter twice",
+               start='[रतम]', fix=_first_half_letter)
+register_check('extra_visarga', r'ः\s*,\s*ः', description="visarga repeated around a comma",
+               start='ः', fix=',')
+register_check('known_misspelling', '|'.join(KNOWN_MISSPELLINGS),
+               description="word the old conversion got wrong",
+               start=f"[{''.join(sorted({word[0] for word in KNOWN_MISSPELLINGS}))}]",
+               fix=_known_fix)
+
+# Cluster structure, from the Devanagari state machine (devanagari.py): a
+# matra, sign, halant or nukta that cannot attach to the cluster before it.
+# The match is the cluster up to the offending character (from the
+# cluster's previous violation on, when it has one); where the usual
+# cause is plain, the fix is the cluster without it
+CLUSTER_FIXES = {
+    'double_matra': _merge_matras,
+    'double_halant': _drop_last,
+    'double_sign': _drop_last,
+    'matra_before_halant': _drop_last,
+    'stray_halant': _drop_last,
+    'stray_nukta': _drop_last,
+    'halant_before_matra': _drop_halant,
+    'halant_before_sign': _drop_halant,
+    'matra_after_sign': _move_matra,
+}
+for _violation in devanagari.VIOLATIONS:
+    register_check(_violation, None, fix=CLUSTER_FIXES.get(_violation))
+del _violation
+
+# Often wrong
+register_check('ending_halant', r'्(?=\s|$|[।,॥.!?])', 'warning',
+               description="halant at the end of a word", start='्')
+register_check('halant_heavy_word', r'(?<!\S)(?:[^\s्]*्){4}\S*', 'warning',
+               description="word with four or more halants", start=r'(?<!\S)\S')
+register_check('extra_halant_dhn', 'ध्न(?!्य)', 'warning', description="ध्न, usually धन",
+               start='ध', fix='धन')
+register_check('extra_halant_dhny', 'ध्न्य', 'warning', description="ध्न्य, usually धन्य",
+               start='ध', fix='धन्य')
+register_check('visarga_hindi', 'ः', 'warning', description="visarga (Sanskrit only)", start='ः',
+               fix='')
+
+# Counted only
+register_check('i_after_conjunct', f'{_CONSONANT}्{_CONSONANT}ि', 'info',
+               description="i-matra after a conjunct (right in क्रिस्त, wrong in स्िथर)",
+               start=_CONSONANT)
+register_check('expected_words', '|'.join(EXPECTED_WORDS), 'info',
+               description="words a correct conversion should contain",
+               start=f"[{''.join(sorted({word[0] for word in EXPECTED_WORDS}))}]")
+
+# --- 2. Single-pass scanning ---
+
+class Linter:
+    """
+    Runs a set of checks over text in one scan.
+
+    Every pattern check sits in a lookahead of one alternation, so a single
+    finditer() tries them all at each position; checks with the same start
+    are grouped behind one test of it, so most positions cost a few
+    character-class tests. When one check matches, the checks after it in
+    the alternation are tried at that position too, and each check skips
+    matches overlapping its previous one, so the findings are exactly those
+    of running each check's own finditer(). Cluster checks share one run
+    of the Devanagari validator.
+    """
+
+    def __init__(self, checks=None):
+        if checks is None:
+            checks = list(CHECKS.values())
+        groups = {}
+        clusters = []
+        for check in checks:
+            if check.pattern is None:
+                clusters.append(check)
+            else:
+                groups.setdefault(check.start, []).append(check)
+        self.checks = {check.name: check for group in groups.values() for check in group}
+        self._order = list(self.checks)
+        self._after = {name: [self.checks[later] for later in self._order[i + 1:]]
+                       for i, name in enumerate(self._order)}
+        self.checks.update((check.name, check) for check in clusters)
+        self._clusters = {check.name for check in clusters}
+
+        alternatives = []
+        for start, group in groups.items():
+            tests = '|'.join(f'(?=(?P<{check.name}>{check.pattern}))' for check in group)
+            alternatives.append(tests if start is None else f'(?={start})(?:{tests})')
+        self._regex = re.compile('|'.join(alternatives)) if alternatives else None
+
+    def scan(self, text):
+        """Yield (check name, start, end) for every finding in text, in text order."""
+        scans = []
+        if self._regex is not None:
+            scans.append(self._scan_patterns(text))
+        if self._clusters:
+            scans.append((violation, start, end)
+                         for violation, start, end in devanagari.validate(text)
+                         if violation in self._clusters)
+        return heapq.merge(*scans, key=itemgetter(1))
+
+    def _scan_patterns(self, text):
+        last_end = {}
+        for match in self._regex.finditer(text):
+            name = match.lastgroup
+            start = match.start()
+            if start >= last_end.get(name, 0):
+                end = match.end(name)
+                last_end[name] = end
+                yield name, start, end
+            for check in self._after[name]:
+                if start >= last_end.get(check.name, 0):
+                    other = check.regex.match(text, start)
+                    if other:
+                        last_end[check.name] = other.end()
+                        yield check.name, start, other.end()
+
+    def lint_record(self, record, fields=FIELDS):
+        """The findings of one record (a song, a verse), as dicts, field by field."""
+        findings = []
+        for field in fields:
+            text = record.get(field) or ''
+            for name, start, end in self.scan(text):
+                check = self.checks[name]
+                match = text[start:end]
+                findings.append({
+                    "check": name,
+                    "severity": check.severity,
+                    "record": record.get('id'),
+                    "field": field,
+                    "line": text.count('\n', 0, start) + 1,
+                    "column": start - text.rfind('\n', 0, start),
+                    "offset": start,
+                    "match": match,
+                    "fix": check.suggest(match),
+                    "context": text[max(0, start - CONTEXT):end + CONTEXT].replace('\n', ' '),
+                })
+        return findings
+
+    def lint(self, records, fields=FIELDS):
+        """The findings of every record, in corpus order."""
+        return [finding for record in records for finding in self.lint_record(record, fields)]
+
+# --- 3. Corpora ---
+# A corpus is a list of records, dicts with an 'id' and the fields to lint.
+# Songs are one record each; the Bible is one record per verse.
+BIBLE_FILE = 'dashboard-web/data/bible/hi_data.js'
+BIBLE_BOOKS_FILE = 'dashboard-web/data/bible/books.js'
+BIBLE_FIELDS = ('verse',)
+
+def load_songs(songs_file=SONGS_FILE):
+    with open(songs_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def _load_js_object(path):
+    """The object a data file like hi_data.js assigns ('const HI_BIBLE = {...};'), or plain JSON."""
+    with open(path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    match = re.search(r'=\s*(\{.*\})\s*;?\s*$', content, re.S)
+    json_str = match.group(1) if match else content
+    try:
+        return json.loads(json_str)
+    except ValueError:
+        # Trailing commas are fine in JS but not in JSON
+        return json.loads(re.sub(r',\s*([\]}])', r'\1', json_str))
+
+def _bible_book_names(books_file=BIBLE_BOOKS_FILE):
+    """The Hindi book names of books.js, or None when it cannot be read."""
+    try:
+        with open(books_file, 'r', encoding='utf-8') as f:
+            match = re.search(r'"hi"\s*:\s*(\[.*?\])', f.read(), re.S)
+        return json.loads(match.group(1)) if match else None
+    except (OSError, ValueError):
+        return None
+
+def load_bible(bible_file=BIBLE_FILE, books_file=BIBLE_BOOKS_FILE):
+    """
+    One record per verse of a Bible data file (Book / Chapter / Verse
+    arrays, as the dashboard reads them), with ids like 'उत्पत्ति 1:1'
+    and the book and chapter numbers to shard by.
+    """
+    data = _load_js_object(bible_file)
+    names = _bible_book_names(books_file) or []
+    records = []
+    for b, book in enumerate(data.get('Book', [])):
+        name = names[b] if b < len(names) else f"Book {b + 1}"
+        for c, chapter in enumerate(book.get('Chapter', [])):
+            verses = chapter.get('Verse', [])
+            if not isinstance(verses, list):
+                verses = [verses]
+            for v, verse in enumerate(verses):
+                # Verseid ends in the 0-based verse number, e.g. "00001000"
+                number = int(verse['Verseid']) % 1000 + 1 if verse.get('Verseid') else v + 1
+                records.append({"id": f"{name} {c + 1}:{number}", "book": b + 1,
+                                "chapter": c + 1, "verse": verse.get('Verse', '')})
+    return records
+
+# --- 4. Parallel scanning ---
+# How records are grouped into shards, the unit of work handed to a worker
+SHARD_KEYS = {
+    'record': None,
+    'book': itemgetter('book'),
+    'chapter': itemgetter('book', 'chapter'),
+}
+SHARD_SIZE = 64
+
+# Linters built in this process, by check set
+_process_linters = {}
+
+def _get_linter(checks):
+    key = tuple((check.name, check.pattern, check.severity, check.start) for check in checks)
+    linter = _process_linters.get(key)
+    if linter is None:
+        linter = _process_linters[key] = Linter(checks)
+    return linter
+
+def make_shards(records, shard_by=None, size=SHARD_SIZE):
+    """
+    Split records into shards of consecutive records: those with the same
+    shard_by key (a function of a record), or runs of size records.
+    """
+    if shard_by is None:
+        return [records[i:i + size] for i in range(0, len(records), size)]
+    shards = []
+    last = object()
+    for record in records:
+        key = shard_by(record)
+        if key != last:
+            shards.append([])
+            last = key
+        shards[-1].append(record)
+    return shards
+
+def _lint_shard(shard, checks, fields):
+    """Lint one shard; returns the findings of each record and the worker's stats."""
+    start = time.perf_counter()
+    linter = _get_linter(checks)
+    findings = [linter.lint_record(record, fields) for record in shard]
+    stats = {
+        "worker": os.getpid(),
+        "records": len(shard),
+        "chars": sum(len(record.get(field) or '') for record in shard for field in fields),
+        "seconds": time.perf_counter() - start,
+    }
+    return findings, stats
+
+def _merge_shards(results, per_worker):
+    for shard_findings, stats in results:
+        if per_worker is not None:
+            totals = per_worker.setdefault(stats["worker"], {"shards": 0, "records": 0,
+                                                             "chars": 0, "seconds": 0.0})
+            totals["shards"] += 1
+            for key in ("records", "chars", "seconds"):
+                totals[key] += stats[key]
+        yield from shard_findings
+
+def lint_records(records, checks, fields=FIELDS, workers=1, shard_by=None, per_worker=None):
+    """
+    Yield the findings of each record, linting shard by shard, on a
+    process pool when workers > 1.
+
+    The findings come in record order whatever order the shards finish
+    in, each record's as soon as its shard is done. per_worker, a dict,
+    collects the shards, records, characters and seconds each worker
+    process linted.
+    """
+    checks = list(checks)
+    shards = make_shards(records, shard_by)
+    if workers <= 1 or len(shards) <= 1:
+        yield from _merge_shards((_lint_shard(shard, checks, fields) for shard in shards),
+                                 per_worker)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(shards))) as pool:
+            chunksize = max(1, len(shards) // (workers * 4))
+            yield from _merge_shards(pool.map(_lint_shard, shards, repeat(checks),
+                                              repeat(fields), chunksize=chunksize), per_worker)
+
+def format_worker_stats(per_worker):
+    """One line per worker: what it linted and its throughput."""
+    lines = []
+    for worker, totals in sorted(per_worker.items()):
+        rate = totals["chars"] / totals["seconds"] if totals["seconds"] else 0
+        lines.append(f"  worker {worker}: {totals['shards']} shards, {totals['records']} records, "
+                     f"{totals['chars']:,} chars in {totals['seconds']:.2f}s "
+                     f"({rate:,.0f} chars/s)")
+    return lines
+
+# --- 5. Incremental lint: reuse the findings of unchanged records ---
+
+def checkset_version(checks, fields=FIELDS):
+    """Hash of everything a record's findings depend on besides the record."""
+    data = [LINT_VERSION, CONTEXT, list(fields)]
+    data += [[check.name, check.pattern, check.severity,
+              getattr(check.fix, '__qualname__', check.fix)] for check in checks]
+    if any(check.pattern is None for check in checks):
+        data.append(repr(sorted(devanagari.TRANSITIONS.items(), key=repr)))
+        data.append(devanagari.CHARACTER_CLASSES)
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False).encode('utf-8')).hexdigest()
+
+def _record_hash(record, fields=FIELDS):
+    data = json.dumps([record.get('id')] + [record.get(field) for field in fields],
+                      ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+class LintCache:
+    """
+    The findings of the last run, per record, so a re-run only lints the
+    records whose text changed.
+
+    Entries are keyed by record id and hold a hash of the record's fields
+    and its findings. They are reused while the record hash and the
+    check-set version (checkset_version()) are unchanged; after any change
+    to the checks every record is linted again. The findings of the last
+    run stay available either way as previous, {record id: findings},
+    for diff_findings() record by record.
+
+    The cache is one JSON document, read and saved whole, so a run with
+    it holds the findings of the last run and of this one in memory;
+    without it (--no-cache) no findings are kept.
+    """
+
+    FORMAT = 2
+
+    def __init__(self, path, version):
+        self.path = path
+        self.version = version
+        self.reused = self.linted = 0
+        self.entries = {}
+        self.previous = None
+        self._old_entries = {}
+        data = self._read()
+        if data.get("format") == self.FORMAT:
+            records = data.get("records", {})
+            self.previous = {record_id: entry["findings"]
+                             for record_id, entry in records.items()}
+            if data.get("checks") == version:
+                self._old_entries = records
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def lint(self, records, lint_many, fields=FIELDS):
+        """
+        Yield the findings of each record, reusing what the cache holds;
+        lint_many(records) lints the rest and yields the findings of
+        each, like lint_records().
+        """
+        hashes = [_record_hash(record, fields) for record in records]
+        cached = []
+        for record, record_hash in zip(records, hashes):
+            entry = self._old_entries.get(str(record.get('id')))
+            cached.append(entry["findings"] if entry is not None and entry["hash"] == record_hash
+                          else None)
+        stale = [record for record, findings in zip(records, cached) if findings is None]
+        self.reused += len(records) - len(stale)
+        self.linted += len(stale)
+        linted = lint_many(stale) if stale else iter(())
+
+        for record, record_hash, record_findings in zip(records, hashes, cached):
+            if record_findings is None:
+                record_findings = next(linted)
+            self.entries[str(record.get('id'))] = {"hash": record_hash,
+                                                   "findings": record_findings}
+            yield record_findings
+
+    def save(self):
+        """Write the entries of this run, replacing the cache file."""
+        if self.reused == len(self.entries) == len(self._old_entries):
+            return  # the file already holds exactly these entries
+        data = {"format": self.FORMAT, "checks": self.version, "records": self.entries}
+        with atomic_write(self.path) as f:
+            # dumps() encodes in C; dump() to a file goes through the Python encoder
+            f.write(json.dumps(data, ensure_ascii=False))
+
+def _finding_keys(findings):
+    """
+    A key per finding that survives edits elsewhere in the record: the
+    record, field, check and match, and which occurrence of that match it is.
+    """
+    seen = Counter()
+    keys = []
+    for finding in findings:
+        key = (finding["record"], finding["field"], finding["check"], finding["match"])
+        keys.append(key + (seen[key],))
+        seen[key] += 1
+    return keys
+
+def diff_findings(previous, findings):
+    """
+    Split findings against the previous run's: (new, fixed, persisting).
+    The keys hold the record, so the findings can be split a record at a time.
+    """
+    old = dict(zip(_finding_keys(previous), previous))
+    current = dict(zip(_finding_keys(findings), findings))
+    new = [finding for key, finding in current.items() if key not in old]
+    fixed = [finding for key, finding in old.items() if key not in current]
+    persisting = [finding for key, finding in current.items() if key in old]
+    return new, fixed, persisting
+
+# --- 6. Report ---
+
+class Tally:
+    """
+    What the report needs of the findings, added record by record so the
+    findings themselves are not kept: the count of each severity, per
+    check its count, records and most common matches, and per record
+    with errors or warnings its count and first examples findings.
+    add_changes() counts each record's diff_findings() against the last
+    run, keeping examples * 10 of the new and the fixed.
+    """
+
+    def __init__(self, checks, examples=5):
+        self.examples = examples
+        self.records = 0
+        self.counts = Counter()
+        self.checks = {name: {"severity": check.severity, "description": check.description,
+                              "count": 0, "records": 0, "matches": Counter()}
+                       for name, check in checks.items()}
+        # {record id: [title, count, first findings]}
+        self.by_record = {}
+        self.changes = None
+        self.new = []
+        self.fixed = []
+
+    def add(self, record, findings):
+        self.records += 1
+        listed = None
+        for finding in findings:
+            entry = self.checks[finding["check"]]
+            entry["count"] += 1
+            entry["matches"][finding["match"]] += 1
+            self.counts[finding["severity"]] += 1
+            if finding["severity"] != 'info':
+                if listed is None:
+                    listed = self.by_record.setdefault(record.get('id'),
+                                                       [record.get('title'), 0, []])
+                listed[1] += 1
+                if len(listed[2]) < self.examples:
+                    listed[2].append(finding)
+        for name in {finding["check"] for finding in findings}:
+            self.checks[name]["records"] += 1
+
+    def add_changes(self, new, fixed, persisting):
+        if self.changes is None:
+            self.changes = {"new": 0, "fixed": 0, "persisting": 0}
+        for label, listed, kept in (("new", new, self.new), ("fixed", fixed, self.fixed),
+                                    ("persisting", persisting, None)):
+            self.changes[label] += len(listed)
+            if kept is not None:
+                kept.extend(listed[:self.examples * 10 - len(kept)])
+
+def format_report(tally, unit='Song'):
+    """The consolidated text report of a Tally; unit is what a record is ('Song', 'Verse')."""
+    counts = tally.counts
+    lines = ["=" * 80, f"{unit.upper()} LINT REPORT", "=" * 80, "",
+             f"{unit}s scanned: {tally.records}",
+             f"{unit}s with errors or warnings: {len(tally.by_record)}",
+             f"Errors: {counts['error']}  Warnings: {counts['warning']}  Info: {counts['info']}",
+             "", "CHECKS:", "-" * 80]
+    for severity in SEVERITIES:
+        for name, entry in tally.checks.items():
+            if entry["severity"] != severity:
+                continue
+            top = ', '.join(f"'{match}' x{count}"
+                            for match, count in entry["matches"].most_common(3))
+            lines.append(f"{severity:<8} {name:<26} {entry['count']:>6} in "
+                         f"{entry['records']:>3} {unit.lower()}s  {top}")
+
+    if tally.changes is not None:
+        changes = tally.changes
+        lines += ["", "", "CHANGES SINCE THE LAST RUN:", "-" * 80,
+                  f"New: {changes['new']}  Fixed: {changes['fixed']}  "
+                  f"Persisting: {changes['persisting']}"]
+        for label, listed in (("NEW", tally.new), ("FIXED", tally.fixed)):
+            for finding in listed:
+                lines.append(f"  {label:<5} {unit.lower()} {finding['record']} "
+                             f"{finding['severity']} {finding['check']}: '{finding['match']}' "
+                             f"...{finding['context']}...")
+            if changes[label.lower()] > len(listed):
+                lines.append(f"  ... and {changes[label.lower()] - len(listed)} more "
+                             f"{label.lower()}")
+
+    if tally.by_record:
+        lines += ["", "", f"FINDINGS BY {unit.upper()}:", "-" * 80]
+        # Songs by id; verses in Bible order, as they were linted
+        ordered = tally.by_record if unit != 'Song' else \
+            sorted(tally.by_record, key=lambda record_id: (record_id is None, record_id))
+        for record_id in ordered:
+            title, count, record_findings = tally.by_record[record_id]
+            lines.append(f"\n{unit} {record_id}" + (f": {title}" if title is not None else "")
+                         + f" ({count} findings)")
+            for finding in record_findings:
+                fix = f" -> '{finding['fix']}'" if finding['fix'] is not None else ""
+                lines.append(f"  {finding['severity']} {finding['check']}: '{finding['match']}'"
+                             f"{fix} ({finding['field']} {finding['line']}:{finding['column']})")
+                lines.append(f"    Context: ...{finding['context']}...")
+    else:
+        lines += ["", "✓ NO ERRORS OR WARNINGS"]
+    return '\n'.join(lines) + '\n'
+
+# --- 7. Machine-readable findings ---
+# Written one finding at a time as the records are linted, so a consumer
+# can filter and aggregate them without parsing the text report.
+SARIF_VERSION = '2.1.0'
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+SARIF_LEVELS = {'error': 'error', 'warning': 'warning', 'info': 'note'}
+
+def _indented(value, depth):
+    """value as indented JSON, starting at depth levels of indentation."""
+    return json.dumps(value, ensure_ascii=False, indent=2).replace('\n', '\n' + '  ' * depth)
+
+class JsonWriter:
+    """
+    Findings as one JSON document, {"songs" / "verses": records,
+    "findings": [...], "summary": ..., "changes": ...}: the findings are
+    written as they come, the summary and changes of tally (a Tally)
+    when it is closed.
+    """
+
+    def __init__(self, f, tally, unit='Song', records=0):
+        self.f = f
+        self.tally = tally
+        self.f.write(f'{{\n  "{unit.lower()}s": {records},\n  "findings": [')
+        self._first = True
+
+    def write(self, finding):
+        self.f.write(('\n' if self._first else ',\n') + '    ' + _indented(finding, 2))
+        self._first = False
+
+    def close(self):
+        self.f.write(']' if self._first else '\n  ]')
+        self.f.write(',\n  "summary": ' + _indented(self.tally.checks, 1))
+        if self.tally.changes is not None:
+            self.f.write(',\n  "changes": ' + _indented(self.tally.changes, 1))
+        self.f.write('\n}\n')
+        self.f.flush()
+
+class JsonlWriter:
+    """Findings as JSON Lines: one finding dict per line."""
+
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, finding):
+        self.f.write(json.dumps(finding, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.f.flush()
+
+class SarifWriter:
+    """
+    Findings as a SARIF 2.1.0 log, for code-scanning tools: one run whose
+    rules are the checks. A finding sits in a field of a record rather
+    than at a place in the file, so its location is the corpus file plus
+    a logical location 'record/field'; the line, column, offset, match
+    and suggested fix are in the result's properties.
+    """
+
+    def __init__(self, f, checks, artifact):
+        self.f = f
+        self.artifact = artifact
+        self._rule_index = {name: i for i, name in enumerate(checks)}
+        rules = [{"id": name,
+                  "shortDescription": {"text": check.description or name},
+                  "defaultConfiguration": {"level": SARIF_LEVELS[check.severity]}}
+                 for name, check in checks.items()]
+        run = {"tool": {"driver": {"name": "lint_songs", "version": str(LINT_VERSION),
+                                   "rules": rules}},
+               "results": []}
+        log = json.dumps({"$schema": SARIF_SCHEMA, "version": SARIF_VERSION, "runs": [run]},
+                         ensure_ascii=False)
+        # Stream the results into the empty array at the end of the log
+        self._tail = ']}]}'
+        self.f.write(log[:-len(self._tail)])
+        self._first = True
+
+    def write(self, finding):
+        check = finding["check"]
+        location = f"{finding['record']}/{finding['field']}"
+        message = f"{check}: '{finding['match']}'"
+        if finding["fix"] is not None:
+            message += f", suggested '{finding['fix']}'"
+        result = {
+            "ruleId": check,
+            "ruleIndex": self._rule_index[check],
+            "level": SARIF_LEVELS[finding["severity"]],
+            "message": {"text": message},
+            "locations": [{
+                "physicalLocation": {"artifactLocation": {"uri": self.artifact}},
+                "logicalLocations": [{"name": finding["field"],
+                                      "fullyQualifiedName": location,
+                                      "kind": "member"}],
+            }],
+            "properties": {key: finding[key] for key in ("record", "field", "line", "column",
+                                                         "offset", "match", "fix", "context")},
+        }
+        self.f.write(('' if self._first else ',') + json.dumps(result, ensure_ascii=False))
+        self._first = False
+
+    def close(self):
+        self.f.write(self._tail + '\n')
+        self.f.flush()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Lint the converted songs in one pass")
+    parser.add_argument('songs', nargs='?', default=SONGS_FILE,
+                        help=f"songs JSON to lint (default {SONGS_FILE})")
+    parser.add_argument('--bible', nargs='?', const=BIBLE_FILE, metavar='FILE',
+                        help=f"lint the verses of a Hindi Bible data file (default {BIBLE_FILE}) "
+                             "instead of the songs")
+    parser.add_argument('--checks', help="comma-separated checks to run (default: all)")
+    parser.add_argument('--report', default=REPORT_FILE,
+                        help=f"text report file (default {REPORT_FILE})")
+    parser.add_argument('--json', metavar='FILE', help="also save the findings as JSON")
+    parser.add_argument('--jsonl', metavar='FILE',
+                        help="stream the findings as JSON Lines as they are found ('-' for stdout)")
+    parser.add_argument('--sarif', metavar='FILE', help="stream the findings as a SARIF 2.1.0 log")
+    parser.add_argument('--examples', type=int, default=5,
+                        help="findings listed per song / verse in the report (default 5)")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="worker processes (0 = one per core, default)")
+    parser.add_argument('--shard-by', choices=sorted(SHARD_KEYS),
+                        help="what a worker lints at a time: runs of records, a book or a "
+                             "chapter (default: chapter for the Bible, record for songs)")
+    parser.add_argument('--cache',
+                        help=f"per-record findings of the last run (default {LINT_CACHE}, "
+                             f"{BIBLE_LINT_CACHE} with --bible)")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="lint every record and leave the cache alone (implied by --checks)")
+    parser.add_argument('--list', action='store_true', help="list the registered checks and exit")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, check in CHECKS.items():
+            print(f"{check.severity:<8} {name:<26} {check.description}")
+        return 0
+
+    checks = CHECKS
+    if args.checks:
+        unknown = [name for name in args.checks.split(',') if name not in CHECKS]
+        if unknown:
+            parser.error(f"unknown check(s) {', '.join(unknown)} (see --list)")
+        checks = {name: CHECKS[name] for name in args.checks.split(',')}
+    shard_by = args.shard_by or ('chapter' if args.bible else 'record')
+    if shard_by != 'record' and not args.bible:
+        parser.error(f"--shard-by {shard_by} needs --bible")
+    workers = args.workers or os.cpu_count() or 1
+
+    start = time.perf_counter()
+    if args.bible:
+        corpus = args.bible
+        records, fields, unit = load_bible(corpus), BIBLE_FIELDS, 'Verse'
+    else:
+        corpus = args.songs
+        records, fields, unit = load_songs(corpus), FIELDS, 'Song'
+    per_worker = {}
+
+    def lint_many(stale):
+        return lint_records(stale, checks.values(), fields, workers, SHARD_KEYS[shard_by],
+                            per_worker)
+
+    # A subset of the checks would leave the cache without the others' findings
+    cache = None
+    if not (args.no_cache or args.checks):
+        cache = LintCache(args.cache or (BIBLE_LINT_CACHE if args.bible else LINT_CACHE),
+                          checkset_version(checks.values(), fields))
+    results = lint_many(records) if cache is None else cache.lint(records, lint_many, fields)
+
+    tally = Tally(checks, args.examples)
+    writers = []
+    if args.json:
+        writers.append(JsonWriter(open(args.json, 'w', encoding='utf-8'), tally, unit,
+                                  len(records)))
+    if args.jsonl:
+        writers.append(JsonlWriter(sys.stdout if args.jsonl == '-' else
+                                   open(args.jsonl, 'w', encoding='utf-8')))
+    if args.sarif:
+        writers.append(SarifWriter(open(args.sarif, 'w', encoding='utf-8'), checks,
+                                   corpus.replace(os.sep, '/')))
+    # Each record's findings go to the writers and the tally, and are
+    # diffed against its findings of the last run, which are then let go
+    previous = cache.previous if cache is not None else None
+    try:
+        for record_findings, record in zip(results, records):
+            for writer in writers:
+                for finding in record_findings:
+                    writer.write(finding)
+            tally.add(record, record_findings)
+            if previous is not None:
+                tally.add_changes(*diff_findings(previous.pop(str(record.get('id')), []),
+                                                 record_findings))
+        if previous:
+            # Records gone since the last run: their findings are all fixed
+            tally.add_changes(*diff_findings([finding for findings in previous.values()
+                                              for finding in findings], []))
+        for writer in writers:
+            writer.close()
+    finally:
+        for writer in writers:
+            if writer.f is not sys.stdout:
+                writer.f.close()
+    if cache is not None:
+        cache.save()
+    elapsed = time.perf_counter() - start
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        f.write(format_report(tally, unit))
+
+    counts = tally.counts
+    chars = sum(totals["chars"] for totals in per_worker.values())
+    # Keep stdout for the findings when they stream there
+    out = sys.stderr if args.jsonl == '-' else sys.stdout
+    print(f"Linted {len(records)} {unit.lower()}s with {len(checks)} checks in {elapsed:.2f}s: "
+          f"{counts['error']} errors, {counts['warning']} warnings, {counts['info']} info",
+          file=out)
+    if cache is not None:
+        print(f"Lint cache: {cache.reused} {unit.lower()}s reused, {cache.linted} linted", file=out)
+    if per_worker:
+        print(f"Scanned {chars:,} chars on {len(per_worker)} worker(s), by {shard_by}:", file=out)
+        print('\n'.join(format_worker_stats(per_worker)), file=out)
+    if tally.changes is not None:
+        print(f"Since the last run: {tally.changes['new']} new, {tally.changes['fixed']} fixed, "
+              f"{tally.changes['persisting']} persisting", file=out)
+    outputs = [path for path in (args.json, args.jsonl, args.sarif) if path and path != '-']
+    print(f"Report: {args.report}" + (f", findings: {', '.join(outputs)}" if outputs else ""),
+          file=out)
+    return 1 if counts['error'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,346 +1,461 @@
 import sqlite3
 import json
-import re
 import os
+import argparse
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
 
-def krutidev_to_unicode(text):
-    if not text:
-        return ""
-    
-    # Pad text
-    text = " " + text + " "
-    
-    # --- 1. Pre-processing: Move 'f' ---
-    chars = list(text)
-    i = 0
-    while i < len(chars):
-        if chars[i] == 'f':
-            if i + 1 < len(chars):
-                chars[i], chars[i+1] = chars[i+1], chars[i]
-                i += 1 
-        i += 1
-    text = "".join(chars)
-
-    # --- 1.1 Pre-processing: Fix Chanakya patterns with wrong matra order ---
-    # In some Chanakya sequences, halant character appears before the matra character
-    # We need to swap them BEFORE doing the Unicode mapping
-    # Pattern: consonant + '~' (halant in Chanakya) + matra char
-    # Fix: consonant + matra char + '~'
-    
-    chanakya_matra_fixes = [
-        # Most common: '~f' (halant + i-matra) should be 'f~' (i-matra + halant)
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~f', r'\1f~'),  # क्ि → कि्
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~h', r'\1h~'),  # ी-matra
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~q', r'\1q~'),  # ु-matra  
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~w', r'\1w~'),  # ू-matra
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~k', r'\1k~'),  # ा-matra
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~s', r'\1s~'),  # े-matra
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~S', r'\1S~'),  # ै-matra
-        (r'([kKɛxCNTnpQtdDrbljgyqZSslomvhf])~ks', r'\1ks~'), # ो-matra
-    ]
-    
-    for wrong_pattern, correct_pattern in chanakya_matra_fixes:
-        text = re.sub(wrong_pattern, correct_pattern, text)
-
-    # --- 2. Main Character Mapping ---
-    # REORDERED LIST: Longest sequences FIRST to prevent partial replacement
-    mapping = [
-        # 3-4 char sequences
-        ('Q+Z','फ़्'), ('nzZ','र्द्र'), ('=kk','त्र'), ('f=k','त्रि'), 
-        
-        # Specific Combos (Vowels + Matras) - MUST be before generic matras
-        ('v‚','ऑ'), ('vks','ओ'), ('vkS','औ'), ('pkS','चै'), 
-        ('vk','आ'), ('b±','ईं'), ('bZ','ई'), 
-        ('b','इ'), 
-        
-        # Consonants + Halants
-        ('aa','a'), ('pp','ç'), ('qq','æ'), ('«','त्र्'), 
-        ('»','त्र'), ('‘','\"'), ('’','\"'), ('“',"'"), 
-        ('”',"'"), ('å','०'), ('ƒ','१'), ('„','२'), 
-        ('…','३'), ('†','४'), ('‡','५'), ('ˆ','६'), 
-        ('‰','७'), ('Š','८'), ('‹','९'), ('¶','फ्'), 
-        ('d+','क़'), ('[+k','ख़'), ('[+','ख़्'), ('x+','ग़'), 
-        ('T+','ज़्'), ('t+','ज़'), ('M+','ड़'), ('<+','ढ़'), 
-        ('Q+','फ़'), (';+','य़'), ('j+','ऱ'), ('u+','ऩ'), 
-        ('Ùk','त्त'), ('Ù','त्त्'), ('Dr','क्त'), ('–','दृ'), 
-        ('—','कृ'), ('é','न्न'), ('™','न्न्'), 
-        ('à','ह्न'), ('á','ह्य'), ('â','हृ'), 
-        ('ã','ह्म'), ('ºz','ह्र'), ('º','ह्'), ('í','द्द'), 
-        ('{k','क्ष'), ('{','क्ष्'), ('=','त्र'), ('Nî','छ्य'), 
-        ('Vî','ट्य'), ('Bî','ठ्य'), ('Mî','ड्य'), ('<î','ढ्य'), 
-        ('|','द्य'), ('K','ज्ञ'), ('}','द्व'), ('J','श्र'), 
-        ('Vª','ट्र'), ('Mª','ड्र'), ('<ªª','ढ्र'), ('Nª','छ्र'), 
-        ('Ø','क्र'), ('Ý','फ्र'), ('æ','द्र'), 
-        ('ç','प्र'), ('Á','प्र'), ('xz','ग्र'), ('#','रु'), 
-        (':','रू'), 
-        # Special Conjuncts & Common Words (MUST be before base character mappings)
-        # These handle specific word patterns that don't follow standard rules
-        ('/eZ','धर्म'), ('/e','धर्म'), # dharma - VERIFIED WORKING
-        (f'Hk{chr(0xd9)}kkZ','भर्ता'), # bhartha with byte 0xd9
-        ('vf/i','अधिप'), # adhipa
-        ('f/i','धिप'), # dhipa
-        
-        # Legacy glyphs that map to conjuncts (CRITICAL - before other mappings)
-        ('š','क्त'),  # Legacy glyph for क्त (Song 300: शाš मान → शक्तिमान)
-        ('ä','क्त'),  # Alternative legacy glyph for क्त
-        
-        # Additional common conjuncts
-        ('RrkZ','त्ता'), ('Rrk','त्त'), # tta combinations
-        
-        # Fix 'L' conflict (Swarg issue)
-        ('L','स्'), 
-        
-        ('v','अ'), ('m','उ'), ('Å','ऊ'), 
-        (',s','ऐ'), (',','ए'), ('_','ऋ'), ('ô','क्क'), 
-        ('d','क'), ('Dk','क'), ('D','क्'), ('[k','ख'), 
-        ('[','ख्'), ('x','ग'), ('Xk','ग'), ('X','ग्'), 
-        ('Ä','घ'), ('?k','घ'), ('?','घ्'), ('³','ङ'), 
-        ('p','च'), ('Pk','च'), ('P','च्'), 
-        ('N','छ'), ('t','ज'), ('Tk','ज'), ('T','ज्'), 
-        ('>','झ'), ('÷','झ्'), ('¥','ञ'), ('ê','ट्ट'), 
-        ('ë','ट्ठ'), ('V','ट'), ('B','ठ'), ('ì','ड्ड'), 
-        ('ï','ड्ढ'), ('M','ड'), ('<','ढ'), ('.k','ण'), 
-        ('.','ण'), ('R','त्'), ('r','त'), ('Fk','थ'), 
-        ('F','थ्'), (')','द्ध'), ('n','द'), ('/k','ध'), 
-        ('èk','ध'), ('/','ध्'), ('è','ध्'), ('Ë','ध्'), 
-        ('u','न'), ('Uk','न'), ('U','न्'), ('i','प'), 
-        ('Ik','प'), ('I','प्'), ('Q','फ'), ('¶','फ्'), 
-        ('c','ब'), ('Ck','ब'), ('C','ब्'), ('Hk','भ'), 
-        ('H','भ्'), ('e','म'), ('Ek','म'), ('E','म्'), 
-        (';','य'), ('¸','य्'), ('j','र'), 
-        ('y','ल'), ('Lk','ल'), 
-        ('Y','ळ'), ('o','व'), 
-        ('Ok','व'), ('O','व्'), 
-        
-        # 'Sha' handling
-        ("'k",'श'), # Fix for Yeshu (;h'kq)
-        ("'",'श्'), 
-        ('"k','श'), 
-        ('"','श'), 
-        
-        ('l','स'), 
-        ('g','ह'), ('È','ीं'), ('z','्र'), ('Ì','द्द'), 
-        ('Í','ट्ट'), ('Î','ट्ठ'), ('Ï','ड्ड'), ('Ñ','कृ'), 
-        ('Ò','भ'), ('Ó','्य'), ('Ô','ड्ढ'), ('Ö','झ्'), 
-        ('Ø','क्र'), ('Ù','त्त्'), ('Ü','श'), ('x','ग'), 
-        ('T','ज्'), ('f','ि'), ('h','ी'), ('q','ु'), 
-        ('w','ू'), ('`','ृ'), 
-        # ('s','े'), ('S','ै'), # MOVED TO BOTTOM
-        ('a','ं'), ('¡','ँ'), ('%','ः'), ('W','ॅ'), 
-        ('•','ऽ'), ('·','ऽ'), ('∙','ऽ'), ('~j','्र'), 
-        ('~','्'), ('\\?','़'), ('^','‘'), ('*','’'), 
-        ('ß','“'), ('Þ','”'), ('(','_'), (')','_'), 
-        ('{','_'), ('}','_'), ('|','_'), ('ZM+','ड़'),
-        
-        # Matras (Mapping Order Critical)
-        ('kS','ौ'), ('ks','ो'), 
-        ('k','ा'), 
-        ('s','े'), ('S','ै'), # Moved here
-
-        # Additional vowel: Long Ū (from reference table)
-        ('mZ','ऊ'),  # Long u (matches reference: mZ → ऊ)
-
-        # Vedic & Musical Markers (for hymns, bhajans, shlokas)
-        ('vkse','ॐ'),  # Om symbol (common in songs)
-        ('AA','॥'),    # Double danda (verse end)
-        ('¡','ँ'),     # Chandrabindu (already present above but ensuring)
-        
-        # Punctuation
-        ('A','।'),  # Single danda (line end)
-        (';','।'),  # Alternative for danda
-    ]
+from font_profiles import (DEFAULT_PROFILE, PROFILES, Instrumentation, QualityReport, TokenCache,
+                           atomic_write, detect_profile, get_profile, instrumentation_report,
+                           quality_report, register_sqlite_function)
+
+# The tables and conversion stages live in font_profiles; this script
+# converts tbSakshivani with one of its profiles ('chanakya' by default).
+
+def krutidev_to_unicode(text, cache=None, diagnostics=False):
+    """
+    Convert Kruti Dev / Chanakya encoded text to Unicode Devanagari.
+
+    Pass a TokenCache as cache to reuse conversions of repeated tokens;
+    the result is the same as without it. With diagnostics=True returns
+    (converted, diagnostics) instead, see font_profiles Profile.diagnose().
+    """
+    if diagnostics:
+        return get_profile(DEFAULT_PROFILE).convert_diagnosed(text, cache)
+    return get_profile(DEFAULT_PROFILE).convert(text, cache)
+
+def clean_reference(reference):
+    """Clean up a converted Bible reference (a song's Reference field)."""
+    if reference:
+        # Remove special characters that shouldn't be in references
+        reference = reference.replace('ए', ':')  # Common error
+        reference = reference.replace('$', ':')
+        reference = reference.replace('-', ':')
+        # Fix common Bible book name issues
+        reference = reference.replace('प््रा: वा:', 'प्रकाशितवाक्य')
+        reference = reference.replace('इब्रा:', 'इब्रानियों')
+        reference = reference.replace('एट', 'प्रेरितों')
+    return reference
+
+def _make_song(row, fields, clean=True):
+    """Song dict for a row from its four converted fields."""
+    converted_title, converted_lyric, converted_category, converted_reference = fields
     
-    for k, v in mapping:
-        text = text.replace(k, v)
-        
-    # --- 3. Post-processing: Handle 'Z' (Reph/Rakar) ---
-    chars = list(text)
-    i = 0
-    while i < len(chars):
-        if chars[i] == 'Z':
-            chars[i] = '' 
-            if i > 0:
-                chars.insert(i-1, 'र्') 
-        i += 1
+    # Clean up Bible references specifically (clean=False: the reference
+    # was not converted, so has none of the conversion's mistakes)
+    if clean:
+        converted_reference = clean_reference(converted_reference)
     
-    text = "".join(chars).strip()
+    return {
+        "id": row[0],
+        "title": converted_title,
+        "lyrics": converted_lyric,
+        "category": converted_category,
+        "reference": converted_reference
+    }
+
+def convert_field(value, cache=None, profile=DEFAULT_PROFILE, detect=False, quality=None,
+                  key=None):
+    """
+    Convert one field with profile. With detect=True the field goes to the
+    profile of its detected encoding instead (see font_profiles.detect_profile),
+    with a process token cache the size of cache, or is returned unchanged
+    if it is already Unicode, plain Latin or mixed. When quality (a
+    font_profiles.QualityReport) is given, the diagnostics of a converted
+    field are added to it under key.
+    """
+    if detect:
+        if not value:
+            return ""
+        target = detect_profile(value, profile)
+        if target is None:
+            return value
+        if cache is not None and cache.profile.name != target:
+            cache = get_process_cache(cache.maxsize, target)
+        profile = target
+    if quality is None:
+        return get_profile(profile).convert(value, cache)
+    converted, diagnostics = get_profile(profile).convert_diagnosed(value, cache)
+    quality.add(key, diagnostics)
+    return converted
+
+def convert_row(row, cache=None, profile=DEFAULT_PROFILE, detect=False, quality=None):
+    """
+    Convert one (Song_Id, Title, Lyric, Category, Reference) row to a song
+    dict. detect and quality are passed to convert_field() for each field.
+    """
+    def convert(value, field):
+        return convert_field(value, cache, profile, detect, quality, f"{row[0]} {field}")
+    converted_title = convert(row[1], 'title')
+    converted_lyric = convert(row[2], 'lyrics')
+    converted_category = convert(row[3], 'category') if row[3] else ""
+    converted_reference = convert(row[4], 'reference') if row[4] else ""
+    converted = not (detect and row[4] and detect_profile(row[4], profile) is None)
+    return _make_song(row, (converted_title, converted_lyric,
+                            converted_category, converted_reference), clean=converted)
+
+def finish_row(row, fronts, profile=DEFAULT_PROFILE):
+    """Song dict for a row from its fields as returned by Profile.front()."""
+    profile = get_profile(profile)
+    return _make_song(row, [profile.finish(front) for front in fronts])
+
+def convert_row_staged(row, profile=DEFAULT_PROFILE):
+    """
+    convert_row() in two steps, for MigrationCache: returns the song and
+    the four fields before the correction rules (Profile.front()).
+    """
+    profile = get_profile(profile)
+    fronts = [profile.front(value) for value in row[1:5]]
+    return finish_row(row, fronts, profile), fronts
+
+# One token cache per profile and process, shared by every chunk that
+# process converts
+_process_caches = {}
+
+def get_process_cache(cache_size, profile=DEFAULT_PROFILE):
+    """Return this process's TokenCache of profile with cache_size entries, or None if 0."""
+    if not cache_size:
+        return None
+    profile = get_profile(profile)
+    cache = _process_caches.get(profile.name)
+    if cache is None or cache.maxsize != cache_size or cache.profile is not profile:
+        cache = _process_caches[profile.name] = TokenCache(cache_size, profile)
+    return cache
+
+def _rule_hits(profile):
+    fix_rules = get_profile(profile).fix_rules
+    return list(fix_rules.hits) if fix_rules is not None else []
+
+def _convert_chunk(rows, cache_size=0, profile=DEFAULT_PROFILE, staged=False, instrument=False,
+                   detect=False, diagnose=False):
+    """Convert a list of rows, skipping (and reporting) rows that fail.
+
+    Returns the songs, the correction rule hits this chunk added, with
+    instrument=True the chunk's Instrumentation data and with
+    diagnose=True its QualityReport data (else None). With staged=True
+    the songs are convert_row_staged() results instead, with None in
+    place of rows that failed. detect is passed to convert_row().
+    """
+    cache = get_process_cache(cache_size, profile)
+    hits_before = _rule_hits(profile)
+    if instrument:
+        instrumentation = Instrumentation()
+        previous = get_profile(profile).instrument(instrumentation)
+    quality = QualityReport() if diagnose else None
+    songs = []
+    try:
+        for row in rows:
+            try:
+                if staged:
+                    songs.append(convert_row_staged(row, profile))
+                else:
+                    songs.append(convert_row(row, cache, profile, detect, quality))
+            except Exception as e:
+                print(f"Error converting song ID {row[0]}: {e}")
+                if staged:
+                    songs.append(None)
+    finally:
+        if instrument:
+            get_profile(profile).instrument(previous)
+    # Rule hits made here, so the parent can add up counts from workers
+    hits = [after - before for after, before in zip(_rule_hits(profile), hits_before)]
+    return (songs, hits, instrumentation.to_dict() if instrument else None,
+            quality.to_dict() if diagnose else None)
+
+def convert_many(rows, workers=1, chunk_size=64, cache_size=0, profile=DEFAULT_PROFILE,
+                 staged=False, pool=None, instrumentation=None, detect=False, quality=None):
+    """
+    Convert many database rows to song dicts, keeping input order.
+
+    With workers > 1 the rows are split into ordered chunks of chunk_size
+    and converted on a ProcessPoolExecutor; workers=None uses every core.
+    workers=1 converts in this process. Both paths return the same list.
+    Pass pool to convert on an existing executor instead of starting one.
+    cache_size > 0 gives each process a TokenCache of that many entries.
+    profile names the font profile (see font_profiles); its fix_rules.hits
+    in this process include the hits made by workers. staged=True returns
+    one convert_row_staged() result (or None) per row instead.
+    Stage times and hits of every process are added to instrumentation
+    (a font_profiles.Instrumentation) when one is given. detect=True
+    routes every field by its detected encoding (see convert_field());
+    rule hits and instrumentation then cover the fields routed to profile.
+    The diagnostics of every converted field are added to quality (a
+    font_profiles.QualityReport) when one is given.
+    """
+    rows = list(rows)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    instrument = instrumentation is not None
+    if pool is None and (workers <= 1 or len(rows) <= chunk_size):
+        songs, _, stats, diagnostics = _convert_chunk(rows, cache_size, profile, staged,
+                                                      instrument, detect, quality is not None)
+        if instrument:
+            instrumentation.merge(stats)
+        if quality is not None:
+            quality.merge(diagnostics)
+        return songs
     
-    # --- 4. Post-processing: Fix specific word patterns ---
-    # These are words that don't convert correctly with character-level mapping
-    word_fixes = [
-        # Original fixes
-        ('भत्तर्ा', 'भर्ता'),  # bhartā
-        ('अध्िप', 'अधिप'),   # adhipa  
-        ('भत्तर्', 'भर्त'),   # bharth (without ā)
-        
-        # Systematic issues found across all songs (from comprehensive analysis)
-        ('ख्िा्रस्त', 'क्रिस्त'),  # Christ - 100+ instances
-        ('धर्मर्ात्मा', 'धर्मात्मा'),  # dharmātmā
-        ('अधर्मर्', 'अधर्म'),  # adharma
-        
-        # Misplaced matra patterns (42 instances)
-        ('पि्रय', 'प्रिय'),  # priya (beloved)
-        ('पि्रये', 'प्रिये'),  # priye
-        ('पि्रयों', 'प्रियों'),  # priyoṁ
-        ('पि्रत', 'प्रित'),  # prit
-        
-        # Halant issues
-        ('बन्ध्ु', 'बन्धु'),  # bandhu (7 instances)
-        ('बन्ध्', 'बन्ध'),  # bandh (37 instances)
-        ('ध्ीर', 'धीर'),  # dhīr (33 instances)
-        ('ध्ीरज', 'धीरज'),  # dhīraj
-        
-        # Matra misplacement
-        ('स्िथर', 'स्थिर'),  # sthir (30 instances)
-        ('स्िधर', 'स्थिर'),  # sthir variant
-        ('अध्ीन', 'अधीन'),  # adhīn (22 instances)
-        ('अध्िकार', 'अधिकार'),  # adhikār (7 instances)
-        
-        # Extra halants in conjuncts
-        ('कत्तर्ा', 'कर्ता'),  # kartā (creator) - 16 instances
-        ('सृशिटकत्तर्ा', 'सृष्टिकर्ता'),  # creator
-        ('जगकत्तर्ा', 'जगत्कर्ता'),  # world creator
-        ('जगभतर्ा', 'जगभर्ता'),  # jagabhartha - 1 instance
-        
-        # Wrong consonant/conjunct
-        ('सृशिट', 'सृष्टि'),  # sṛṣṭi (creation) - 14 instances
-        ('सृशट', 'सृष्टि'),  # sṛṣṭi variant - 2 instances
-        
-        # Double halant issues
-        ('जगत्त्रणी', 'जगत्राणी'),  # jagattrāṇī - 3 instances
-        ('सिध््द', 'सिद्ध'),  # siddha - 2 instances
-        ('विपत्त्िा', 'विपत्ति'),  # vipatti (calamity)
-        ('सम्पत्त्िा', 'सम्पत्ति'),  # sampatti (prosperity)
-        ('निधर््न', 'निर्धन'),  # nirdhan (poor)
-        ('निदि्रत', 'निद्रित'),  # nidrit (asleep)
-        ('ध्म्मर्ात्मा', 'धर्मात्मा'),  # dharmātmā - 2 instances
-        
-        # Additional common patterns
-        ('स्रपा', 'स्राप'),  # srāpa (curse)
-        ('ख्रीस्त', 'क्रिस्त'),  # Christ variant
-        
-        # User-reported issues (Song-specific corrections)
-        ('शुð', 'शुद्ध'),  # shuddha (pure)
-        ('कोरेरेरस', 'कोरस'),  # chorus
-        ('मं›ल', 'मंगल'),  # mangal
-        ('रात्रिा', 'रात्रि'),  # raatri (night)
-        ('अन्ध्ेरा', 'अंधेरा'),  # andhera (darkness)
-        ('कृिस्त', 'क्रिस्त'),  # Christ
-        ('अन्िध्यारा', 'अंधियारा'),  # andhiyara
-        ('मुक्ितदाता', 'मुक्तिदाता'),  # muktidaata (savior)
-        ('उðारियो', 'उद्धारियो'),  # uddhariyo
-        ('तृप्ित', 'तृप्ति'),  # tripti (satisfaction)
-        
-        # Character mapping issues
-        ('ð', 'द्ध'),  # Special character → proper conjunct
-        ('›', ''),  # Remove invalid character
-        ('_', ''),  # Remove underscore (40 instances)
-        
-        # Duplication corruption patterns
-        ('पूब्र्ब', 'पूर्व'),  # Corrupted reph - 2 instances in Song 37
-        ('ब्र्ब', 'र्व'),  # Generic fix for duplicated ba-ra-ba
-        
-        # OCR/Legacy junk characters
-        ('स्वगो±', 'स्वर्गों'),  # ± is OCR junk
-        ('±', ''),  # Remove ± anywhere
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    if pool is None:
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+            return _convert_chunks(pool, chunks, cache_size, profile, staged, instrumentation,
+                                   detect, quality)
+    return _convert_chunks(pool, chunks, cache_size, profile, staged, instrumentation, detect,
+                           quality)
+
+def _convert_chunks(pool, chunks, cache_size, profile, staged, instrumentation, detect, quality):
+    songs = []
+    # map() yields results in submission order, whatever finishes first
+    for converted, hits, stats, diagnostics in pool.map(_convert_chunk, chunks,
+                                                        repeat(cache_size), repeat(profile),
+                                                        repeat(staged),
+                                                        repeat(instrumentation is not None),
+                                                        repeat(detect), repeat(quality is not None)):
+        songs.extend(converted)
+        for i, count in enumerate(hits):
+            get_profile(profile).fix_rules.hits[i] += count
+        if instrumentation is not None:
+            instrumentation.merge(stats)
+        if quality is not None:
+            quality.merge(diagnostics)
+    return songs
+
+# --- SQL functions: the same conversion inside SQLite ---
+# The song columns as convert_row() makes them, selected from tbSakshivani
+# on a connection with register_sqlite_functions(); bind :profile
+SONGS_SQL = """
+    SELECT Song_Id, kd2u(Title, :profile), kd2u(Lyric, :profile), kd2u(Category, :profile),
+           clean_reference(kd2u(Reference, :profile))
+    FROM tbSakshivani
+"""
+
+def register_sqlite_functions(conn, cache_size=8192):
+    """Register kd2u() (see font_profiles.register_sqlite_function) and clean_reference() on conn."""
+    register_sqlite_function(conn, cache_size)
+    conn.create_function('clean_reference', 1, clean_reference, deterministic=True)
+
+# --- Streaming output: songs.json written batch by batch ---
+
+def iter_batches(cursor, batch_size=256):
+    """Yield the remaining rows of an executed cursor in lists of batch_size."""
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            return
+        yield rows
+
+def _song_json(song):
+    # One array element laid out as json.dump(songs, indent=2) does it; JSON
+    # strings hold no raw newlines, so indenting every line is safe
+    return '  ' + json.dumps(song, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+
+def write_songs_streaming(batches, output_file):
+    """
+    Write the songs from an iterable of song lists to output_file as one
+    JSON array, byte-identical to json.dump(songs, f, ensure_ascii=False,
+    indent=2), holding one batch at a time.
+
+    The array goes to a temporary file (atomic_write()), which replaces
+    output_file only once complete, so a crash never leaves a
+    half-written file. Returns the number of songs written.
+    """
+    count = 0
+    with atomic_write(output_file, sync=True) as f:
+        f.write('[')
+        for songs in batches:
+            for song in songs:
+                f.write(',\n' if count else '\n')
+                f.write(_song_json(song))
+                count += 1
+        f.write('\n]' if count else ']')
+    return count
+
+# --- Incremental migration: reuse rows converted by earlier runs ---
+# Bump when _make_song() changes its output
+ROW_VERSION = 1
+
+def migration_cache_path(db_file):
+    """The migration cache file kept beside db_file."""
+    return os.path.splitext(db_file)[0] + '.migration_cache.json'
+
+def _row_hash(row):
+    data = json.dumps([ROW_VERSION] + list(row), ensure_ascii=False)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+class MigrationCache:
+    """
+    Songs converted by earlier runs, stored beside the database, so a
+    re-run only reconverts rows whose source or applicable rules changed.
+
+    Entries are keyed by a hash of the source row. Each holds the row's
+    fields after stages 1-3 (Profile.front()), the correction rule
+    patterns they contain, a signature of the rules that fire on them and
+    the finished song. On the next run a row is
+      - reused if the signature is unchanged,
+      - re-corrected from the stored fields if only its rules changed,
+      - converted from scratch if it is new or was edited.
+    Any change to what stages 1-3 depend on (the mapping) drops every entry.
+    """
+
+    FORMAT = 1
+
+    def __init__(self, path, profile=DEFAULT_PROFILE):
+        self.path = path
+        self.profile = get_profile(profile)
+        self.reused = self.recorrected = self.converted = 0
         
-        # Missing matras
-        ('आधर', 'आधार'),  # Missing ा matra
+        fix_rules = self.profile.fix_rules
+        self._patterns = set(fix_rules.patterns) if fix_rules is not None else set()
+        self._rule_keys = [repr(rule[1:]) for rule in fix_rules.rules] if fix_rules else []
+        self._finish_hash = self.profile.finish_hash()
         
-        # Incorrect halant/conjunct patterns
-        ('ध्न्य', 'धन्य'),  # Extra halant: ध् + न् + य → ध + न् + य
-        ('ध्न', 'धन'),  # Extra halant: ध् + न → ध + न
-        ('पवत्रि', 'पवित्र'),  # i-matra misplaced: should be before व
+        self.entries = {}
+        self._old_entries = {}
+        self._stored_patterns = set()
+        data = self._read()
+        if (data.get("format") == self.FORMAT and data.get("profile") == self.profile.name
+                and data.get("front") == self.profile.front_hash()):
+            self._old_entries = data.get("rows", {})
+            # Patterns the stored "present" lists were taken against
+            self._stored_patterns = set(data.get("patterns", []))
+        self._added_patterns = self._patterns - self._stored_patterns
+
+    def _read(self):
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _present(self, front, old_present=None):
+        """Rule patterns in front, updated from old_present when there is one."""
+        if self.profile.fix_rules is None:
+            return []
+        if old_present is None:
+            return sorted(self.profile.fix_rules.present(front))
+        present = {p for p in old_present if p in self._patterns}
+        present.update(p for p in self._added_patterns if p in front)
+        return sorted(present)
+
+    def _signature(self, present):
+        """Hash of the stage 4-9 work that applies to fields with these patterns."""
+        fix_rules = self.profile.fix_rules
+        digest = hashlib.sha256(self._finish_hash.encode('ascii'))
+        for patterns in present:
+            if fix_rules is not None and patterns:
+                indices = fix_rules.candidates(patterns)
+                digest.update('\n'.join(self._rule_keys[i] for i in indices).encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def _store(self, key, fronts, present, signature, song):
+        self.entries[key] = {
+            "fronts": fronts,
+            "present": present,
+            "rules": signature,
+            "song": song,
+        }
+
+    def convert(self, rows, workers=1, chunk_size=64, pool=None):
+        """Convert rows like convert_many(), reusing what the cache holds."""
+        songs = []
+        stale = []
+        for row in rows:
+            key = _row_hash(row)
+            entry = self._old_entries.get(key)
+            if entry is None:
+                stale.append((len(songs), key, row))
+                songs.append(None)
+                continue
+            
+            present = [self._present(front, old)
+                       for front, old in zip(entry["fronts"], entry["present"])]
+            signature = self._signature(present)
+            if signature == entry["rules"]:
+                song = entry["song"]
+                self.reused += 1
+            else:
+                song = finish_row(row, entry["fronts"], self.profile)
+                self.recorrected += 1
+            self._store(key, entry["fronts"], present, signature, song)
+            songs.append(song)
         
-        # Bible reference fixes (extra halants)
-        ('प््रेारित', 'प्रेरित'),  # Acts - extra halants
-        ('प््रे', 'प्रे'),  # Generic prefix fix
-        ('फिलिप्पि', 'फिलिप्पी'),  # Philippians
-        ('कॉरिन्थ', 'कुरिन्थियों'),  # Corinthians
+        if stale:
+            results = convert_many([row for _, _, row in stale], workers, chunk_size,
+                                   profile=self.profile.name, staged=True, pool=pool)
+            for (pos, key, _), result in zip(stale, results):
+                if result is None:
+                    continue
+                song, fronts = result
+                present = [self._present(front) for front in fronts]
+                self._store(key, fronts, present, self._signature(present), song)
+                songs[pos] = song
+                self.converted += 1
         
-        # Additional legacy cleanup
-        ('िा', 'िया'),  # Common matra sequence issue
-        ('ाा', 'ा'),  # Doubled aa matra
-    ]
-    
-    for wrong, correct in word_fixes:
-        text = text.replace(wrong, correct)
-    
-    # --- 5. Remove Chanakya separator symbol ---
-    # The ']' character appears in Chanakya as a line/phrase separator
-    # It should be removed in Unicode (790 instances across 125 songs)
-    text = text.replace(']', ',')  # Replace with comma for natural pause
-    
-    # --- 6. Fix matra alignment issues ---
-    # Some conversions have halant appearing after matra (wrong order)
-    # The issue is: शक्ितमान should be शक्तिमान (remove halant between consonant and matra)
-    
-    matra_alignment_fixes = {
-        'क्ि': 'कि',
-        'ध्ि': 'धि', 
-        'र्ी': 'री',
-        'न्ि': 'नि',
-        'श्ि': 'शि',
-        'ख्ि': 'खि',
-        'ध्ू': 'धू',
-        'र्ा': 'रा',
-        'ध्े': 'धे',
-        'र्ो': 'रो',
-        'ध्ी': 'धी',
-        'ध्ु': 'धु',
-        'भ्ि': 'भि',
-        'त्ि': 'ति',
-        'र्ि': 'रि',
-        'ग्ि': 'गि',
-        'थ्ि': 'थि',
-        'स्ि': 'सि',
-        'प्ि': 'पि',
-        'घ्ि': 'घि',
-        'म्ि': 'मि',
-        'र्ु': 'रु',
-        'ष्ि': 'षि',
-        'भ्ु': 'भु',
-        'ध्ै': 'धै',
-        'स्ा': 'सा',
-    }
-    
-    for wrong, correct in matra_alignment_fixes.items():
-        text = text.replace(wrong, correct)
-    
-    # --- 7. Fix extra character patterns ---
-    extra_char_fixes = {
-        'काय्र्य': 'कार्य',  # Extra र् 
-        'ध्म्र्म': 'धर्म',   # Extra म् 
-        'त्रिाएक': 'त्रिएक', # Extra ा
-    }
-    
-    for wrong, correct in extra_char_fixes.items():
-        text = text.replace(wrong, correct)
-    
-    # --- 8. Replace ampersand symbol with dash ---
-    # The & symbol is used in Chanakya as a "repeat" marker (e.g., &2 means repeat twice)
-    # Replace with dash for cleaner display - 202 instances
-    text = text.replace('&', '-')
-    
-    # --- 9. Remove visarga (ः) - NOT used in modern Hindi ---
-    # Visarga (ः U+0903) is Sanskrit-only, not modern Hindi
-    # Context-aware replacement based on linguistic guidelines:
-    #   - In titles/headings: remove completely
-    #   - Before space (pause marker): replace with em dash —
-    #   - End of line: remove (not needed)
-    #   - Before comma: remove (comma already marks pause)
-    
-    # Simple approach: Remove all visarga for clean modern Hindi hymns
-    # Professional hymn books don't use visarga
-    text = text.replace('ः', '')
-    
-    # Clean up any double spaces created by removal
-    while '  ' in text:
-        text = text.replace('  ', ' ')
-    
-    return text
+        return [song for song in songs if song is not None]
+
+    def save(self):
+        """Write the entries used by this run, replacing the cache file."""
+        if (self.reused == len(self.entries) == len(self._old_entries)
+                and self._patterns == self._stored_patterns):
+            return  # the file already holds exactly these entries
+        data = {
+            "format": self.FORMAT,
+            "profile": self.profile.name,
+            "front": self.profile.front_hash(),
+            "patterns": sorted(self._patterns),
+            "rows": self.entries,
+        }
+        with atomic_write(self.path) as f:
+            json.dump(data, f, ensure_ascii=False)
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert tbSakshivani to Unicode songs.json")
+    parser.add_argument('--profile', choices=sorted(PROFILES), default=DEFAULT_PROFILE,
+                        help=f"font profile of the source text (default {DEFAULT_PROFILE})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="worker processes for conversion (0 = one per core, default 1)")
+    parser.add_argument('--cache-size', type=int, default=8192,
+                        help="token cache entries per process with --full "
+                             "(0 = no cache, default 8192)")
+    parser.add_argument('--full', action='store_true',
+                        help="reconvert every row instead of reusing the migration cache")
+    parser.add_argument('--rule-hits', metavar='FILE',
+                        help="write per-rule hit counts of the correction rules to FILE (JSON); "
+                             "implies --full, tokens served from the token cache are not "
+                             "counted again")
+    parser.add_argument('--stream', action='store_true',
+                        help="read, convert and write the songs in batches, so memory stays "
+                             "flat; songs.json is replaced only once complete "
+                             "(the migration cache still keeps its entries in memory, "
+                             "add --full to avoid it)")
+    parser.add_argument('--batch-size', type=int, default=256,
+                        help="rows per batch with --stream (default 256)")
+    parser.add_argument('--instrument', metavar='FILE',
+                        help="time every conversion stage and count mapping/rule hits, print "
+                             "a report and save the data to FILE (JSON, see converter_report.py); "
+                             "implies --full")
+    parser.add_argument('--detect', action='store_true',
+                        help="detect each field's encoding and convert it with the matching "
+                             "profile (chanakya or krutidev), passing Unicode, Latin and mixed "
+                             "fields through unchanged; --profile converts fields without "
+                             "letters; implies --full")
+    parser.add_argument('--diagnostics', metavar='FILE',
+                        help="collect unmapped characters, leftover legacy glyphs, suspicious "
+                             "clusters and a confidence score for every field while converting "
+                             "it (kept per token in the token cache), print a summary and save "
+                             "them to FILE (JSON); implies --full")
+    args = parser.parse_args(argv)
+    if args.rule_hits or args.instrument:
+        args.full = True  # reused rows would not count
+    if args.detect:
+        args.full = True  # the migration cache keeps one profile's stages per row
+    if args.diagnostics:
+        args.full = True  # diagnostics come from converting
+    
     db_file = 'assets/Sakshivani_db.db'
     output_file = 'pwa/songs.json' # Direct write to PWA
     
@@ -349,44 +464,76 @@ def main():
         cursor = conn.cursor()
         
         cursor.execute("SELECT Song_Id, Title, Lyric, Category, Reference FROM tbSakshivani")
-        rows = cursor.fetchall()
         
-        print(f"Found {len(rows)} songs. Converting...")
+        workers = args.workers or os.cpu_count() or 1
+        instrumentation = Instrumentation() if args.instrument else None
+        quality = QualityReport() if args.diagnostics else None
+        if args.full:
+            convert_batch = partial(convert_many, workers=workers, cache_size=args.cache_size,
+                                    profile=args.profile, instrumentation=instrumentation,
+                                    detect=args.detect, quality=quality)
+        else:
+            migration_cache = MigrationCache(migration_cache_path(db_file), args.profile)
+            convert_batch = partial(migration_cache.convert, workers=workers)
         
-        songs = []
-        for row in rows:
-            try:
-                converted_title = krutidev_to_unicode(row[1])
-                converted_lyric = krutidev_to_unicode(row[2])
-                converted_category = krutidev_to_unicode(row[3]) if row[3] else ""
-                converted_reference = krutidev_to_unicode(row[4]) if row[4] else ""
-                
-                # Clean up Bible references specifically
-                if converted_reference:
-                    # Remove special characters that shouldn't be in references
-                    converted_reference = converted_reference.replace('ए', ':')  # Common error
-                    converted_reference = converted_reference.replace('$', ':')
-                    converted_reference = converted_reference.replace('-', ':')
-                    # Fix common Bible book name issues
-                    converted_reference = converted_reference.replace('प््रा: वा:', 'प्रकाशितवाक्य')
-                    converted_reference = converted_reference.replace('इब्रा:', 'इब्रानियों')
-                    converted_reference = converted_reference.replace('एट', 'प्रेरितों')
-                
-                songs.append({
-                    "id": row[0],
-                    "title": converted_title,
-                    "lyrics": converted_lyric,
-                    "category": converted_category,
-                    "reference": converted_reference
-                })
-            except Exception as e:
-                print(f"Error converting song ID {row[0]}: {e}")
-
         # Ensure directory
         os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        
+        if args.stream:
+            print(f"Streaming songs in batches of {args.batch_size}. Converting...")
+            # One pool for every batch rather than one per batch
+            pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+            try:
+                batches = (convert_batch(rows, pool=pool)
+                           for rows in iter_batches(cursor, args.batch_size))
+                count = write_songs_streaming(batches, output_file)
+            finally:
+                if pool is not None:
+                    pool.shutdown()
+            print(f"Converted {count} songs.")
+        else:
+            rows = cursor.fetchall()
+            print(f"Found {len(rows)} songs. Converting...")
+            songs = convert_batch(rows)
+            with open(output_file, 'w', encoding='utf-8') as f:
+                json.dump(songs, f, ensure_ascii=False, indent=2)
+        
+        if not args.full:
+            migration_cache.save()
+            print(f"Migration cache: {migration_cache.reused} rows reused, "
+                  f"{migration_cache.recorrected} re-corrected, "
+                  f"{migration_cache.converted} converted")
+        
+        cache = get_process_cache(args.cache_size, args.profile)
+        if cache is not None and len(cache):
+            stats = cache.stats()
+            print(f"Token cache: {stats['hits']} hits, {stats['misses']} misses, "
+                  f"{stats['evictions']} evictions ({stats['hit_rate']:.0%} hit rate)")
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(songs, f, ensure_ascii=False, indent=2)
+        fix_rules = get_profile(args.profile).fix_rules
+        if args.full and fix_rules is not None:
+            unused = sum(1 for hits in fix_rules.hits if not hits)
+            print(f"Correction rules: {len(fix_rules.rules) - unused} of "
+                  f"{len(fix_rules.rules)} fired")
+            if args.rule_hits:
+                fix_rules.dump_hits(args.rule_hits)
+                print(f"Rule hits saved to {args.rule_hits}")
+        
+        if instrumentation is not None:
+            data = instrumentation.to_dict()
+            with open(args.instrument, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            print()
+            print(instrumentation_report(data))
+            print(f"\nInstrumentation saved to {args.instrument}")
+        
+        if quality is not None:
+            data = quality.to_dict()
+            with open(args.diagnostics, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+            print()
+            print(quality_report(data))
+            print(f"\nDiagnostics saved to {args.diagnostics}")
             
         print(f"Success! Saved to {output_file}")
         
@@ -20,19 +20,22 @@ document.addEventListener('DOMContentLoaded', () => {
     const detailLyrics = document.getElementById('detail-lyrics');
 
     let allSongs = [];
+    let songsById = new Map();
+
+    function setSongs(data) {
+        allSongs = data.sort((a, b) => a.id - b.id);
+        songsById = new Map(allSongs.map(song => [song.id, song]));
+        renderSongs(allSongs);
+    }
 
     // Fetch Data (Modified to use global variable for file:// support)
     if (typeof SONGS_DATA !== 'undefined') {
-        allSongs = SONGS_DATA.sort((a, b) => a.id - b.id);
-        renderSongs(allSongs);
+        setSongs(SONGS_DATA);
     } else {
         // Fallback for server environment or if script missing
         fetch('./songs.json')
             .then(response => response.json())
-            .then(data => {
-                allSongs = data.sort((a, b) => a.id - b.id);
-                renderSongs(allSongs);
-            })
+            .then(setSongs)
             .catch(err => {
                 console.error('Error loading songs:', err);
                 songList.innerHTML = '<li style="padding:1rem; text-align:center; color:red">Error loading songs. Please check console.</li>';
@@ -72,18 +75,50 @@ document.addEventListener('DOMContentLoaded', () => {
     }
 
     // Search functionality
-    searchInput.addEventListener('input', (e) => {
+    // Queries are looked up in the prebuilt index (search-index.js); until it
+    // has loaded, or where it cannot (file://), the songs are scanned
+    let songIndex = null;
+    let searchCount = 0;
+    if (window.SongIndex && location.protocol !== 'file:') {
+        new window.SongIndex().load()
+            .then(index => { songIndex = index; })
+            .catch(err => console.warn('Search index unavailable, scanning songs:', err));
+    }
+
+    function scanSongs(query) {
+        return allSongs.filter(song =>
+            song.title.toLowerCase().includes(query) ||
+            song.lyrics.toLowerCase().includes(query) ||
+            song.id.toString().includes(query)
+        );
+    }
+
+    async function searchSongs(query) {
+        if (!songIndex) return scanSongs(query);
+        try {
+            // Song numbers first, then the index's matches, titles first
+            const ids = /^\d+$/.test(query)
+                ? allSongs.map(song => song.id).filter(id => id.toString().includes(query))
+                : [];
+            ids.push(...await songIndex.search(query));
+            return [...new Set(ids)].map(id => songsById.get(id)).filter(Boolean);
+        } catch (err) {
+            console.warn('Search index lookup failed, scanning songs:', err);
+            return scanSongs(query);
+        }
+    }
+
+    searchInput.addEventListener('input', async (e) => {
         const query = e.target.value.toLowerCase().trim();
+        const count = ++searchCount;
         if (!query) {
             renderSongs(allSongs);
             return;
         }
 
-        const filtered = allSongs.filter(song =>
-            song.title.toLowerCase().includes(query) ||
-            song.lyrics.toLowerCase().includes(query) ||
-            song.id.toString().includes(query)
-        );
+        const filtered = await searchSongs(query);
+        // A later keystroke has started its own search
+        if (count !== searchCount) return;
         renderSongs(filtered);
     });
 
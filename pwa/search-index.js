@@ -0,0 +1,116 @@
+/**
+ * Offline Song Search
+ * Looks queries up in the prebuilt index of search-index/ (see
+ * build_search_index.py) instead of scanning every song's lyrics:
+ * the manifest, then only the shards the query's terms fall in.
+ */
+
+const VLQ_ALPHABET = 'ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/';
+const VLQ_SHIFT = 5;
+const VLQ_CONTINUE = 1 << VLQ_SHIFT;
+const VLQ_MASK = VLQ_CONTINUE - 1;
+const FLAG_BITS = 2;
+
+class SongIndex {
+    constructor(baseUrl = './search-index/') {
+        this.baseUrl = baseUrl;
+        this.manifest = null;
+        this.shards = new Map(); // shard key -> Promise of { terms, postings }
+    }
+
+    async load() {
+        const response = await fetch(this.baseUrl + 'manifest.json');
+        if (!response.ok) throw new Error(`Search index: ${response.status}`);
+        this.manifest = await response.json();
+        return this;
+    }
+
+    // Same terms as build_search_index.terms(): folded, lower-cased words
+    terms(text) {
+        let folded = text.normalize('NFC');
+        for (const [from, to] of this.manifest.folds) {
+            folded = folded.split(from).join(to);
+        }
+        return folded.toLowerCase().match(/[\p{L}\p{M}\p{N}]+/gu) || [];
+    }
+
+    shard(key) {
+        if (!this.shards.has(key)) {
+            const entry = this.manifest.shards[key];
+            this.shards.set(key, entry
+                ? fetch(this.baseUrl + entry.file).then(response => response.json())
+                : Promise.resolve(null));
+        }
+        return this.shards.get(key);
+    }
+
+    static decode(encoded) {
+        const postings = [];
+        let songId = 0, value = 0, shift = 0;
+        for (const char of encoded) {
+            const digit = VLQ_ALPHABET.indexOf(char);
+            value |= (digit & VLQ_MASK) << shift;
+            if (digit & VLQ_CONTINUE) {
+                shift += VLQ_SHIFT;
+                continue;
+            }
+            songId += value >> FLAG_BITS;
+            postings.push([songId, value & ((1 << FLAG_BITS) - 1)]);
+            value = shift = 0;
+        }
+        return postings;
+    }
+
+    // Songs with a word starting with term: Map of song id -> field flags
+    async matches(term) {
+        const prefix = this.manifest.shard_prefix;
+        const keys = term.length >= prefix
+            ? [term.slice(0, prefix)]
+            : Object.keys(this.manifest.shards).filter(key => key.startsWith(term));
+        const found = new Map();
+        for (const shard of await Promise.all(keys.map(key => this.shard(key)))) {
+            if (!shard) continue;
+            // The terms starting with term are one run of the sorted list
+            let low = 0, high = shard.terms.length;
+            while (low < high) {
+                const middle = (low + high) >> 1;
+                if (shard.terms[middle] < term) low = middle + 1;
+                else high = middle;
+            }
+            for (let i = low; i < shard.terms.length && shard.terms[i].startsWith(term); i++) {
+                for (const [songId, flags] of SongIndex.decode(shard.postings[i])) {
+                    found.set(songId, (found.get(songId) || 0) | flags);
+                }
+            }
+        }
+        return found;
+    }
+
+    /**
+     * Ids of the songs with a word starting with every term of query:
+     * songs matching every term in the title first, then by id.
+     */
+    async search(query) {
+        const terms = this.terms(query);
+        if (!terms.length) return [];
+        const all = await Promise.all(terms.map(term => this.matches(term)));
+        let found = all[0];
+        for (const matches of all.slice(1)) {
+            const both = new Map();
+            for (const [songId, flags] of matches) {
+                if (found.has(songId)) both.set(songId, found.get(songId) & flags);
+            }
+            found = both;
+        }
+        const title = this.manifest.flags.title;
+        return [...found]
+            .sort((a, b) => ((b[1] & title) - (a[1] & title)) || a[0] - b[0])
+            .map(([songId]) => songId);
+    }
+}
+
+if (typeof window !== 'undefined') {
+    window.SongIndex = SongIndex;
+} else if (typeof module !== 'undefined') {
+    module.exports = SongIndex;
+}
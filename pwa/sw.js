@@ -1,4 +1,4 @@
-const CACHE_NAME = 'sakshivani-v24';
+const CACHE_NAME = 'sakshivani-v25';
 const ASSETS = [
     '/',
     'index.html',
@@ -6,6 +6,7 @@ const ASSETS = [
     'app.js',
     'manifest.json',
     'songs.json',
+    'search-index.js',
     'catechism.html',
     'catechism/1-commandments.html',
     'catechism/2-creed.html',
@@ -21,10 +22,23 @@ const ASSETS = [
     'icons/icon-512x512.png'
 ];
 
+// Song search index: the manifest and every shard it lists
+function precacheSearchIndex(cache) {
+    return fetch('search-index/manifest.json')
+        .then((response) => {
+            if (!response.ok) return;
+            return cache.put('search-index/manifest.json', response.clone())
+                .then(() => response.json())
+                .then((manifest) => cache.addAll(
+                    Object.values(manifest.shards).map((shard) => 'search-index/' + shard.file)
+                ));
+        });
+}
+
 self.addEventListener('install', (event) => {
     event.waitUntil(
         caches.open(CACHE_NAME)
-            .then((cache) => cache.addAll(ASSETS))
+            .then((cache) => cache.addAll(ASSETS).then(() => precacheSearchIndex(cache)))
     );
 });
 
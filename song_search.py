@@ -0,0 +1,608 @@
+#!/usr/bin/env python3
+"""
+Search the clean songs database (assets/Sakshivani_Unicode_Clean.db).
+
+    python song_search.py यीशु
+    python song_search.py स्तुति               # also inside स्तुतिगान, प्रस्तुति
+    python song_search.py '"प्रभु यीशु"' --limit 5 --category 'यीशु का जन्म'
+    python song_search.py यिशू --fuzzy         # spelling-tolerant (devanagari.fold())
+    python song_search.py --serve --port 8765 # GET /search?q=...
+    python song_search.py --benchmark         # the indexes vs LIKE '%...%'
+    python song_search.py --latency           # service latency, direct and over HTTP
+
+search() picks an index per query (choose_index()):
+    word      songs_fts, for FTS5 query syntax ("phrases", prefix*,
+              title:, AND / OR / NOT) and for text too short for
+              trigrams, as a word-prefix match
+    trigram   songs_trigram_fts, for plain text of three characters or
+              more: each fragment matches as a substring of the title or
+              lyrics, in the middle of a word as well
+    folded    songs_folded_fts with the query folded, for fuzzy=True
+    like      a LIKE '%...%' scan of songs, for a database built before
+              the trigram table existed
+
+Results are ranked by bm25() with the title weighted over the lyrics,
+can be filtered by category and reference, and come a page at a time:
+each page gives the cursor of the next one (keyset pagination on score
+and song id, so a page costs the same however deep it is). Title and
+lyrics are highlighted with <mark> by the FTS5 highlight() / snippet()
+functions, except on the folded and LIKE paths, whose matches are not
+positions in the text as written.
+
+SearchService serves searches from a small pool of read-only
+connections (each with its own prepared-statement cache) through an LRU
+cache of result pages keyed on the normalized query; serve() puts it
+behind an HTTP endpoint:
+
+    GET /search?q=यीशु&category=...&reference=युहन्ना&limit=20&cursor=...&fuzzy=1
+"""
+import argparse
+import json
+import queue
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+from contextlib import contextmanager
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+from urllib.request import urlopen
+
+import devanagari
+
+DB_FILE = 'assets/Sakshivani_Unicode_Clean.db'
+# The trigram tokenizer indexes runs of three characters; shorter
+# fragments cannot be looked up in it
+TRIGRAM = 3
+BENCHMARK_QUERIES = ('स्तुति', 'यीशु', 'प्रभु यीशु', 'तुति', 'रभु', 'क्रूस', 'धन्य', 'जय',
+                     '"प्रभु यीशु"', 'title:धन्यवाद')
+
+# bm25() column weights: a match in the title counts ten times one in the lyrics
+TITLE_WEIGHT = 10.0
+LYRICS_WEIGHT = 1.0
+CATEGORY_WEIGHT = 0.5
+# Per index: the FTS5 table and its column weights; every table has the
+# title in column 0 and the lyrics in column 1
+FTS_INDEXES = {
+    'word': ('songs_fts', (TITLE_WEIGHT, LYRICS_WEIGHT, CATEGORY_WEIGHT)),
+    'trigram': ('songs_trigram_fts', (TITLE_WEIGHT, LYRICS_WEIGHT)),
+    'folded': ('songs_folded_fts', (TITLE_WEIGHT, LYRICS_WEIGHT)),
+}
+HIGHLIGHT = ('<mark>', '</mark>')
+SNIPPET_TOKENS = 12
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+
+POOL_SIZE = 4
+CACHE_SIZE = 1024
+# Prepared statements kept per connection (sqlite3's own cache, by SQL text)
+STATEMENT_CACHE = 64
+
+# Quotes, prefix stars, column filters, grouping and the boolean operators;
+# a ':' after anything but a column name is text (रोमी 8:26)
+_FTS_SYNTAX_RE = re.compile(r'["*()^+]|\b(?:title|lyrics)\s*:|\b(?:AND|OR|NOT|NEAR)\b')
+_FOLDED_COLUMNS_RE = re.compile(r'\b(title|lyrics)(?=\s*:)')
+# NFC splits the nukta letters क़ ... य़ (U+0958-095F) into letter + nukta;
+# the converter writes them precomposed, so queries are put back the same way
+_NUKTA_LETTERS = tuple((unicodedata.normalize('NFD', chr(code)), chr(code))
+                       for code in range(0x0958, 0x0960))
+
+# --- 1. Picking an index ---
+
+def fts_tables(conn):
+    """The FTS tables of FTS_INDEXES the database has."""
+    names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    return frozenset(table for table, _ in FTS_INDEXES.values() if table in names)
+
+def choose_index(query, tables=frozenset(['songs_fts', 'songs_trigram_fts']), fuzzy=False):
+    """'word', 'trigram', 'folded' or 'like' for query, given the FTS tables there are."""
+    if fuzzy and 'songs_folded_fts' in tables:
+        return 'folded'
+    if _FTS_SYNTAX_RE.search(query):
+        return 'word'
+    if all(len(fragment) < TRIGRAM for fragment in query.split()):
+        return 'word'
+    return 'trigram' if 'songs_trigram_fts' in tables else 'like'
+
+def normalize_query(query):
+    """
+    query in NFC with the nukta letters precomposed, as the songs store
+    them, and its whitespace collapsed, as it is searched and cached.
+    """
+    query = unicodedata.normalize('NFC', query)
+    for split, letter in _NUKTA_LETTERS:
+        if split in query:
+            query = query.replace(split, letter)
+    return ' '.join(query.split())
+
+def _fts_string(text):
+    """text as an FTS5 string, matched literally."""
+    return '"' + text.replace('"', '""') + '"'
+
+def _escape_like(text):
+    return re.sub(r'([%_\\])', r'\\\1', text)
+
+def match_expression(query, index):
+    """
+    (FTS5 MATCH expression, fragments left to LIKE) that search() runs for
+    query on index.
+    """
+    syntax = _FTS_SYNTAX_RE.search(query)
+    if index == 'folded':
+        # Its columns are title_folded and lyrics_folded
+        query = _FOLDED_COLUMNS_RE.sub(r'\1_folded', devanagari.fold(query))
+    if index == 'like':
+        return None, query.split()
+    if syntax:
+        return query, []
+    fragments = query.split()
+    if index == 'trigram':
+        # Each long fragment is a trigram phrase, ANDed; the short ones are
+        # checked on the rows the index found
+        return (' '.join(_fts_string(fragment) for fragment in fragments
+                         if len(fragment) >= TRIGRAM),
+                [fragment for fragment in fragments if len(fragment) < TRIGRAM])
+    # Words starting with each fragment, as it is typed
+    return ' '.join(_fts_string(fragment) + '*' for fragment in fragments), []
+
+# --- 2. Queries ---
+# One SQL text per index and number of LIKE fragments, so every search
+# reuses a prepared statement from the connection's cache
+
+_FILTERS = '''
+        AND (:category IS NULL OR s.category = :category)
+        AND (:reference IS NULL OR s.reference LIKE :reference ESCAPE '\\')'''
+
+def _substring_sql(count):
+    """SQL requiring the fragments :f0 ... in the title or lyrics of s."""
+    return ''.join(f"\n        AND (s.title LIKE :f{i} ESCAPE '\\'"
+                   f" OR s.lyrics LIKE :f{i} ESCAPE '\\')" for i in range(count))
+
+@lru_cache(maxsize=None)
+def page_sql(index, fragments=0):
+    """
+    The query for one page of results: song ids and scores, best first,
+    after the keyset (:after_score, :after_id) of the previous page.
+    """
+    if index == 'like':
+        matches = f'''
+        SELECT s.song_id, 0.0 AS score FROM songs s
+        WHERE 1{_substring_sql(fragments)}{_FILTERS}'''
+    else:
+        table, weights = FTS_INDEXES[index]
+        matches = f'''
+        SELECT s.song_id, bm25({table}, {', '.join(map(str, weights))}) AS score
+        FROM {table} JOIN songs s ON s.song_id = {table}.rowid
+        WHERE {table} MATCH :match{_substring_sql(fragments)}{_FILTERS}'''
+    return f'''
+    SELECT song_id, score FROM ({matches}
+    )
+    WHERE :after_score IS NULL OR score > :after_score
+        OR (score = :after_score AND song_id > :after_id)
+    ORDER BY score, song_id LIMIT :limit
+    '''
+
+@lru_cache(maxsize=None)
+def details_sql(index):
+    """The query for the songs of a page (:ids, a JSON array), highlighted where it can be."""
+    if index in ('like', 'folded'):
+        return '''
+        SELECT song_id, title, category, reference, NULL, NULL FROM songs
+        WHERE song_id IN (SELECT value FROM json_each(:ids))
+        '''
+    table, _ = FTS_INDEXES[index]
+    return f'''
+        SELECT s.song_id, s.title, s.category, s.reference,
+               highlight({table}, 0, :open, :close),
+               snippet({table}, 1, :open, :close, '…', {SNIPPET_TOKENS})
+        FROM {table} JOIN songs s ON s.song_id = {table}.rowid
+        WHERE {table} MATCH :match AND {table}.rowid IN (SELECT value FROM json_each(:ids))
+    '''
+
+def encode_cursor(score, song_id):
+    return f"{score!r}:{song_id}"
+
+def decode_cursor(cursor):
+    """(score, song_id) of a cursor from encode_cursor(); ValueError if it is not one."""
+    score, _, song_id = cursor.rpartition(':')
+    try:
+        return float(score), int(song_id)
+    except ValueError:
+        raise ValueError(f"not a search cursor: {cursor!r}") from None
+
+# --- 3. Searching ---
+
+def search(conn, query, limit=DEFAULT_LIMIT, index=None, category=None, reference=None,
+           cursor=None, fuzzy=False, snippets=True, tables=None):
+    """
+    One page of songs for query:
+
+        {"query", "index", "results": [{"song_id", "title", "category",
+         "reference", "score", "title_html", "snippet"}, ...], "next"}
+
+    best matches (lowest bm25 score) first. index forces 'word',
+    'trigram', 'folded' or 'like' instead of choose_index(); category
+    must match exactly and reference is a prefix (a book name).
+    cursor is the "next" of the previous page; limit is at least 1
+    (ValueError otherwise), or None for every match. snippets=False
+    leaves out title_html and snippet. tables is fts_tables(conn), when
+    the caller knows it. Every index finds the nukta letters however the
+    query spells them:
+
+        >>> import create_clean_database
+        >>> conn = sqlite3.connect(':memory:')
+        >>> create_clean_database.create_schema(conn.cursor())
+        >>> _ = conn.execute("INSERT INTO songs (song_id, title, lyrics) "
+        ...                  "VALUES (1, 'मुक्ति', 'उसने मुझे छुड़ाया')")
+        >>> create_clean_database.build_indexes(conn, {})
+        >>> [len(search(conn, query, index=index)["results"])
+        ...  for query in ('छुड़ाया', 'छुड़ाया') for index in ('word', 'trigram', 'folded', 'like')]
+        [1, 1, 1, 1, 1, 1, 1, 1]
+    """
+    if limit is not None and limit < 1:
+        raise ValueError(f"limit must be at least 1, not {limit}")
+    query = normalize_query(query)
+    if not query:
+        return {"query": query, "index": None, "results": [], "next": None}
+    if tables is None:
+        tables = fts_tables(conn)
+    index = index or choose_index(query, tables, fuzzy)
+    match, fragments = match_expression(query, index)
+    after_score, after_id = decode_cursor(cursor) if cursor else (None, None)
+
+    params = {"match": match, "category": category or None,
+              "reference": _escape_like(reference) + '%' if reference else None,
+              "after_score": after_score, "after_id": after_id,
+              # One row more than the page, to know whether there is a next one
+              "limit": limit + 1 if limit is not None else -1}
+    params.update((f"f{i}", '%' + _escape_like(fragment) + '%')
+                  for i, fragment in enumerate(fragments))
+    page = conn.execute(page_sql(index, len(fragments)), params).fetchall()
+    following = None
+    if limit is not None and len(page) > limit:
+        page = page[:limit]
+        following = encode_cursor(*reversed(page[-1]))
+
+    details = {}
+    if page and snippets:
+        rows = conn.execute(details_sql(index), {
+            "match": match, "ids": json.dumps([song_id for song_id, _ in page]),
+            "open": HIGHLIGHT[0], "close": HIGHLIGHT[1]})
+        details = {row[0]: row for row in rows}
+    results = []
+    for song_id, score in page:
+        row = details.get(song_id)
+        results.append({"song_id": song_id, "score": score,
+                        "title": row[1] if row else None,
+                        "category": row[2] if row else None,
+                        "reference": row[3] if row else None,
+                        "title_html": row[4] if row else None,
+                        "snippet": row[5] if row else None})
+    return {"query": query, "index": index, "results": results, "next": following}
+
+def search_like(conn, query, limit=None):
+    """The ids of the songs with every fragment of query in the title or lyrics, by a full scan."""
+    page = search(conn, query, limit, index='like', snippets=False)
+    return [result["song_id"] for result in page["results"]]
+
+class ConnectionPool:
+    """
+    Up to size read-only connections to a database, shared by threads:
+    connection() lends one, opening it the first time it is needed.
+    """
+
+    def __init__(self, path, size=POOL_SIZE):
+        self.path = path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def _open(self):
+        conn = sqlite3.connect(f'file:{self.path}?mode=ro', uri=True, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE)
+        conn.execute('PRAGMA query_only = ON')
+        devanagari.register_sqlite_function(conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        with self._slots:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                conn = self._open()
+            try:
+                yield conn
+            finally:
+                self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+class SearchService:
+    """
+    search() over a connection pool, with an LRU cache of result pages.
+
+    The cache key is the normalized query (normalize_query()) with the
+    filters, page size, cursor and fuzzy flag, so the same search typed
+    with different spacing or composition is answered from the cache.
+    Cached pages are shared: treat them as read-only.
+    """
+
+    def __init__(self, db_path=DB_FILE, pool_size=POOL_SIZE, cache_size=CACHE_SIZE):
+        self.pool = ConnectionPool(db_path, pool_size)
+        with self.pool.connection() as conn:
+            self.tables = fts_tables(conn)
+        self._cached = lru_cache(maxsize=cache_size)(self._search)
+
+    def _search(self, query, limit, category, reference, cursor, fuzzy):
+        with self.pool.connection() as conn:
+            return search(conn, query, limit, category=category, reference=reference,
+                          cursor=cursor, fuzzy=fuzzy, tables=self.tables)
+
+    def search(self, query, limit=DEFAULT_LIMIT, category=None, reference=None, cursor=None,
+               fuzzy=False):
+        """One page of results, as search() returns it."""
+        return self._cached(normalize_query(query), limit, category or None, reference or None,
+                            cursor or None, bool(fuzzy))
+
+    def clear(self):
+        self._cached.cache_clear()
+
+    def stats(self):
+        info = self._cached.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "size": info.currsize,
+            "maxsize": info.maxsize,
+            "hits": info.hits,
+            "misses": info.misses,
+            "hit_rate": info.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self):
+        self.pool.close()
+
+# --- 4. HTTP endpoint ---
+
+class SearchHandler(BaseHTTPRequestHandler):
+    """GET /search?q=&category=&reference=&limit=&cursor=&fuzzy= -> a page as JSON."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        if url.path != '/search':
+            self._send(404, {"error": f"no such endpoint {url.path}, use /search?q=..."})
+            return
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        start = time.perf_counter()
+        try:
+            limit = int(params.get('limit', DEFAULT_LIMIT))
+            if not 1 <= limit <= MAX_LIMIT:
+                raise ValueError(f"limit must be 1-{MAX_LIMIT}")
+            page = self.server.service.search(params.get('q', ''), limit, params.get('category'),
+                                              params.get('reference'), params.get('cursor'),
+                                              params.get('fuzzy') in ('1', 'true', 'yes'))
+        except (ValueError, sqlite3.OperationalError) as e:
+            # A bad limit or cursor, or FTS5 query syntax it cannot parse
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200, dict(page, elapsed_ms=round((time.perf_counter() - start) * 1000, 3)))
+
+    def _send(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        # The PWA is served from elsewhere
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        if not self.server.quiet:
+            super().log_message(format, *args)
+
+def make_server(service, host='127.0.0.1', port=8765, quiet=False):
+    """A threading HTTP server answering /search with service; call serve_forever() on it."""
+    server = ThreadingHTTPServer((host, port), SearchHandler)
+    server.daemon_threads = True
+    server.service = service
+    server.quiet = quiet
+    return server
+
+# --- 5. Benchmarks ---
+
+def _best_time(function, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def benchmark(conn, queries=BENCHMARK_QUERIES, repeat=20):
+    """
+    Time search() against a LIKE '%...%' scan for each query (best of
+    repeat); returns one row per query. For trigram lookups the two must
+    find the same songs.
+    """
+    rows = []
+    for query in queries:
+        index_time, page = _best_time(lambda: search(conn, query, None, snippets=False), repeat)
+        found = [result["song_id"] for result in page["results"]]
+        like_time, scanned = _best_time(lambda: search_like(conn, query.replace('"', '')),
+                                        repeat)
+        same = None
+        if page["index"] == 'trigram':
+            same = sorted(found) == sorted(scanned)
+        rows.append({"query": query, "index": page["index"], "found": len(found),
+                     "scanned": len(scanned), "index_ms": index_time * 1000,
+                     "like_ms": like_time * 1000, "same": same})
+    return rows
+
+def format_benchmark(rows):
+    lines = [f"{'query':<16} {'index':<8} {'hits':>5} {'like':>5} {'index ms':>9} "
+             f"{'like ms':>8} {'speed-up':>8}"]
+    for row in rows:
+        speedup = row["like_ms"] / row["index_ms"] if row["index_ms"] else 0
+        check = '  MISMATCH' if row["same"] is False else ''
+        lines.append(f"{row['query']:<16} {row['index']:<8} {row['found']:>5} "
+                     f"{row['scanned']:>5} {row['index_ms']:>9.2f} {row['like_ms']:>8.2f} "
+                     f"{speedup:>7.1f}x{check}")
+    return lines
+
+def _percentiles(times):
+    times = sorted(times)
+    pick = lambda share: times[min(len(times) - 1, int(share * len(times)))] * 1000
+    return {"requests": len(times), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99),
+            "max": times[-1] * 1000}
+
+def latency_benchmark(service, queries=BENCHMARK_QUERIES, rounds=20, http=True):
+    """
+    Per-request latency of service.search() over rounds of queries, each
+    query's first page then its second: with the result cache cleared
+    before every request (cold) and once every page is cached, directly
+    and, with http=True, through the HTTP endpoint on a local port.
+    Returns {label: percentiles}.
+    """
+    def first_and_second(run, rounds=rounds):
+        times = []
+        for _ in range(rounds):
+            for query in queries:
+                start = time.perf_counter()
+                page = run(query, None)
+                times.append(time.perf_counter() - start)
+                if page["next"]:
+                    start = time.perf_counter()
+                    run(query, page["next"])
+                    times.append(time.perf_counter() - start)
+        return times
+
+    def direct(query, cursor, cold):
+        if cold:
+            service.clear()
+        return service.search(query, cursor=cursor)
+
+    results = {}
+    for cold in (True, False):
+        label = 'direct, ' + ('cold' if cold else 'cached')
+        if not cold:
+            first_and_second(lambda q, c: direct(q, c, cold), 1)
+        results[label] = _percentiles(first_and_second(lambda q, c: direct(q, c, cold)))
+    if http:
+        server = make_server(service, port=0, quiet=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{server.server_address[1]}/search?"
+
+        def over_http(query, cursor, cold):
+            if cold:
+                service.clear()
+            with urlopen(base + urlencode({"q": query, "cursor": cursor or ''})) as response:
+                return json.load(response)
+
+        for cold in (True, False):
+            label = 'http, ' + ('cold' if cold else 'cached')
+            if not cold:
+                first_and_second(lambda q, c: over_http(q, c, cold), 1)
+            results[label] = _percentiles(first_and_second(lambda q, c: over_http(q, c, cold)))
+        server.shutdown()
+        server.server_close()
+    return results
+
+def format_latency(results):
+    lines = [f"{'':<16} {'requests':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+    for label, row in results.items():
+        lines.append(f"{label:<16} {row['requests']:>8} {row['p50']:>8.2f} {row['p95']:>8.2f} "
+                     f"{row['p99']:>8.2f} {row['max']:>8.2f}")
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search the clean songs database")
+    parser.add_argument('query', nargs='*', help="words, fragments or an FTS5 query")
+    parser.add_argument('--db', default=DB_FILE, help=f"database (default {DB_FILE})")
+    parser.add_argument('--limit', type=int, default=DEFAULT_LIMIT,
+                        help=f"results per page (default {DEFAULT_LIMIT})")
+    parser.add_argument('--index', choices=('word', 'trigram', 'folded', 'like'),
+                        help="use this index instead of picking one")
+    parser.add_argument('--category', help="only songs of this category")
+    parser.add_argument('--reference', help="only songs whose reference starts with this")
+    parser.add_argument('--cursor', help="the page after this cursor (printed with each page)")
+    parser.add_argument('--fuzzy', action='store_true',
+                        help="spelling-tolerant search on the folded index")
+    parser.add_argument('--serve', action='store_true', help="serve GET /search over HTTP")
+    parser.add_argument('--host', default='127.0.0.1', help="address to serve on")
+    parser.add_argument('--port', type=int, default=8765, help="port to serve on (default 8765)")
+    parser.add_argument('--pool-size', type=int, default=POOL_SIZE,
+                        help=f"read-only connections (default {POOL_SIZE})")
+    parser.add_argument('--cache-size', type=int, default=CACHE_SIZE,
+                        help=f"result pages cached (default {CACHE_SIZE})")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="time the queries (or a built-in set) against LIKE '%%...%%'")
+    parser.add_argument('--latency', action='store_true',
+                        help="measure the service's latency, directly and over HTTP")
+    parser.add_argument('--repeat', type=int, default=20,
+                        help="benchmark runs per query / latency rounds (default 20)")
+    args = parser.parse_args(argv)
+    if args.limit < 1:
+        parser.error(f"--limit must be at least 1, not {args.limit}")
+    queries = [' '.join(args.query)] if args.query else BENCHMARK_QUERIES
+
+    if args.serve or args.latency:
+        service = SearchService(args.db, args.pool_size, args.cache_size)
+        if args.latency:
+            results = latency_benchmark(service, queries, args.repeat)
+            print(f"Latency over {args.repeat} rounds of {len(queries)} queries "
+                  f"(first and second page), {args.db}\n")
+            print('\n'.join(format_latency(results)))
+            print(f"\nResult cache: {service.stats()}")
+            service.close()
+            return 0
+        server = make_server(service, args.host, args.port)
+        print(f"Serving {args.db} on http://{args.host}:{server.server_address[1]}/search?q=...")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        server.server_close()
+        service.close()
+        return 0
+
+    conn = sqlite3.connect(f'file:{args.db}?mode=ro', uri=True)
+    devanagari.register_sqlite_function(conn)
+    if args.benchmark:
+        try:
+            rows = benchmark(conn, queries, args.repeat)
+        except sqlite3.OperationalError as e:
+            parser.error(f"bad query: {e}")
+        count = conn.execute('SELECT COUNT(*) FROM songs').fetchone()[0]
+        print(f"{count} songs in {args.db}, best of {args.repeat} runs\n")
+        print('\n'.join(format_benchmark(rows)))
+        return 1 if any(row["same"] is False for row in rows) else 0
+
+    if not args.query:
+        parser.error("give a query, or --serve, --benchmark or --latency")
+    try:
+        page = search(conn, ' '.join(args.query), args.limit, args.index, args.category,
+                      args.reference, args.cursor, args.fuzzy)
+    except (ValueError, sqlite3.OperationalError) as e:
+        # A bad cursor, or FTS5 query syntax it cannot parse, as the HTTP endpoint reports them
+        parser.error(f"bad query: {e}")
+    print(f"{len(page['results'])} songs for {page['query']!r} ({page['index']} index):")
+    for result in page["results"]:
+        print(f"   {result['song_id']:3}. {result['title']}  [{result['score']:.2f}]")
+        if result["snippet"]:
+            print(f"        {' / '.join(result['snippet'].splitlines())}")
+    if page["next"]:
+        print(f"Next page: --cursor='{page['next']}'")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
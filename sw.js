@@ -1,4 +1,4 @@
-const CACHE_NAME = 'sakshivani-root-v1';
+const CACHE_NAME = 'sakshivani-root-v2';
 
 // Critical assets to cache immediately
 const ASSETS = [
@@ -23,6 +23,7 @@ const ASSETS = [
     '/pwa/app.js',
     '/pwa/songs.js',
     '/pwa/songs.json',
+    '/pwa/search-index.js',
     '/pwa/catechism.html',
 
     // Data (Heavy - Cache Carefully)
@@ -31,13 +32,29 @@ const ASSETS = [
     '/dashboard-web/data/bible/hi_data.js'
 ];
 
+// Song search index: the manifest and every shard it lists
+// (written by build_search_index.py)
+const SEARCH_INDEX = '/pwa/search-index/';
+
+function precacheSearchIndex(cache) {
+    return fetch(SEARCH_INDEX + 'manifest.json')
+        .then((response) => {
+            if (!response.ok) return;
+            return cache.put(SEARCH_INDEX + 'manifest.json', response.clone())
+                .then(() => response.json())
+                .then((manifest) => cache.addAll(
+                    Object.values(manifest.shards).map((shard) => SEARCH_INDEX + shard.file)
+                ));
+        });
+}
+
 self.addEventListener('install', (event) => {
     console.log('[Service Worker] Installing...');
     event.waitUntil(
         caches.open(CACHE_NAME)
             .then((cache) => {
                 console.log('[Service Worker] Caching all assets');
-                return cache.addAll(ASSETS);
+                return cache.addAll(ASSETS).then(() => precacheSearchIndex(cache));
             })
             .then(() => self.skipWaiting())
     );
@@ -1,7 +1,8 @@
 import sqlite3
 import sys
 sys.path.insert(0, '.')
-from migrate_data_v2 import krutidev_to_unicode
+from font_profiles import get_profile
+krutidev_to_unicode = get_profile('chanakya').convert
 sys.stdout.reconfigure(encoding='utf-8')
 
 # Test problematic words from user
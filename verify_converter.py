@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Verify the optimised converter paths in font_profiles against the
+reference behaviour on every field of tbSakshivani
+"""
+import re
+import sqlite3
+import sys
+
+from font_profiles import (CACHE_FILE, CHANAKYA_MATRA_FIXES, MAPPING, PROFILES, Instrumentation,
+                           TokenCache, _apply_reph, _fix_chanakya_order, _read_cache,
+                           _replace_ordered, _swap_f, detect_encoding, detect_profile,
+                           get_profile)
+
+sys.stdout.reconfigure(encoding='utf-8')
+
+db_file = 'assets/Sakshivani_db.db'
+
+conn = sqlite3.connect(db_file)
+cursor = conn.cursor()
+cursor.execute("SELECT Song_Id, Title, Lyric, Category, Reference FROM tbSakshivani")
+rows = cursor.fetchall()
+conn.close()
+
+fields = ('title', 'lyrics', 'category', 'reference')
+profile = get_profile('chanakya')
+caches = {name: TokenCache(profile=name) for name in PROFILES}
+
+# --- Reference implementations of the reordering steps (list-based loops) ---
+
+def swap_f_loop(text):
+    chars = list(text)
+    i = 0
+    while i < len(chars):
+        if chars[i] == 'f':
+            if i + 1 < len(chars):
+                chars[i], chars[i+1] = chars[i+1], chars[i]
+                i += 1
+        i += 1
+    return "".join(chars)
+
+def chanakya_passes(text):
+    for wrong_pattern, correct_pattern in CHANAKYA_MATRA_FIXES:
+        text = re.sub(wrong_pattern, correct_pattern, text)
+    return text
+
+def reph_loop(text):
+    chars = list(text)
+    i = 0
+    while i < len(chars):
+        if chars[i] == 'Z':
+            chars[i] = ''
+            if i > 0:
+                chars.insert(i-1, 'र्')
+        i += 1
+    return "".join(chars)
+
+def before_mapping(value):
+    return chanakya_passes(swap_f_loop(" " + value + " "))
+
+def before_fixes(value):
+    return reph_loop(profile.apply_mapping(before_mapping(value))).strip()
+
+fix_table = [(old, new) for _, old, new in profile.fix_rules.rules]
+
+checks = {
+    # Compiled single-scan mapping vs. one str.replace per MAPPING entry
+    'compiled mapping': (lambda value: _replace_ordered(value, MAPPING),
+                         profile.apply_mapping),
+    # Linear reordering passes vs. the list-based loops
+    'f swap': (lambda value: swap_f_loop(" " + value + " "),
+               lambda value: _swap_f(" " + value + " ")),
+    'chanakya order': (lambda value: chanakya_passes(swap_f_loop(" " + value + " ")),
+                       lambda value: _fix_chanakya_order(swap_f_loop(" " + value + " "))),
+    'reph': (lambda value: reph_loop(profile.apply_mapping(before_mapping(value))),
+             lambda value: _apply_reph(profile.apply_mapping(before_mapping(value)))),
+    # Compiled correction rules vs. one str.replace per rule
+    'fix rules': (lambda value: _replace_ordered(before_fixes(value), fix_table),
+                  lambda value: profile.fix_rules.apply(before_fixes(value))),
+    # front() + finish() (used by the migration cache) vs. one convert()
+    'staged conversion': (profile.convert,
+                          lambda value: profile.finish(profile.front(value))),
+}
+# Token cache vs. whole-text conversion, for every profile
+for name, cache in caches.items():
+    checks[f'token cache ({name})'] = (
+        lambda value, p=get_profile(name): p.convert(value),
+        lambda value, p=get_profile(name), c=cache: p.convert(value, c),
+    )
+
+# Streaming conversion in small chunks vs. whole-text conversion
+def stream(value, p, size=16):
+    return "".join(p.convert_stream([value[i:i + size] for i in range(0, len(value), size)], size))
+
+for name in sorted(PROFILES):
+    checks[f'streaming ({name})'] = (
+        lambda value, p=get_profile(name): p.convert(value),
+        lambda value, p=get_profile(name): stream(value, p),
+    )
+
+# Instrumented conversion (stage timing + hit counts) vs. the plain path
+def instrumented(convert, p):
+    previous = p.instrument(Instrumentation())
+    try:
+        return convert()
+    finally:
+        p.instrument(previous)
+
+for name in sorted(PROFILES):
+    checks[f'instrumented ({name})'] = (
+        lambda value, p=get_profile(name): p.convert(value),
+        lambda value, p=get_profile(name): instrumented(lambda: p.convert(value), p),
+    )
+checks['instrumented staged'] = (
+    profile.convert,
+    lambda value: instrumented(lambda: profile.finish(profile.front(value)), profile),
+)
+
+print(f"Checking {len(rows)} songs ({len(rows) * len(fields)} fields)\n")
+failed = False
+
+for check_name, (reference, optimised) in checks.items():
+    mismatches = []
+    for row in rows:
+        for name, value in zip(fields, row[1:]):
+            if not value:
+                continue
+            expected = reference(value)
+            got = optimised(value)
+            if got != expected:
+                mismatches.append((row[0], name, expected, got))
+
+    if mismatches:
+        failed = True
+        print(f"[FAIL] {check_name}: {len(mismatches)} fields differ:")
+        for song_id, name, expected, got in mismatches[:20]:
+            print(f"  Song {song_id} {name}:")
+            print(f"    Expected: {expected[:80]!r}")
+            print(f"    Got:      {got[:80]!r}")
+    else:
+        print(f"[OK] {check_name}: byte-identical")
+
+# Compiled tables saved in CACHE_FILE vs. compiling them now
+cached = _read_cache(CACHE_FILE)
+for name, p in sorted(PROFILES.items()):
+    if cached.get(p.table_hash()) == p.compile():
+        print(f"[OK] cached tables ({name}): match a fresh compile")
+    else:
+        failed = True
+        print(f"[FAIL] cached tables ({name}): missing or stale in {CACHE_FILE}")
+
+# The whole corpus as one streamed document vs. converting it at once
+document = "\n\n".join(value for row in rows for value in row[1:] if value)
+for name, p in sorted(PROFILES.items()):
+    if stream(document, p, 4096) == p.convert(document):
+        print(f"[OK] streamed corpus ({name}): byte-identical")
+    else:
+        failed = True
+        print(f"[FAIL] streamed corpus ({name}): differs from whole-text conversion")
+
+# Encoding detection: every source field is legacy text and every converted one Unicode
+misrouted = []
+for row in rows:
+    for name, value in zip(fields, row[1:]):
+        if not value:
+            continue
+        routed = detect_profile(value, None)
+        converted = profile.convert(value)
+        if (routed is None and detect_encoding(value) is not None) or (
+                converted and detect_profile(converted, None) is not None):
+            misrouted.append((row[0], name, detect_encoding(value), detect_encoding(converted)))
+if misrouted:
+    failed = True
+    print(f"[FAIL] encoding detection: {len(misrouted)} fields misrouted:")
+    for song_id, name, source, target in misrouted[:20]:
+        print(f"  Song {song_id} {name}: source {source}, converted {target}")
+else:
+    print(f"[OK] encoding detection: sources legacy, conversions Unicode")
+
+print(f"\nToken cache ({profile.name}): {caches[profile.name].stats()}")
+sys.exit(1 if failed else 0)